@@ -0,0 +1,216 @@
+"""
+Measure speed and agreement of the emotion-inference pipeline used by /api/detect-emotion.
+
+Runs a folder of images, or a recorded video file, through utils.inference for
+every combination of face detector and preprocessing size, and reports per-stage
+timings (decode, preprocess, detect, classify), frames and faces per second,
+model load time and peak RSS. Each combination runs in its own process so
+memory figures don't mix.
+
+Labels are compared with the first combination (the reference), and with the
+true label when images sit in folders named after FER's labels
+(angry, disgust, fear, happy, sad, surprise, neutral), e.g. faces/happy/01.jpg.
+
+Run from the backend directory:
+    python benchmarks/bench_emotion.py --images path/to/faces --detectors mtcnn,haar --max-sides 0,640,320
+    python benchmarks/bench_emotion.py --video recording.mp4 --every 5 --limit 300 --output emotion.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from utils.inference import STAGES, create_detector, decode_image, detect_emotions, preprocess, timed, top_emotion
+
+LABELS = ("angry", "disgust", "fear", "happy", "sad", "surprise", "neutral")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+
+def list_images(folder, limit):
+    paths = []
+    for root, _, files in os.walk(folder):
+        paths.extend(os.path.join(root, name) for name in files if name.lower().endswith(IMAGE_EXTENSIONS))
+    paths.sort()
+    return paths[:limit] if limit else paths
+
+
+def _truth(path):
+    label = os.path.basename(os.path.dirname(path)).lower()
+    return label if label in LABELS else None
+
+
+def image_frames(paths, timings):
+    """(name, RGB array) per image, timing file read + decode"""
+    for path in paths:
+        with timed(timings, "decode"):
+            with open(path, "rb") as f:
+                image = decode_image(f.read())
+        yield path, image, False
+
+
+def video_frames(path, every, limit, timings):
+    """(name, BGR array) for every `every`-th frame, timing the read + decode of all frames"""
+    import cv2
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise SystemExit(f"Cannot open video {path}")
+    index = used = 0
+    try:
+        while not limit or used < limit:
+            with timed(timings, "decode"):
+                ok, frame = capture.read()
+            if not ok:
+                break
+            if index % every == 0:
+                used += 1
+                yield f"frame {index}", frame, True
+            index += 1
+    finally:
+        capture.release()
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_config(detector_name, max_side, source, every, limit, warmup):
+    """Runs in a child process: one detector/preprocessing combination over the whole input"""
+    started = time.perf_counter()
+    detector = create_detector(mtcnn=detector_name == "mtcnn")
+    load_seconds = time.perf_counter() - started
+
+    per_item = []
+    labels = []
+    faces_total = 0
+    timings = {}
+    frames = (video_frames(source["video"], every, limit, timings) if source.get("video")
+              else image_frames(source["images"], timings))
+    run_started = time.perf_counter()
+    for position, (name, image, is_bgr) in enumerate(frames):
+        with timed(timings, "preprocess"):
+            image = preprocess(image, max_side, rgb=not is_bgr)
+        faces = detect_emotions(detector, image, timings)
+        if position < warmup:
+            # First calls build TensorFlow/PyTorch graphs; keep them out of the figures
+            timings.clear()
+            run_started = time.perf_counter()
+            labels.append((name, top_emotion(faces[0])[0] if faces else None))
+            continue
+        per_item.append(dict(timings))
+        timings.clear()
+        faces_total += len(faces)
+        labels.append((name, top_emotion(faces[0])[0] if faces else None))
+    elapsed = time.perf_counter() - run_started
+
+    return {
+        "detector": detector_name,
+        "max_side": max_side,
+        "load_s": round(load_seconds, 2),
+        "elapsed_s": round(elapsed, 3),
+        "items": len(per_item),
+        "faces": faces_total,
+        "per_item": per_item,
+        "labels": labels,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def summarize(result, reference, truths):
+    per_item = result.pop("per_item")
+    labels = result.pop("labels")
+    stages = {}
+    for stage in STAGES:
+        values = np.array([item.get(stage, 0.0) for item in per_item]) * 1000
+        stages[stage] = {
+            "mean_ms": round(float(values.mean()), 2) if len(values) else None,
+            "p95_ms": round(float(np.percentile(values, 95)), 2) if len(values) else None,
+        }
+    totals = np.array([sum(item.values()) for item in per_item]) * 1000
+    elapsed = result["elapsed_s"] or 1e-9
+    result.update({
+        "stages": stages,
+        "total_p50_ms": round(float(np.percentile(totals, 50)), 2) if len(totals) else None,
+        "total_p95_ms": round(float(np.percentile(totals, 95)), 2) if len(totals) else None,
+        "items_per_s": round(result["items"] / elapsed, 2),
+        "faces_per_s": round(result["faces"] / elapsed, 2),
+        "face_found_rate": round(sum(1 for _, label in labels if label) / len(labels), 3) if labels else None,
+    })
+
+    # Agreement with the reference combination, over inputs where the reference found a face
+    compared = [(label, ref) for (_, label), (_, ref) in zip(labels, reference) if ref]
+    result["agreement"] = round(sum(1 for label, ref in compared if label == ref) / len(compared), 3) if compared else None
+    judged = [(label, truths[name]) for name, label in labels if truths.get(name)]
+    result["accuracy"] = round(sum(1 for label, truth in judged if label == truth) / len(judged), 3) if judged else None
+    return result
+
+
+def print_report(results):
+    header = f"{'detector':<8} {'max side':>8} {'items':>6} {'faces':>6} " + " ".join(f"{s + ' ms':>13}" for s in STAGES)
+    header += f" {'p95 ms':>8} {'faces/s':>8} {'load s':>7} {'RSS MB':>7} {'agree':>6} {'acc':>6}"
+    print(header)
+    for r in results:
+        stages = " ".join(f"{r['stages'][s]['mean_ms'] if r['stages'][s]['mean_ms'] is not None else 0:>13.1f}" for s in STAGES)
+        agreement = f"{r['agreement']:.0%}" if r["agreement"] is not None else "-"
+        accuracy = f"{r['accuracy']:.0%}" if r["accuracy"] is not None else "-"
+        print(f"{r['detector']:<8} {r['max_side'] or 'full':>8} {r['items']:>6} {r['faces']:>6} {stages} "
+              f"{r['total_p95_ms'] or 0:>8.1f} {r['faces_per_s']:>8.2f} {r['load_s']:>7.1f} "
+              f"{r['peak_rss_mb'] or 0:>7.0f} {agreement:>6} {accuracy:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    inputs = parser.add_mutually_exclusive_group(required=True)
+    inputs.add_argument("--images", help="folder of images (searched recursively)")
+    inputs.add_argument("--video", help="recorded video file")
+    parser.add_argument("--detectors", default="mtcnn,haar", help="comma-separated: mtcnn, haar")
+    parser.add_argument("--max-sides", default="0,640,320", help="comma-separated longest-side limits (0 = full size)")
+    parser.add_argument("--every", type=int, default=1, help="video: use every n-th frame")
+    parser.add_argument("--limit", type=int, default=0, help="most images/frames to run (0 = all)")
+    parser.add_argument("--warmup", type=int, default=1, help="leading inputs left out of the timings")
+    parser.add_argument("--output", help="write the results as JSON")
+    args = parser.parse_args()
+
+    if args.images:
+        paths = list_images(args.images, args.limit)
+        if not paths:
+            raise SystemExit(f"No images found in {args.images}")
+        source = {"images": paths}
+        truths = {path: _truth(path) for path in paths}
+    else:
+        source = {"video": args.video}
+        truths = {}
+
+    combinations = [(d.strip(), int(m)) for d in args.detectors.split(",") for m in args.max_sides.split(",")]
+    # A fresh process per combination: peak RSS is per process and models stay loaded until exit
+    context = multiprocessing.get_context("spawn")
+    results = []
+    reference = None
+    for detector_name, max_side in combinations:
+        print(f"⏱️ {detector_name} / {max_side or 'full size'}...")
+        with context.Pool(1) as pool:
+            result = pool.apply(run_config, (detector_name, max_side, source, args.every, args.limit, args.warmup))
+        if reference is None:
+            reference = result["labels"]
+        results.append(summarize(result, reference, truths))
+
+    print()
+    print_report(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"source": args.images or args.video, "results": results}, f, indent=2)
+        print(f"\n💾 Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
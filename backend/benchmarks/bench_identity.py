@@ -0,0 +1,97 @@
+"""
+Compare the per-request identity lookup: full `User.query.get()` vs `load_identity()`.
+
+Run from the backend directory:
+    python benchmarks/bench_identity.py --users 2000 --lookups 20000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import inspect
+from models import db, User
+from utils.identity import load_identity, clear_identity_cache, SPOTIFY_COLUMNS
+
+
+def row_bytes(values):
+    return sum(len(v) if isinstance(v, (str, bytes)) else 8 for v in values if v is not None)
+
+
+def seed(n_users, picture_kb):
+    picture = "data:image/png;base64," + "A" * (picture_kb * 1024)
+    db.session.bulk_insert_mappings(User, [
+        {
+            "email": f"user{i}@example.com",
+            "password": "x" * 102,
+            "bio": "Music lover. " * 40,
+            "profile_picture_url": picture,
+            "language": random.choice(["Hindi", "English", "Tamil"]),
+            "spotify_access_token": "BQ" + "t" * 300,
+            "spotify_refresh_token": "AQ" + "r" * 130,
+            "google_access_token": "ya29." + "g" * 200,
+        }
+        for i in range(n_users)
+    ])
+    db.session.commit()
+
+
+def bench(label, fn, ids):
+    start = time.perf_counter()
+    fetched = 0
+    for user_id in ids:
+        fetched += fn(user_id)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed / len(ids) * 1e6:9.1f} µs/lookup {fetched / len(ids):12.0f} bytes/lookup")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--lookups", type=int, default=20000)
+    parser.add_argument("--picture-kb", type=int, default=64, help="size of the stored profile picture data URL")
+    parser.add_argument("--db", default="sqlite:///:memory:")
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = args.db
+    app.config["IDENTITY_CACHE_TTL"] = 15
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        seed(args.users, args.picture_kb)
+        ids = [random.randint(1, args.users) for _ in range(args.lookups)]
+        all_columns = [c.key for c in inspect(User).column_attrs]
+
+        def full_row(user_id):
+            user = db.session.get(User, user_id, options=[db.undefer("*")])
+            size = row_bytes(getattr(user, c) for c in all_columns)
+            db.session.expunge(user)  # a fresh request never hits the identity map
+            return size
+
+        def identity_cold(user_id):
+            clear_identity_cache()
+            ident = load_identity(user_id, *SPOTIFY_COLUMNS)
+            return row_bytes(getattr(ident, c) for c in SPOTIFY_COLUMNS)
+
+        def identity_warm(user_id):
+            ident = load_identity(user_id, *SPOTIFY_COLUMNS)
+            return row_bytes(getattr(ident, c) for c in SPOTIFY_COLUMNS)
+
+        print(f"{args.users} users, {args.lookups} lookups, {args.picture_kb} KB profile pictures")
+        base = bench("User.query.get (full row)", full_row, ids)
+        cold = bench("load_identity (no cache)", identity_cold, ids)
+        for user_id in set(ids):
+            identity_warm(user_id)
+        warm = bench("load_identity (cached)", identity_warm, ids)
+        print(f"speedup: {base / cold:.1f}x uncached, {base / warm:.1f}x cached")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Compare JSON encode time and bytes on the wire for the main list endpoints.
+
+Payloads are synthetic but shaped like the real responses (track/album cards,
+playlist cards, recommendation entries, liked songs).
+
+Run from the backend directory:
+    python benchmarks/bench_json.py --items 15 --iterations 2000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from utils.compression import brotli, compress
+from utils.json_provider import FastJSONProvider, orjson
+from utils.metadata import AlbumRecord, PlaylistRecord, TrackRecord
+
+
+def _image(i, size):
+    return f"https://i.scdn.co/image/ab67616d0000{size}{i:024x}"
+
+
+def payloads(items):
+    tracks = [
+        TrackRecord(f"{i:022d}", f"Track number {i}", [f"Artist {i % 7}", "Featured Artist"], f"Album {i % 5}",
+                    f"spotify:track:{i:022d}", _image(i, "b273"), _image(i, "1e02"))
+        for i in range(items)
+    ]
+    albums = [AlbumRecord(f"{i:022d}", f"New release {i}", [f"Artist {i}"], _image(i, "b273")) for i in range(items)]
+    playlists = [
+        PlaylistRecord(f"{i:022d}", f"Playlist {i}", "The hottest tracks right now, updated every week", 50 + i, _image(i, "b273"))
+        for i in range(items)
+    ]
+    return {
+        "trending-songs": [dict(t.card(), source="Spotify") for t in tracks],
+        "trending-albums": [a.card() for a in albums],
+        "featured-playlists": [p.card(p.description[:50], "Featured") for p in playlists],
+        "recommendations": [dict(t.search_result(), emotion="sad", language="Hindi", wellbeing_mode=False) for t in tracks],
+        "liked-songs": [
+            {"source": "spotify", "external_id": t.uri, "title": t.title, "artist": t.artist_name(), "album": t.album}
+            for t in tracks * 10
+        ],
+    }
+
+
+def time_encode(provider, payload, iterations):
+    # Same arguments Flask passes when building a non-debug response
+    kwargs = {"separators": (",", ":")} if type(provider) is DefaultJSONProvider else {}
+    provider.dumps(payload, **kwargs)  # warm up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        provider.dumps(payload, **kwargs)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=15)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--level", type=int, default=6, help="compression level (COMPRESS_LEVEL)")
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    stdlib = DefaultJSONProvider(app)
+    fast = FastJSONProvider(app)
+    print(f"orjson: {'yes' if orjson else 'no (stdlib fallback)'}, brotli: {'yes' if brotli else 'no'}")
+    print(f"{'endpoint':<20}{'stdlib µs':>11}{'fast µs':>9}{'bytes':>8}{'gzip':>7}{'br':>7}")
+    for name, payload in payloads(args.items).items():
+        body = fast.dumps(payload).encode("utf-8")
+        assert json.loads(body) == json.loads(stdlib.dumps(payload)), f"{name}: providers disagree"
+        gzipped = len(compress(body, "gzip", args.level))
+        brotlied = len(compress(body, "br", args.level)) if brotli else "-"
+        print(f"{name:<20}{time_encode(stdlib, payload, args.iterations):>11.1f}"
+              f"{time_encode(fast, payload, args.iterations):>9.1f}{len(body):>8}{gzipped:>7}{brotlied:>7}")
+
+
+if __name__ == "__main__":
+    main()
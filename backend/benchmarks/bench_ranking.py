@@ -0,0 +1,42 @@
+"""
+Time the audio-feature ranking stage used by /api/recommendations.
+
+Run from the backend directory:
+    python benchmarks/bench_ranking.py --candidates 5000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from utils.audio_features import FEATURES, rank, target_vector
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=5000)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--unknown", type=float, default=0.1, help="share of candidates without audio features")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    features = rng.random((args.candidates, len(FEATURES)), dtype=np.float32)
+    features[rng.random(args.candidates) < args.unknown] = np.nan
+    targets = [target_vector("sad"), target_vector("sad", "motivational"), target_vector("angry", "calm")]
+
+    for target in targets:
+        rank(features, target)  # warm up
+    start = time.perf_counter()
+    for i in range(args.iterations):
+        order = rank(features, targets[i % len(targets)])
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.candidates} candidates: {elapsed / args.iterations * 1e6:.1f} µs per ranking")
+    print(f"best match for last target: {features[order[0]]}")
+
+
+if __name__ == "__main__":
+    main()
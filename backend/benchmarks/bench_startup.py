@@ -0,0 +1,187 @@
+"""
+Measure how fast a fresh worker can answer its first request.
+
+Each run starts a new interpreter that imports `app` and serves GET / through
+the test client, timing the import and the first response separately. A
+`python -X importtime` run lists the slowest modules, and the set of heavy
+libraries (TensorFlow, FER, OpenCV, PIL) that got imported on the way. With
+--serve, the real server is also started and polled until / answers.
+
+The results are written as JSON (e.g. for a CI job to keep as an artifact). The
+exit status is 1 when the median time to first response exceeds --max-seconds
+or a --forbid module was imported, so the script can also fail a build.
+
+Run from the backend directory:
+    python benchmarks/bench_startup.py --runs 5
+    python benchmarks/bench_startup.py --serve --max-seconds 1.0 --output startup.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shlex
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+response = app.app.test_client().get("/")
+answered = time.perf_counter()
+print(json.dumps({
+    "import_s": imported - started,
+    "first_response_s": answered - started,
+    "status": response.status_code,
+    "modules": sorted(name for name in sys.modules if "." not in name),
+}))
+"""
+
+
+def _env(workdir):
+    # A throwaway database and caches: startup must not depend on (or change) real data
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'startup.sqlite3')}",
+        "METADATA_CACHE_PATH": os.path.join(workdir, "metadata.sqlite3"),
+        "SPOTIFY_BUDGET_PATH": os.path.join(workdir, "budget.sqlite3"),
+        "AUDIO_FEATURES_CACHE_PATH": os.path.join(workdir, "audio_features.npz"),
+        "TRACE_EXPORT_PATH": os.path.join(workdir, "traces.jsonl"),
+        "PYTHONDONTWRITEBYTECODE": "1",
+    })
+    return env
+
+
+def probe(env):
+    started = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", PROBE], cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+    if out.returncode != 0:
+        raise SystemExit(f"Importing app failed:\n{out.stderr[-2000:]}")
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    result["process_s"] = time.perf_counter() - started
+    return result
+
+
+def import_profile(env, top):
+    """Slowest modules by cumulative and self import time, from `python -X importtime`"""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"], cwd=BACKEND_DIR, env=env,
+                         capture_output=True, text=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|", 2))
+        if not own.isdigit():
+            continue  # Header line
+        rows.append({"module": name, "self_ms": int(own) / 1000, "cumulative_ms": int(cumulative) / 1000})
+    by_cumulative = sorted((r for r in rows if "." not in r["module"]), key=lambda r: r["cumulative_ms"], reverse=True)
+    by_self = sorted(rows, key=lambda r: r["self_ms"], reverse=True)
+    return by_cumulative[:top], by_self[:top]
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def serve(env, command, timeout):
+    """Seconds from spawning the server process until GET / returns 200"""
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(shlex.split(command.format(port=port, python=sys.executable)), cwd=BACKEND_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise SystemExit(f"Server exited with {process.returncode} before answering")
+            try:
+                if requests.get(f"http://127.0.0.1:{port}/", timeout=0.5).status_code == 200:
+                    return time.perf_counter() - started
+            except requests.RequestException:
+                pass
+            time.sleep(0.01)
+        raise SystemExit(f"Server did not answer within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to time")
+    parser.add_argument("--top", type=int, default=15, help="slowest modules to report")
+    parser.add_argument("--serve", action="store_true", help="also time a real server until / answers")
+    parser.add_argument("--app-command", default="{python} -m flask --app app run --port {port} --no-reload --no-debugger",
+                        help="server command for --serve ({port} and {python} are filled in)")
+    parser.add_argument("--forbid", default="tensorflow,fer,cv2,PIL",
+                        help="comma-separated modules that must not be imported by `import app`")
+    parser.add_argument("--max-seconds", type=float, default=0, help="fail when the median time to first response exceeds this")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/startup-<time>.json)")
+    args = parser.parse_args()
+
+    started_at = datetime.datetime.now()
+    with tempfile.TemporaryDirectory(prefix="moodmusic-startup-") as workdir:
+        env = _env(workdir)
+        probe(env)  # Warm the OS file cache so the first run isn't an outlier
+        runs = [probe(env) for _ in range(args.runs)]
+        by_cumulative, by_self = import_profile(env, args.top)
+        serve_s = [serve(env, args.app_command, 60) for _ in range(args.runs)] if args.serve else []
+
+    forbidden = [m.strip() for m in args.forbid.split(",") if m.strip()]
+    loaded = sorted(set(forbidden) & set(runs[-1]["modules"]))
+    results = {
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "runs": args.runs,
+        "import_s": {"median": statistics.median(r["import_s"] for r in runs), "max": max(r["import_s"] for r in runs)},
+        "first_response_s": {"median": statistics.median(r["first_response_s"] for r in runs),
+                             "max": max(r["first_response_s"] for r in runs)},
+        "process_s": {"median": statistics.median(r["process_s"] for r in runs)},
+        "serve_s": {"median": statistics.median(serve_s), "max": max(serve_s)} if serve_s else None,
+        "forbidden_loaded": loaded,
+        "slowest_packages": by_cumulative,
+        "slowest_modules": by_self,
+    }
+
+    print(f"import app            median {results['import_s']['median'] * 1000:8.1f} ms   max {results['import_s']['max'] * 1000:8.1f} ms")
+    print(f"first response (/)    median {results['first_response_s']['median'] * 1000:8.1f} ms   "
+          f"max {results['first_response_s']['max'] * 1000:8.1f} ms")
+    print(f"whole process         median {results['process_s']['median'] * 1000:8.1f} ms")
+    if serve_s:
+        print(f"server answers /      median {results['serve_s']['median'] * 1000:8.1f} ms   max {results['serve_s']['max'] * 1000:8.1f} ms")
+    print(f"\n{'package':<40} {'cumulative ms':>14}")
+    for row in by_cumulative:
+        print(f"{row['module']:<40} {row['cumulative_ms']:>14.1f}")
+    print(f"\n{'module':<40} {'self ms':>14}")
+    for row in by_self:
+        print(f"{row['module']:<40} {row['self_ms']:>14.1f}")
+
+    output = args.output or os.path.join(BACKEND_DIR, "benchmarks", "results", f"startup-{started_at:%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results saved to {output}")
+
+    failed = False
+    if loaded:
+        print(f"❌ import app loaded {', '.join(loaded)}")
+        failed = True
+    if args.max_seconds and results["first_response_s"]["median"] > args.max_seconds:
+        print(f"❌ Median time to first response is above {args.max_seconds}s")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,464 @@
+"""
+Load test for the Flask API: RPS and p50/p95/p99 latency per route.
+
+Boots tools/fake_upstream.py and the app as subprocesses against a seeded SQLite
+database, then runs scripted user journeys from concurrent virtual users:
+    landing    GET /, public trending songs / featured playlists / artists
+    login      POST /login
+    home       GET /api/me, trending songs, featured playlists, artists
+    emotion    POST /api/detect-emotion, POST /log_emotion
+    recommend  GET /api/recommendations
+    like       POST /api/songs/like, GET /api/liked-songs
+    history    POST /api/song-history, GET /api/song-history
+
+The database is seeded once (default 100k users, 20 emotion logs and 10 plays
+each) and reused by later runs; --reseed rebuilds it. Results are written as
+JSON; pass an earlier file with --compare to print the change per route.
+
+Run from the backend directory:
+    python benchmarks/loadtest.py --users 100000 --clients 32 --duration 60
+    python benchmarks/loadtest.py --compare benchmarks/results/loadtest-20260101-120000.json
+    python benchmarks/loadtest.py --app-command "gunicorn -w 4 -b 127.0.0.1:{port} app:app"
+"""
+import argparse
+import base64
+import datetime
+import io
+import json
+import os
+import platform
+import random
+import shlex
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+EMOTIONS = ("happy", "sad", "angry", "neutral", "surprise", "fear", "calm")
+LANGUAGES = ("English", "Hindi", "Global", "Tamil", "Bengali")
+PASSWORD = "loadtest-password"
+
+
+def _email(index):
+    return f"loadtest{index}@example.test"
+
+
+def seed_database(path, users, logs_per_user, plays_per_user, likes_per_user, spotify_share, chunk=20000):
+    """Create the schema through the models, then bulk-insert rows with plain sqlite3"""
+    from flask import Flask
+    from werkzeug.security import generate_password_hash
+    from models import db
+
+    if os.path.exists(path):
+        os.remove(path)
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{path}"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        db.engine.dispose()
+
+    # One hash for everyone: hashing 100k passwords would dominate seeding
+    password_hash = generate_password_hash(PASSWORD)
+    rng = random.Random(0)
+    now = datetime.datetime.utcnow()
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+
+    def insert(sql, rows):
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= chunk:
+                conn.executemany(sql, batch)
+                batch.clear()
+        if batch:
+            conn.executemany(sql, batch)
+        conn.commit()
+
+    def user_rows():
+        for i in range(1, users + 1):
+            linked = rng.random() < spotify_share
+            yield (
+                i, _email(i), password_hash, True, now - datetime.timedelta(days=rng.randrange(720)),
+                "light", rng.choice(LANGUAGES), True, True, False,
+                f"spotify-user-{i}" if linked else None, f"Listener {i}" if linked else None,
+                f"fake-linked-{i}" if linked else None, f"fake-refresh-{i}" if linked else None,
+            )
+
+    started = time.perf_counter()
+    insert(
+        "INSERT INTO users (id, email, password, consent_given, created_at, theme, language, camera_access_enabled,"
+        " notifications_enabled, add_to_home_enabled, spotify_id, spotify_display_name, spotify_access_token,"
+        " spotify_refresh_token) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        user_rows(),
+    )
+
+    def log_rows():
+        for user_id in range(1, users + 1):
+            for _ in range(logs_per_user):
+                yield rng.choice(EMOTIONS), now - datetime.timedelta(minutes=rng.randrange(90 * 24 * 60)), user_id
+
+    insert("INSERT INTO emotion_logs (emotion, timestamp, user_id) VALUES (?, ?, ?)", log_rows())
+
+    def track_rows(count, kind):
+        for user_id in range(1, users + 1):
+            for n in rng.sample(range(5000), count):
+                yield (user_id, "spotify", f"spotify:track:{kind}{n:018d}", f"Seeded track {n}", f"Artist {n % 300}",
+                       f"Album {n % 900}", now - datetime.timedelta(minutes=rng.randrange(365 * 24 * 60)))
+
+    insert("INSERT INTO song_history (user_id, source, external_id, title, artist, album, played_at)"
+           " VALUES (?, ?, ?, ?, ?, ?, ?)", track_rows(plays_per_user, "play"))
+    insert("INSERT INTO liked_songs (user_id, source, external_id, title, artist, album)"
+           " VALUES (?, ?, ?, ?, ?, ?)", (row[:6] for row in track_rows(likes_per_user, "like")))
+    conn.execute("ANALYZE")
+    conn.close()
+    print(f"🌱 Seeded {users} users, {users * logs_per_user} emotion logs, {users * plays_per_user} plays and "
+          f"{users * likes_per_user} likes in {time.perf_counter() - started:.0f}s")
+
+
+def seeded_users(path):
+    try:
+        with sqlite3.connect(path) as conn:
+            return conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+    except sqlite3.Error:
+        return 0
+
+
+def _wait_until_up(url, process, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with status {process.returncode}")
+        try:
+            requests.get(url, timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+def start_servers(args, workdir):
+    upstream_url = f"http://127.0.0.1:{args.upstream_port}"
+    upstream = subprocess.Popen(
+        [sys.executable, os.path.join(BACKEND_DIR, "tools", "fake_upstream.py"), "--port", str(args.upstream_port),
+         "--latency-ms", str(args.upstream_latency_ms), "--jitter-ms", str(args.upstream_jitter_ms),
+         "--error-rate", str(args.upstream_error_rate), "--rate-limit-rate", str(args.upstream_rate_limit_rate)],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.abspath(args.db)}",
+        SPOTIFY_CLIENT_ID="loadtest", SPOTIFY_CLIENT_SECRET="loadtest",
+        SPOTIFY_API_BASE=upstream_url, SPOTIFY_ACCOUNTS_BASE=upstream_url,
+        GOOGLE_ACCOUNTS_BASE=upstream_url, GOOGLE_OAUTH_BASE=upstream_url, GOOGLE_API_BASE=upstream_url,
+        # Fresh caches every run so results don't depend on an earlier one
+        METADATA_CACHE_PATH=os.path.join(workdir, "metadata.sqlite3"),
+        SPOTIFY_BUDGET_PATH=os.path.join(workdir, "spotify_budget.sqlite3"),
+        AUDIO_FEATURES_CACHE_PATH=os.path.join(workdir, "audio_features.npz"),
+    )
+    env.update(item.split("=", 1) for item in args.env)
+    command = shlex.split(args.app_command.format(port=args.port))
+    log = open(os.path.join(workdir, "app.log"), "w")
+    app = subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+    try:
+        _wait_until_up(upstream_url + "/_control", upstream, 30)
+        _wait_until_up(f"http://127.0.0.1:{args.port}/", app, args.boot_timeout)
+    except Exception:
+        stop_servers(upstream, app)
+        log.close()
+        with open(log.name) as f:
+            print(f.read()[-4000:])
+        raise
+    return upstream, app
+
+
+def stop_servers(*processes):
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def _face_image(path):
+    """Base64 JPEG for /api/detect-emotion: the given file, or a flat grey frame"""
+    if path:
+        with open(path, "rb") as f:
+            data = f.read()
+    else:
+        from PIL import Image
+        buffer = io.BytesIO()
+        Image.new("RGB", (320, 240), (128, 128, 128)).save(buffer, format="JPEG")
+        data = buffer.getvalue()
+    return "data:image/jpeg;base64," + base64.b64encode(data).decode("ascii")
+
+
+class Recorder:
+    """Latencies and status codes per route, shared by all clients"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self._lock = threading.Lock()
+
+    def add(self, route, seconds, status):
+        with self._lock:
+            self.latencies[route].append(seconds)
+            self.statuses[route][status] += 1
+
+
+class Client:
+    """One virtual user: logs in as a random seeded account and runs journeys"""
+
+    def __init__(self, base_url, users, recorder, rng, image, think_time):
+        self.base_url = base_url
+        self.users = users
+        self.recorder = recorder
+        self.rng = rng
+        self.image = image
+        self.think_time = think_time
+        self.session = requests.Session()
+        self.headers = {}
+        self.language = "English"
+        self.last_tracks = []
+
+    def call(self, method, path, route=None, **kwargs):
+        route = route or f"{method} {path.split('?')[0]}"
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url + path, headers=self.headers, timeout=30, **kwargs)
+            status = response.status_code
+        except requests.RequestException:
+            response, status = None, "error"
+        self.recorder.add(route, time.perf_counter() - started, status)
+        if self.think_time:
+            time.sleep(self.rng.uniform(0, 2 * self.think_time))
+        return response
+
+    def landing(self):
+        self.headers = {}
+        self.call("GET", "/")
+        self.call("GET", "/api/public/trending-songs")
+        self.call("GET", "/api/public/featured-playlists")
+        self.call("GET", "/api/public/artists")
+
+    def login(self):
+        self.headers = {}
+        response = self.call("POST", "/login", json={"email": _email(self.rng.randint(1, self.users)), "password": PASSWORD})
+        if response is not None and response.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {response.json()['token']}"}
+        return bool(self.headers)
+
+    def home(self):
+        self.call("GET", "/api/me")
+        self.call("GET", "/api/trending-songs")
+        self.call("GET", "/api/featured-playlists")
+        self.call("GET", "/api/artists")
+
+    def emotion(self):
+        self.call("POST", "/api/detect-emotion", json={"image": self.image})
+        self.call("POST", "/log_emotion", json={"emotion": self.rng.choice(EMOTIONS)})
+
+    def recommend(self):
+        self.language = self.rng.choice(LANGUAGES)
+        response = self.call("GET", f"/api/recommendations?language={self.language}", route="GET /api/recommendations")
+        if response is not None and response.status_code == 200 and isinstance(response.json(), list):
+            self.last_tracks = response.json()
+
+    def _some_track(self):
+        if self.last_tracks:
+            item = self.rng.choice(self.last_tracks)
+            return {"source": "spotify", "external_id": item.get("spotifyUri") or item["id"],
+                    "title": item.get("title") or "Unknown", "artist": item.get("artist"), "album": item.get("album")}
+        n = self.rng.randrange(5000)
+        return {"source": "spotify", "external_id": f"spotify:track:new{n:018d}", "title": f"Track {n}"}
+
+    def like(self):
+        self.call("POST", "/api/songs/like", json=self._some_track())
+        self.call("GET", "/api/liked-songs")
+
+    def history(self):
+        self.call("POST", "/api/song-history", json=self._some_track())
+        self.call("GET", "/api/song-history")
+
+    def journey(self):
+        self.landing()
+        if not self.login():
+            return
+        self.home()
+        self.emotion()
+        self.recommend()
+        if self.rng.random() < 0.5:
+            self.like()
+        self.history()
+
+
+def run_load(base_url, args, recorder):
+    image = _face_image(args.face_image)
+    stop_at = time.monotonic() + args.duration
+    journeys = [0] * args.clients
+
+    def worker(index):
+        client = Client(base_url, args.users, recorder, random.Random(args.seed + index), image, args.think_time)
+        while time.monotonic() < stop_at:
+            client.journey()
+            journeys[index] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(args.clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started, sum(journeys)
+
+
+def percentile(ordered, q):
+    """Nearest-rank percentile of an ascending list"""
+    if not ordered:
+        return None
+    index = max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(recorder, elapsed):
+    routes = {}
+    for route, values in sorted(recorder.latencies.items()):
+        ordered = sorted(values)
+        statuses = recorder.statuses[route]
+        failures = sum(count for status, count in statuses.items() if status == "error" or status >= 500)
+        routes[route] = {
+            "requests": len(ordered),
+            "rps": round(len(ordered) / elapsed, 2),
+            "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+            "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+            "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+            "max_ms": round(ordered[-1] * 1000, 2),
+            "error_rate": round(failures / len(ordered), 4),
+            "statuses": {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        }
+    everything = sorted(v for values in recorder.latencies.values() for v in values)
+    total = {
+        "requests": len(everything),
+        "rps": round(len(everything) / elapsed, 2),
+        "p50_ms": round(percentile(everything, 50) * 1000, 2) if everything else None,
+        "p95_ms": round(percentile(everything, 95) * 1000, 2) if everything else None,
+        "p99_ms": round(percentile(everything, 99) * 1000, 2) if everything else None,
+    }
+    return routes, total
+
+
+def print_report(routes, total, baseline=None):
+    print(f"\n{'route':<36} {'reqs':>7} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for route, r in routes.items():
+        print(f"{route:<36} {r['requests']:>7} {r['rps']:>8.1f} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} "
+              f"{r['p99_ms']:>9.1f} {r['error_rate']:>7.1%}")
+    print(f"{'TOTAL':<36} {total['requests']:>7} {total['rps']:>8.1f} {total['p50_ms'] or 0:>9.1f} "
+          f"{total['p95_ms'] or 0:>9.1f} {total['p99_ms'] or 0:>9.1f}")
+    if not baseline:
+        return
+    print(f"\nChange against {baseline['path']} (positive = slower / fewer requests per second):")
+    print(f"{'route':<36} {'rps':>9} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for route, r in routes.items():
+        old = baseline["routes"].get(route)
+        if not old:
+            continue
+
+        def change(key, lower_is_better=True):
+            if not old[key]:
+                return "n/a"
+            delta = (r[key] - old[key]) / old[key]
+            return f"{delta if lower_is_better else -delta:+.0%}"
+
+        print(f"{route:<36} {change('rps', False):>9} {change('p50_ms'):>9} {change('p95_ms'):>9} {change('p99_ms'):>9}")
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=os.path.join(BACKEND_DIR, "instance", "loadtest.sqlite3"))
+    parser.add_argument("--reseed", action="store_true", help="rebuild the database even if it is already seeded")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--logs-per-user", type=int, default=20)
+    parser.add_argument("--plays-per-user", type=int, default=10)
+    parser.add_argument("--likes-per-user", type=int, default=3)
+    parser.add_argument("--spotify-share", type=float, default=0.3, help="share of users with a linked Spotify account")
+    parser.add_argument("--clients", type=int, default=16, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=60, help="seconds of load")
+    parser.add_argument("--think-time", type=float, default=0.0, help="mean pause between requests of one client")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--face-image", help="JPEG sent to /api/detect-emotion (default: a blank frame)")
+    parser.add_argument("--port", type=int, default=5077)
+    parser.add_argument("--app-command", default=f"{shlex.quote(sys.executable)} -m flask --app app run --port {{port}} --with-threads --no-reload --no-debugger",
+                        help="command that serves the app on {port}")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="extra app environment")
+    parser.add_argument("--boot-timeout", type=float, default=120)
+    parser.add_argument("--upstream-port", type=int, default=5055)
+    parser.add_argument("--upstream-latency-ms", type=float, default=50)
+    parser.add_argument("--upstream-jitter-ms", type=float, default=25)
+    parser.add_argument("--upstream-error-rate", type=float, default=0.0)
+    parser.add_argument("--upstream-rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/loadtest-<time>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = dict(json.load(f), path=args.compare)
+
+    if args.reseed or seeded_users(args.db) < args.users:
+        seed_database(args.db, args.users, args.logs_per_user, args.plays_per_user, args.likes_per_user, args.spotify_share)
+
+    recorder = Recorder()
+    with tempfile.TemporaryDirectory(prefix="loadtest-") as workdir:
+        upstream, app = start_servers(args, workdir)
+        try:
+            print(f"🚦 {args.clients} clients for {args.duration:.0f}s against http://127.0.0.1:{args.port}")
+            elapsed, journeys = run_load(f"http://127.0.0.1:{args.port}", args, recorder)
+            upstream_calls = requests.get(f"http://127.0.0.1:{args.upstream_port}/_stats", timeout=5).json()
+        finally:
+            stop_servers(app, upstream)
+
+    routes, total = summarize(recorder, elapsed)
+    print_report(routes, total, baseline)
+
+    started_at = datetime.datetime.now()
+    output = args.output or os.path.join(BACKEND_DIR, "benchmarks", "results", f"loadtest-{started_at:%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "created_at": started_at.isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "settings": {key: value for key, value in vars(args).items() if key not in ("compare", "output")},
+            "elapsed_s": round(elapsed, 2),
+            "journeys": journeys,
+            "total": total,
+            "routes": routes,
+            "upstream_calls": upstream_calls,
+        }, f, indent=2)
+    print(f"\n💾 Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
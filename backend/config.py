@@ -9,6 +9,18 @@ load_dotenv(dotenv_path=env_path)
 class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "sqlite:///moodmusic.db")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Optional read-only replica used by list endpoints (same schema as DATABASE_URL)
+    DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+    # Connection pool for server databases (and file-based SQLite)
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    # SQLite tuning: WAL so workers can write concurrently without "database is locked"
+    SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
     SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret")
     SPOTIFY_CLIENT_ID = os.getenv("SPOTIFY_CLIENT_ID")
     SPOTIFY_CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET")
@@ -17,4 +29,97 @@ class Config:
     GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET")
     GOOGLE_REDIRECT_URI = os.getenv("GOOGLE_REDIRECT_URI")
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "dev-jwt-secret-key-change-in-production")
+    # Shared secret for /api/admin/* (sent as X-Admin-Token); admin routes are disabled when unset
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+    # Seconds a worker may reuse a user's identity columns before re-reading them (0 disables)
+    IDENTITY_CACHE_TTL = int(os.getenv("IDENTITY_CACHE_TTL", "15"))
+    # Most users one worker keeps identity columns for (least recently used out)
+    IDENTITY_CACHE_SIZE = int(os.getenv("IDENTITY_CACHE_SIZE", "10000"))
+    # Accounts with more rows than this are deleted in background chunks (0 = always inline)
+    ACCOUNT_DELETE_BACKGROUND_THRESHOLD = int(os.getenv("ACCOUNT_DELETE_BACKGROUND_THRESHOLD", "50000"))
+    ACCOUNT_DELETE_CHUNK_SIZE = int(os.getenv("ACCOUNT_DELETE_CHUNK_SIZE", "1000"))
+    # Days of raw rows kept per log table before `flask compact-logs` rolls them into
+    # daily summaries (0 = keep forever)
+    RETENTION_DAYS = {
+        "emotion_logs": int(os.getenv("RETENTION_DAYS_EMOTION_LOGS", "90")),
+        "voice_command_logs": int(os.getenv("RETENTION_DAYS_VOICE_COMMAND_LOGS", "30")),
+        "gesture_logs": int(os.getenv("RETENTION_DAYS_GESTURE_LOGS", "30")),
+        "song_history": int(os.getenv("RETENTION_DAYS_SONG_HISTORY", "365")),
+    }
+    # Local recommendation catalog (curated_songs.json + Song table)
+    CURATED_SONGS_PATH = os.getenv("CURATED_SONGS_PATH", str(Path(__file__).parent / "curated_songs.json"))
+    CATALOG_REFRESH_INTERVAL = int(os.getenv("CATALOG_REFRESH_INTERVAL", "60"))
+    # Shared Spotify candidate pools per (emotion, language), refreshed in the background
+    CANDIDATE_POOL_TTL = int(os.getenv("CANDIDATE_POOL_TTL", "1800"))
+    CANDIDATE_POOL_SIZE = int(os.getenv("CANDIDATE_POOL_SIZE", "100"))
+    CANDIDATE_POOL_WORKERS = int(os.getenv("CANDIDATE_POOL_WORKERS", "2"))
+    CANDIDATE_POOL_MAX_KEYS = int(os.getenv("CANDIDATE_POOL_MAX_KEYS", "200"))
+    # On-disk cache of Spotify audio features used to rank candidates
+    AUDIO_FEATURES_CACHE_PATH = os.getenv("AUDIO_FEATURES_CACHE_PATH", str(Path(__file__).parent / "instance" / "audio_features.npz"))
+    # How far well-being mode moves the ranking target from the current mood towards the desired one (0..1)
+    WELLBEING_BLEND = float(os.getenv("WELLBEING_BLEND", "0.6"))
+    RETENTION_CHUNK_SIZE = int(os.getenv("RETENTION_CHUNK_SIZE", "5000"))
+    # Per-user Bloom filter of played/liked tracks excluded from recommendations (bits per generation, two generations).
+    # The defaults give ~1.2% false positives per full generation, up to ~2.3% once both generations are full
+    HISTORY_FILTER_BITS = int(os.getenv("HISTORY_FILTER_BITS", "16384"))
+    HISTORY_FILTER_HASHES = int(os.getenv("HISTORY_FILTER_HASHES", "4"))
+    # Most tracks one artist (or album) may take in a recommendation/trending list
+    DIVERSITY_MAX_PER_ARTIST = int(os.getenv("DIVERSITY_MAX_PER_ARTIST", "2"))
+    # On-disk store of normalized Spotify track/album/artist/playlist metadata
+    METADATA_CACHE_PATH = os.getenv("METADATA_CACHE_PATH", str(Path(__file__).parent / "instance" / "metadata.sqlite3"))
+    METADATA_MAX_AGE = int(os.getenv("METADATA_MAX_AGE", str(7 * 24 * 3600)))
+    # Records kept in memory per worker (least recently used are dropped first)
+    METADATA_MAX_RECORDS = int(os.getenv("METADATA_MAX_RECORDS", "50000"))
+    # Response compression (brotli when installed, otherwise gzip) for bodies of at least this many bytes
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+    COMPRESS_LEVEL = int(os.getenv("COMPRESS_LEVEL", "6"))
+    # Cache-Control for anonymous /api/public/* responses: browser (max-age) and CDN/proxy (s-maxage) lifetimes
+    PUBLIC_CACHE_MAX_AGE = int(os.getenv("PUBLIC_CACHE_MAX_AGE", "60"))
+    PUBLIC_CACHE_S_MAXAGE = int(os.getenv("PUBLIC_CACHE_S_MAXAGE", "300"))
+    # Spotify request budget (token bucket). Set SPOTIFY_BUDGET_PATH to share one bucket between worker processes
+    SPOTIFY_BUDGET_CAPACITY = int(os.getenv("SPOTIFY_BUDGET_CAPACITY", "100"))
+    SPOTIFY_BUDGET_PER_SECOND = float(os.getenv("SPOTIFY_BUDGET_PER_SECOND", "3"))
+    SPOTIFY_BUDGET_MAX_WAIT = float(os.getenv("SPOTIFY_BUDGET_MAX_WAIT", "0.5"))
+    SPOTIFY_BUDGET_PATH = os.getenv("SPOTIFY_BUDGET_PATH", str(Path(__file__).parent / "instance" / "spotify_budget.sqlite3"))
+    # Spotify Web API timeouts (seconds) and per-endpoint circuit breakers
+    SPOTIFY_CONNECT_TIMEOUT = float(os.getenv("SPOTIFY_CONNECT_TIMEOUT", "3.05"))
+    SPOTIFY_READ_TIMEOUT = float(os.getenv("SPOTIFY_READ_TIMEOUT", "5"))
+    SPOTIFY_BREAKER_WINDOW = int(os.getenv("SPOTIFY_BREAKER_WINDOW", "20"))
+    SPOTIFY_BREAKER_MIN_CALLS = int(os.getenv("SPOTIFY_BREAKER_MIN_CALLS", "5"))
+    SPOTIFY_BREAKER_ERROR_RATE = float(os.getenv("SPOTIFY_BREAKER_ERROR_RATE", "0.5"))
+    SPOTIFY_BREAKER_OPEN_SECONDS = float(os.getenv("SPOTIFY_BREAKER_OPEN_SECONDS", "30"))
+    # Last good responses served while Spotify is failing: shared (client-credentials) bodies, and a
+    # smaller, short-lived store for per-user tokens. Sizes are bytes of response body per worker
+    SPOTIFY_LAST_GOOD_BYTES = int(os.getenv("SPOTIFY_LAST_GOOD_BYTES", str(32 * 1024 * 1024)))
+    SPOTIFY_LAST_GOOD_USER_BYTES = int(os.getenv("SPOTIFY_LAST_GOOD_USER_BYTES", str(4 * 1024 * 1024)))
+    SPOTIFY_LAST_GOOD_USER_TTL = int(os.getenv("SPOTIFY_LAST_GOOD_USER_TTL", "300"))
+    # Upstream hosts. Point them all at tools/fake_upstream.py for load tests and offline development
+    SPOTIFY_API_BASE = os.getenv("SPOTIFY_API_BASE", "https://api.spotify.com")
+    SPOTIFY_ACCOUNTS_BASE = os.getenv("SPOTIFY_ACCOUNTS_BASE", "https://accounts.spotify.com")
+    GOOGLE_ACCOUNTS_BASE = os.getenv("GOOGLE_ACCOUNTS_BASE", "https://accounts.google.com")
+    GOOGLE_OAUTH_BASE = os.getenv("GOOGLE_OAUTH_BASE", "https://oauth2.googleapis.com")
+    GOOGLE_API_BASE = os.getenv("GOOGLE_API_BASE", "https://www.googleapis.com")
+    # Logging: level and "text" or "json" (one object per line, for log shippers)
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+    # When set, /metrics requires "Authorization: Bearer <METRICS_TOKEN>"
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+    # Tracing: spans per request, outbound call, SQL statement and inference stage. Traces are
+    # exported (JSON lines to TRACE_EXPORT_PATH and/or POSTed to TRACE_EXPORT_URL) when sampled
+    # or when the request took at least TRACE_SLOW_MS (0 disables); Server-Timing is opt-in
+    TRACE_ENABLED = os.getenv("TRACE_ENABLED", "1") == "1"
+    TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.01"))
+    TRACE_SLOW_MS = int(os.getenv("TRACE_SLOW_MS", "2000"))
+    TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", str(Path(__file__).parent / "instance" / "traces.jsonl"))
+    TRACE_EXPORT_URL = os.getenv("TRACE_EXPORT_URL")
+    TRACE_SERVER_TIMING = os.getenv("TRACE_SERVER_TIMING", "0") == "1"
+    # On-demand profiling (POST /api/admin/profile): folded-stack output directory and longest session
+    PROFILE_DIR = os.getenv("PROFILE_DIR", str(Path(__file__).parent / "instance" / "profiles"))
+    PROFILE_MAX_SECONDS = int(os.getenv("PROFILE_MAX_SECONDS", "300"))
+    # Routes this process serves: all, web, feed, inference, or blueprint names ("auth,settings"); see app.ROLES
+    APP_ROLE = os.getenv("APP_ROLE", "all")
+    # Load the emotion detector (TensorFlow) in the background at startup instead of on the first request
+    EMOTION_PRELOAD = os.getenv("EMOTION_PRELOAD", "0") == "1"
+    # Mood-transition playlists: weight of the track-to-track jump against closeness to the mood path
+    MOOD_TRANSITION_SMOOTHNESS = float(os.getenv("MOOD_TRANSITION_SMOOTHNESS", "0.5"))
 
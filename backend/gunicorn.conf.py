@@ -0,0 +1,12 @@
+"""
+gunicorn hooks for multi-process metrics.
+
+Point PROMETHEUS_MULTIPROC_DIR at an empty, writable directory before starting
+gunicorn so every worker writes its metrics there and /metrics adds them up:
+    PROMETHEUS_MULTIPROC_DIR=/tmp/moodmusic-metrics gunicorn -c gunicorn.conf.py -w 4 app:app
+"""
+
+
+def child_exit(server, worker):
+    from utils.metrics import mark_process_dead
+    mark_process_dead(worker.pid)
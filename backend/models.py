@@ -11,13 +11,17 @@ class User(db.Model):
     password = db.Column(db.String(128))  # If using JWT
     consent_given = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Set when a background purge is scheduled; `flask purge-accounts` finishes any left behind
+    deletion_requested_at = db.Column(db.DateTime)
 
     # Profile fields
     first_name = db.Column(db.String(120))
     username = db.Column(db.String(120), unique=True)
     phone_number = db.Column(db.String(20))
-    bio = db.Column(db.Text)
-    profile_picture_url = db.Column(db.String(500))
+    # Heavy columns (profile_picture_url may hold a base64 data URL) are deferred;
+    # routes that render the profile undefer the "profile" group explicitly.
+    bio = db.deferred(db.Column(db.Text), group='profile')
+    profile_picture_url = db.deferred(db.Column(db.String(500)), group='profile')
 
     # Preferences
     theme = db.Column(db.String(20), default='light')  # 'light' or 'dark'
@@ -30,15 +34,15 @@ class User(db.Model):
     spotify_id = db.Column(db.String(120), unique=True)
     spotify_display_name = db.Column(db.String(120))
     spotify_email = db.Column(db.String(120), unique=True)
-    spotify_access_token = db.Column(db.Text)
-    spotify_refresh_token = db.Column(db.Text)
+    spotify_access_token = db.deferred(db.Column(db.Text), group='oauth')
+    spotify_refresh_token = db.deferred(db.Column(db.Text), group='oauth')
 
     # Google fields
     google_id = db.Column(db.String(120), unique=True)
     google_email = db.Column(db.String(120))
     google_name = db.Column(db.String(120))
-    google_access_token = db.Column(db.Text)
-    google_refresh_token = db.Column(db.Text)
+    google_access_token = db.deferred(db.Column(db.Text), group='oauth')
+    google_refresh_token = db.deferred(db.Column(db.Text), group='oauth')
 
     emotions = db.relationship('EmotionLog', backref='user', lazy=True)
     voice_commands = db.relationship('VoiceCommandLog', backref='user', lazy=True)
@@ -48,7 +52,7 @@ class EmotionLog(db.Model):
     __tablename__ = 'emotion_logs'  # ✅ Explicit name
     id = db.Column(db.Integer, primary_key=True)
     emotion = db.Column(db.String(50), nullable=False)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
 
 class PlaylistMapping(db.Model):
@@ -61,14 +65,14 @@ class VoiceCommandLog(db.Model):
     __tablename__ = 'voice_command_logs'  # ✅ Explicit name
     id = db.Column(db.Integer, primary_key=True)
     command = db.Column(db.String(255), nullable=False)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
 
 class GestureLog(db.Model):
     __tablename__ = 'gesture_logs'  # ✅ Explicit name
     id = db.Column(db.Integer, primary_key=True)
     gesture = db.Column(db.String(50), nullable=False)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
 
 class Song(db.Model):
@@ -100,6 +104,7 @@ class PlaylistSong(db.Model):
     playlist_id = db.Column(db.String, db.ForeignKey('playlists.id'), primary_key=True)
     song_id = db.Column(db.String, db.ForeignKey('songs.id'), primary_key=True)
     added_at = db.Column(db.DateTime, default=datetime.utcnow)
+    position = db.Column(db.Integer)  # Order within the playlist, when it has one
 
     playlist = db.relationship('Playlist', back_populates='songs')
     song = db.relationship('Song')
@@ -141,3 +146,42 @@ class SongHistory(db.Model):
     title = db.Column(db.String(255))
     artist = db.Column(db.String(255))
     album = db.Column(db.String(255))
+    played_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+class UserHistoryFilter(db.Model):
+    """Serialized Bloom filter of a user's recently played and liked external IDs"""
+    __tablename__ = 'user_history_filters'
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, unique=True)
+    data = db.Column(db.LargeBinary, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# -------------------------
+# Retention rollups
+# -------------------------
+class DailyActivitySummary(db.Model):
+    """Per-user daily aggregate of log rows compacted away by the retention job"""
+    __tablename__ = 'daily_activity_summaries'
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    emotion_counts = db.Column(db.JSON, default=dict)  # {"happy": 3, "sad": 1}
+    dominant_emotion = db.Column(db.String(50))
+    voice_command_count = db.Column(db.Integer, default=0)
+    gesture_count = db.Column(db.Integer, default=0)
+    plays_by_source = db.Column(db.JSON, default=dict)  # {"spotify": 12}
+
+    __table_args__ = (db.UniqueConstraint('user_id', 'day', name='uq_user_day_summary'),)
+
+class EmotionRollup(db.Model):
+    """Emotion counts per user and time bucket, kept up to date as emotions are logged"""
+    __tablename__ = 'emotion_rollups'
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    granularity = db.Column(db.String(10), nullable=False)  # 'hour', 'day' or 'week'
+    bucket_start = db.Column(db.DateTime, nullable=False)
+    emotion = db.Column(db.String(50), nullable=False)
+    total = db.Column(db.Integer, nullable=False, default=0)
+
+    # Doubles as the index for per-user range scans over one granularity
+    __table_args__ = (db.UniqueConstraint('user_id', 'granularity', 'bucket_start', 'emotion', name='uq_emotion_rollup_bucket'),)
@@ -0,0 +1,283 @@
+"""Sign-up, email/password and Google login, and the signed-in user (/register, /login, /api/me, /google/*)"""
+import logging
+import requests
+import urllib.parse
+import json
+import os
+from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from werkzeug.security import generate_password_hash, check_password_hash
+from flask import Blueprint, current_app, request, jsonify, redirect
+from models import db, User
+from utils.metrics import upstream_call
+from sqlalchemy.orm import undefer_group
+
+log = logging.getLogger(__name__)
+bp = Blueprint("auth", __name__)
+
+
+@bp.route('/register', methods=['POST'])
+def register():
+    data = request.get_json()
+    if not data.get("email") or not data.get("password"):
+        return jsonify({"error": "Email and password required"}), 400
+
+    if User.query.filter_by(email=data["email"]).first():
+        return jsonify({"error": "User already exists"}), 409
+
+    hashed_pw = generate_password_hash(data["password"])
+    new_user = User(email=data["email"], password=hashed_pw, consent_given=True)
+    db.session.add(new_user)
+    db.session.commit()
+    return jsonify({"message": "User registered successfully"}), 201
+
+
+@bp.route('/login', methods=['POST'])
+def login():
+    data = request.get_json()
+    user = User.query.filter_by(email=data.get("email")).first()
+    if not user or user.deletion_requested_at or not check_password_hash(user.password, data.get("password")):
+        return jsonify({"error": "Invalid credentials"}), 401
+
+    token = create_access_token(identity=str(user.id))
+    return jsonify({"token": token}), 200
+
+
+@bp.route('/api/me', methods=['GET'])
+@jwt_required()
+def get_me():
+    """Return user profile info + Spotify connection status"""
+    user_id = get_jwt_identity()
+    user = User.query.options(undefer_group('profile'), undefer_group('oauth')).get(user_id)
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+
+    return jsonify({
+        "id": user.id,
+        "email": user.email,
+        "first_name": user.first_name,
+        "username": user.username,
+        "phone_number": user.phone_number,
+        "bio": user.bio,
+        "profile_picture_url": user.profile_picture_url,
+        "spotifyLinked": bool(user.spotify_access_token),
+        "spotifyUser": {
+            "id": user.spotify_id,
+            "name": user.spotify_display_name,
+            "email": user.spotify_email
+        } if user.spotify_access_token else None,
+        "googleLinked": bool(user.google_id),
+        "googleUser": {
+            "id": user.google_id,
+            "name": user.google_name,
+            "email": user.google_email
+        } if user.google_id else None
+    }), 200
+
+
+@bp.route('/api/google/login', methods=['GET'])
+def google_login_initiate():
+    """Initiate Google OAuth for login/signup (no JWT required)"""
+    # Check if Google credentials are configured
+    if not current_app.config.get("GOOGLE_CLIENT_ID") or not current_app.config.get("GOOGLE_CLIENT_SECRET") or not current_app.config.get("GOOGLE_REDIRECT_URI"):
+        return jsonify({"error": "Google credentials not configured"}), 500
+    
+    auth_url = f"{current_app.config['GOOGLE_ACCOUNTS_BASE']}/o/oauth2/v2/auth"
+    redirect_uri = current_app.config["GOOGLE_REDIRECT_URI"]
+    
+    params = {
+        "client_id": current_app.config["GOOGLE_CLIENT_ID"],
+        "response_type": "code",
+        "redirect_uri": redirect_uri,
+        "scope": "openid email profile",
+        "access_type": "offline",
+        "prompt": "consent",
+        "state": "login_signup"  # State to indicate login/signup flow
+    }
+    query_string = urllib.parse.urlencode(params)
+    google_url = f"{auth_url}?{query_string}"
+    return jsonify({"url": google_url}), 200
+
+
+@bp.route('/google/callback')
+def google_callback():
+    """Handle Google OAuth callback - auto-create account if needed or log in"""
+    code = request.args.get("code")
+    state = request.args.get("state")  # Contains "login_signup" or user_id
+    error = request.args.get("error")
+    
+    frontend_url = os.getenv("FRONTEND_URL", "http://localhost:3000")
+    
+    if error:
+        return redirect(f"{frontend_url}/login?error={error}")
+    
+    if not code:
+        return redirect(f"{frontend_url}/login?error=missing_code")
+
+    # Check if this is a login/signup flow or linking flow
+    if state == "login_signup":
+        # This is a login/signup attempt - process it
+        # Check if Google credentials are configured
+        if not current_app.config.get("GOOGLE_CLIENT_ID") or not current_app.config.get("GOOGLE_CLIENT_SECRET"):
+            return redirect(f"{frontend_url}/login?error=google_not_configured")
+
+        # Exchange code for access token
+        redirect_uri = current_app.config["GOOGLE_REDIRECT_URI"]
+        token_url = f"{current_app.config['GOOGLE_OAUTH_BASE']}/token"
+        payload = {
+            "client_id": current_app.config["GOOGLE_CLIENT_ID"],
+            "client_secret": current_app.config["GOOGLE_CLIENT_SECRET"],
+            "code": code,
+            "grant_type": "authorization_code",
+            "redirect_uri": redirect_uri
+        }
+        
+        try:
+            with upstream_call("google", "/token") as call:
+                response = requests.post(token_url, data=payload, headers={"Content-Type": "application/x-www-form-urlencoded"}, timeout=10)
+                call.status = response.status_code
+            
+            if response.status_code != 200:
+                try:
+                    error_data = response.json() if response.text else {}
+                    error_msg = error_data.get("error_description", error_data.get("error", "Unknown error"))
+                except:
+                    error_msg = response.text or f"HTTP {response.status_code} error"
+                log.error("Google token exchange failed", extra={"status": response.status_code, "error": error_msg})
+                return redirect(f"{frontend_url}/login?error=failed_to_get_token")
+
+            try:
+                token_data = response.json()
+            except json.JSONDecodeError as e:
+                log.error("Google token response is not JSON", extra={"error": str(e), "body": response.text[:500]})
+                return redirect(f"{frontend_url}/login?error=invalid_token_response")
+            
+            access_token = token_data.get("access_token")
+            id_token = token_data.get("id_token")
+
+            if not access_token:
+                return redirect(f"{frontend_url}/login?error=no_access_token")
+
+            # Fetch Google user profile using access token
+            with upstream_call("google", "/oauth2/v2/userinfo") as call:
+                user_info_response = requests.get(
+                    f"{current_app.config['GOOGLE_API_BASE']}/oauth2/v2/userinfo",
+                    headers={"Authorization": f"Bearer {access_token}"},
+                    timeout=10
+                )
+                call.status = user_info_response.status_code
+            
+            if user_info_response.status_code != 200:
+                try:
+                    error_data = user_info_response.json() if user_info_response.text else {}
+                    error_msg = error_data.get("error", {}).get("message", "Unknown error") if isinstance(error_data, dict) else str(error_data)
+                except:
+                    error_msg = user_info_response.text or f"HTTP {user_info_response.status_code} error"
+                log.error("Google profile fetch failed", extra={"status": user_info_response.status_code, "error": error_msg})
+                return redirect(f"{frontend_url}/login?error=failed_to_fetch_profile")
+
+            try:
+                user_info = user_info_response.json()
+            except json.JSONDecodeError as e:
+                log.error("Google profile response is not JSON", extra={"error": str(e), "body": user_info_response.text[:500]})
+                return redirect(f"{frontend_url}/login?error=invalid_profile_response")
+            
+            google_id = user_info.get("id")
+            google_email = user_info.get("email")
+            google_name = user_info.get("name", "")
+            google_picture = user_info.get("picture")
+            
+            if not google_id:
+                return redirect(f"{frontend_url}/login?error=no_google_id")
+            
+            if not google_email:
+                return redirect(f"{frontend_url}/login?error=no_google_email")
+
+            # Check if a user with this email exists
+            user = User.query.filter_by(email=google_email).first()
+            # An account being purged must not be logged into or have fresh tokens written onto it
+            if user and user.deletion_requested_at:
+                return redirect(f"{frontend_url}/login?error=account_deletion_pending")
+            
+            # Get refresh token if available
+            refresh_token = token_data.get("refresh_token")
+            
+            if not user:
+                # User doesn't exist - create a new account automatically
+                # Split name into first and last name if available
+                name_parts = google_name.split(" ", 1) if google_name else []
+                first_name = name_parts[0] if name_parts else None
+                
+                try:
+                    new_user = User(
+                        email=google_email,
+                        password=None,  # No password for Google-based accounts
+                        first_name=first_name,
+                        profile_picture_url=google_picture,
+                        consent_given=True,
+                        google_id=google_id,
+                        google_email=google_email,
+                        google_name=google_name,
+                        google_access_token=access_token,
+                        google_refresh_token=refresh_token
+                    )
+                    db.session.add(new_user)
+                    db.session.commit()
+                    user = new_user
+                    log.info("Created account for Google user", extra={"user_id": user.id})
+                except Exception as db_error:
+                    db.session.rollback()
+                    log.warning("Database error creating Google user", extra={"error": str(db_error)})
+                    # Check if it's a unique constraint violation (email already exists)
+                    if "UNIQUE constraint" in str(db_error) or "unique" in str(db_error).lower():
+                        # Try to find the user that might have been created concurrently
+                        user = User.query.filter_by(email=google_email).first()
+                        if user and user.deletion_requested_at:
+                            return redirect(f"{frontend_url}/login?error=account_deletion_pending")
+                        if user:
+                            log.info("Found existing user for Google account", extra={"user_id": user.id})
+                            # Update Google credentials for existing user
+                            user.google_id = google_id
+                            user.google_email = google_email
+                            user.google_name = google_name
+                            user.google_access_token = access_token
+                            if refresh_token:
+                                user.google_refresh_token = refresh_token
+                            db.session.commit()
+                        else:
+                            raise db_error
+                    else:
+                        raise db_error
+            else:
+                # User exists - update profile picture and Google credentials
+                try:
+                    if google_picture and not user.profile_picture_url:
+                        user.profile_picture_url = google_picture
+                    if google_name and not user.first_name:
+                        name_parts = google_name.split(" ", 1)
+                        user.first_name = name_parts[0] if name_parts else None
+                    # Update Google credentials
+                    user.google_id = google_id
+                    user.google_email = google_email
+                    user.google_name = google_name
+                    user.google_access_token = access_token
+                    if refresh_token:
+                        user.google_refresh_token = refresh_token
+                    db.session.commit()
+                    log.info("Logged in existing user with Google", extra={"user_id": user.id})
+                except Exception as db_error:
+                    db.session.rollback()
+                    log.error("Database error updating Google user", extra={"user_id": user.id, "error": str(db_error)})
+                    raise db_error
+
+            # Create JWT token for the user
+            token = create_access_token(identity=str(user.id))
+            
+            # Redirect to homepage with token so user lands on home (Spotify can be linked there)
+            return redirect(f"{frontend_url}/home?google_token={token}")
+        except Exception as e:
+            log.exception("Google login/signup callback failed")
+            error_message = str(e)
+            return redirect(f"{frontend_url}/login?error=server_error&details={urllib.parse.quote(error_message)}")
+    else:
+        # This is a linking flow (existing logged-in user linking Google)
+        return redirect(f"{frontend_url}/home?google_code={code}")
@@ -0,0 +1,143 @@
+"""Emotion input: logged moods, the mood timeline, camera inference and gesture/voice commands"""
+import logging
+import datetime
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, request, jsonify
+from models import db, EmotionLog, VoiceCommandLog, GestureLog
+from utils.database import read_session
+from utils.emotion_timeline import GRANULARITIES, record_emotion, emotion_timeline, parse_range
+from utils.profiling import INFERENCE as PROFILE_INFERENCE, profiler
+from utils.metrics import inference_in_progress, observe_inference
+from utils.inference import shared_detector, decode_base64_image, preprocess, detect_emotions, timed
+
+log = logging.getLogger(__name__)
+bp = Blueprint("emotion", __name__)
+
+
+@bp.route('/log_emotion', methods=['POST'])
+@jwt_required()
+def log_emotion_post():
+    """Store detected emotion from emotion_detector.py"""
+    user_id = get_jwt_identity()
+    data = request.get_json()
+    emotion = data.get("emotion")
+    if not emotion:
+        return jsonify({"error": "Emotion field required"}), 400
+
+    logged_at = datetime.datetime.utcnow()
+    db.session.add(EmotionLog(user_id=user_id, emotion=emotion, timestamp=logged_at))
+    record_emotion(user_id, emotion, logged_at)
+    db.session.commit()
+
+    return jsonify({"message": f"Logged emotion: {emotion}"}), 200
+
+
+@bp.route('/api/emotions/timeline', methods=['GET'])
+@jwt_required()
+def get_emotion_timeline():
+    """Emotion counts over time from the precomputed hour/day/week rollups"""
+    user_id = get_jwt_identity()
+    granularity = request.args.get("granularity", "day")
+    if granularity not in GRANULARITIES:
+        return jsonify({"error": f"granularity must be one of: {', '.join(GRANULARITIES)}"}), 400
+
+    try:
+        start, end = parse_range(granularity, request.args.get("start"), request.args.get("end"))
+    except ValueError as e:
+        return jsonify({"error": f"Invalid date range: {str(e)}"}), 400
+
+    return jsonify(emotion_timeline(read_session(), user_id, granularity, start, end)), 200
+
+
+@bp.route('/api/detect-emotion', methods=['POST'])
+@jwt_required()
+def detect_emotion_from_image():
+    """Detect emotion from base64 encoded image"""
+    fer_detector = shared_detector()
+    if fer_detector is None:
+        return jsonify({"error": "Emotion detection service not available. FER library not installed."}), 503
+    
+    try:
+        data = request.get_json()
+        image_data = data.get("image")
+        
+        if not image_data:
+            return jsonify({"error": "Image data required"}), 400
+        
+        timings = {}
+        with inference_in_progress(), profiler.watching(PROFILE_INFERENCE):
+            with timed(timings, "decode"):
+                image = decode_base64_image(image_data)
+            with timed(timings, "preprocess"):
+                image_bgr = preprocess(image)
+            emotions = detect_emotions(fer_detector, image_bgr, timings)
+        observe_inference(timings)
+        
+        if not emotions or len(emotions) == 0:
+            return jsonify({
+                "emotion": None,
+                "confidence": 0,
+                "message": "No face detected in the image"
+            }), 200
+        
+        # Get the first face's top emotion
+        face = emotions[0]
+        emotion_scores = face.get("emotions", {})
+        
+        if not emotion_scores:
+            return jsonify({
+                "emotion": None,
+                "confidence": 0,
+                "message": "Could not detect emotions"
+            }), 200
+        
+        # Find the emotion with highest score
+        top_emotion = max(emotion_scores, key=emotion_scores.get)
+        confidence = emotion_scores[top_emotion]
+        
+        return jsonify({
+            "emotion": top_emotion,
+            "confidence": round(confidence, 2),
+            "all_emotions": emotion_scores
+        }), 200
+        
+    except Exception as e:
+        log.exception("Emotion detection failed")
+        return jsonify({"error": f"Failed to detect emotion: {str(e)}"}), 500
+
+
+@bp.route('/api/gestures/map', methods=['POST'])
+@jwt_required()
+def map_gesture_to_action():
+    user_id = get_jwt_identity()
+    data = request.get_json()
+    gesture, action = data.get("gestureName"), data.get("action")
+    if not gesture or not action:
+        return jsonify({"error": "Invalid gesture name or action"}), 400
+    db.session.add(GestureLog(user_id=user_id, gesture=f"{gesture}:{action}"))
+    db.session.commit()
+    return jsonify({"message": "Gesture mapped successfully"}), 200
+
+
+@bp.route('/api/voice/command', methods=['POST'])
+@jwt_required()
+def process_voice_command():
+    user_id = get_jwt_identity()
+    data = request.get_json()
+    command = data.get("commandPhrase")
+    if not command:
+        return jsonify({"error": "Missing command phrase"}), 400
+
+    phrase_to_action = {
+        "play next song": "next_song",
+        "play previous song": "previous_song",
+        "pause song": "pause",
+        "play song": "play"
+    }
+    action = phrase_to_action.get(command.lower())
+    if not action:
+        return jsonify({"error": "Unrecognized command"}), 400
+
+    db.session.add(VoiceCommandLog(user_id=user_id, command=command))
+    db.session.commit()
+    return jsonify({"message": "Voice command processed", "actionExecuted": action}), 200
@@ -0,0 +1,173 @@
+"""The user's own music: liked songs, listening history and saved playlists"""
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, current_app, request, jsonify
+from models import db, Playlist, LikedSong, SongHistory
+from utils.database import read_session
+from utils.http_cache import conditional
+from utils.history_filter import remember_tracks
+
+bp = Blueprint("library", __name__)
+
+
+@bp.route('/api/songs/like', methods=['POST'])
+@jwt_required()
+def like_song():
+    """
+    Body JSON:
+    {
+      "source": "spotify" | "jiosaavn",
+      "external_id": "spotify:track:abc" or "<jiosaavn-url-or-id>",
+      "title": "...",
+      "artist": "...",
+      "album": "..."
+    }
+    """
+    user_id = get_jwt_identity()
+    data = request.get_json()
+    source = data.get("source")
+    external_id = data.get("external_id")
+    title = data.get("title")
+    artist = data.get("artist")
+    album = data.get("album")
+
+    if not source or not external_id or not title:
+        return jsonify({"error": "source, external_id and title are required"}), 400
+
+    # Check duplicate via unique constraint
+    existing = LikedSong.query.filter_by(user_id=user_id, source=source, external_id=external_id).first()
+    if existing:
+        return jsonify({"message": "Song already liked"}), 200
+
+    liked = LikedSong(
+        user_id=user_id,
+        source=source,
+        external_id=external_id,
+        title=title,
+        artist=artist,
+        album=album
+    )
+    db.session.add(liked)
+    remember_tracks(user_id, [external_id], current_app.config)
+    db.session.commit()
+    return jsonify({"message": "Song liked successfully"}), 201
+
+
+@bp.route('/api/songs/like', methods=['DELETE'])
+@jwt_required()
+def unlike_song():
+    """
+    Body JSON:
+    {
+      "source": "spotify" | "jiosaavn",
+      "external_id": "..."
+    }
+    """
+    user_id = get_jwt_identity()
+    data = request.get_json()
+    source = data.get("source")
+    external_id = data.get("external_id")
+    if not source or not external_id:
+        return jsonify({"error": "source and external_id are required"}), 400
+
+    existing = LikedSong.query.filter_by(user_id=user_id, source=source, external_id=external_id).first()
+    if not existing:
+        return jsonify({"error": "Song not found in liked songs"}), 404
+
+    db.session.delete(existing)
+    db.session.commit()
+    return jsonify({"message": "Song unliked successfully"}), 200
+
+
+@bp.route('/api/liked-songs', methods=['GET'])
+@jwt_required()
+@conditional()
+def get_liked_songs():
+    user_id = get_jwt_identity()
+    liked = read_session().query(LikedSong).filter_by(user_id=user_id).all()
+    results = [
+        {
+            "source": s.source,
+            "external_id": s.external_id,
+            "title": s.title,
+            "artist": s.artist,
+            "album": s.album
+        } for s in liked
+    ]
+    return jsonify(results), 200
+
+
+@bp.route('/api/song-history', methods=['GET'])
+@jwt_required()
+def get_song_history():
+    user_id = get_jwt_identity()
+    history = read_session().query(SongHistory).filter_by(user_id=user_id).all()
+    results = [
+        {
+            "source": h.source,
+            "external_id": h.external_id,
+            "title": h.title,
+            "artist": h.artist,
+            "album": h.album
+        } for h in history
+    ]
+    return jsonify(results), 200
+
+
+@bp.route('/api/song-history', methods=['POST'])
+@jwt_required()
+def add_song_history():
+    """
+    Body JSON:
+    {
+      "source": "spotify" | "jiosaavn",
+      "external_id": "spotify:track:abc" or "<jiosaavn-url-or-id>",
+      "title": "...",
+      "artist": "...",
+      "album": "..."
+    }
+    """
+    user_id = get_jwt_identity()
+    data = request.get_json()
+    source = data.get("source")
+    external_id = data.get("external_id")
+    if not source or not external_id:
+        return jsonify({"error": "source and external_id are required"}), 400
+
+    db.session.add(SongHistory(
+        user_id=user_id,
+        source=source,
+        external_id=external_id,
+        title=data.get("title"),
+        artist=data.get("artist"),
+        album=data.get("album")
+    ))
+    remember_tracks(user_id, [external_id], current_app.config)
+    db.session.commit()
+    return jsonify({"message": "Play recorded"}), 201
+
+
+@bp.route('/api/playlists', methods=['GET'])
+@jwt_required()
+@conditional()
+def get_all_playlists():
+    user_id = get_jwt_identity()
+    playlists = read_session().query(Playlist).filter_by(user_id=user_id).all()
+    return jsonify([
+        {"playlistId": p.id, "name": p.name, "description": p.description, "createdAt": p.created_at.isoformat()}
+        for p in playlists
+    ]), 200
+
+
+@bp.route('/api/playlists', methods=['POST'])
+@jwt_required()
+def create_playlist():
+    user_id = get_jwt_identity()
+    data = request.get_json()
+    name = data.get("name")
+    if not name:
+        return jsonify({"error": "Missing playlist name"}), 400
+
+    playlist = Playlist(user_id=user_id, name=name, description=data.get("description", ""))
+    db.session.add(playlist)
+    db.session.commit()
+    return jsonify({"message": "Playlist created", "playlistId": playlist.id}), 201
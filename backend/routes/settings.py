@@ -0,0 +1,302 @@
+"""Account settings: preferences, password, linked accounts, profile and account deletion"""
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from werkzeug.security import generate_password_hash, check_password_hash
+from flask import Blueprint, current_app, request, jsonify
+from models import db, User, SongHistory
+from utils.account_cleanup import count_user_rows, delete_user_data, mark_account_for_purge, schedule_account_purge
+from utils.http_cache import conditional
+from utils.history_filter import rebuild_history_filter
+from utils.identity import load_identity, invalidate_identity, PREFERENCE_COLUMNS
+from sqlalchemy.orm import undefer_group
+
+bp = Blueprint("settings", __name__)
+
+
+@bp.route('/api/settings/preferences', methods=['GET'])
+@jwt_required()
+@conditional()
+def get_preferences():
+    """Get user preferences"""
+    user_id = get_jwt_identity()
+    user = load_identity(user_id, *PREFERENCE_COLUMNS)
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+    
+    return jsonify({
+        "theme": user.theme or "light",
+        "language": user.language or "English",
+        "camera_access_enabled": user.camera_access_enabled if user.camera_access_enabled is not None else True,
+        "notifications_enabled": user.notifications_enabled if user.notifications_enabled is not None else True,
+        "add_to_home_enabled": user.add_to_home_enabled if user.add_to_home_enabled is not None else False
+    }), 200
+
+
+@bp.route('/api/settings/preferences', methods=['PUT'])
+@jwt_required()
+def update_preferences():
+    """Update user preferences"""
+    user_id = get_jwt_identity()
+    user = User.query.get(user_id)
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+    
+    data = request.get_json()
+    
+    if 'theme' in data:
+        if data['theme'] in ['light', 'dark']:
+            user.theme = data['theme']
+        else:
+            return jsonify({"error": "Invalid theme. Must be 'light' or 'dark'"}), 400
+    
+    if 'language' in data:
+        user.language = data['language']
+    
+    if 'camera_access_enabled' in data:
+        user.camera_access_enabled = bool(data['camera_access_enabled'])
+    
+    if 'notifications_enabled' in data:
+        user.notifications_enabled = bool(data['notifications_enabled'])
+    
+    if 'add_to_home_enabled' in data:
+        user.add_to_home_enabled = bool(data['add_to_home_enabled'])
+    
+    try:
+        db.session.commit()
+        invalidate_identity(user_id)
+        return jsonify({"message": "Preferences updated successfully"}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": "Failed to update preferences", "details": str(e)}), 500
+
+
+@bp.route('/api/settings/password', methods=['PUT'])
+@jwt_required()
+def change_password():
+    """Change user password"""
+    user_id = get_jwt_identity()
+    user = User.query.get(user_id)
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+    
+    data = request.get_json()
+    current_password = data.get("current_password")
+    new_password = data.get("new_password")
+    
+    if not current_password or not new_password:
+        return jsonify({"error": "Current password and new password required"}), 400
+    
+    if len(new_password) < 6:
+        return jsonify({"error": "New password must be at least 6 characters"}), 400
+    
+    # Verify current password
+    if not check_password_hash(user.password, current_password):
+        return jsonify({"error": "Current password is incorrect"}), 401
+    
+    # Update password
+    user.password = generate_password_hash(new_password)
+    
+    try:
+        db.session.commit()
+        return jsonify({"message": "Password changed successfully"}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": "Failed to change password", "details": str(e)}), 500
+
+
+@bp.route('/api/settings/history/clear', methods=['DELETE'])
+@jwt_required()
+def clear_listening_history():
+    """Clear user's listening history"""
+    user_id = get_jwt_identity()
+    
+    try:
+        # Delete all song history for the user
+        SongHistory.query.filter_by(user_id=user_id).delete()
+        # Cleared plays should be recommended again; liked songs stay excluded
+        rebuild_history_filter(user_id, current_app.config)
+        db.session.commit()
+        return jsonify({"message": "Listening history cleared successfully"}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": "Failed to clear history", "details": str(e)}), 500
+
+
+@bp.route('/api/settings/account/delete', methods=['DELETE'])
+@jwt_required()
+def delete_account():
+    """Delete user account and all associated data"""
+    user_id = get_jwt_identity()
+    user = User.query.get(user_id)
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+    
+    try:
+        # Very large accounts are purged in chunks on a background thread so the
+        # delete does not hold the write lock against every other request
+        threshold = current_app.config["ACCOUNT_DELETE_BACKGROUND_THRESHOLD"]
+        if threshold and count_user_rows(user_id, limit=threshold) > threshold:
+            mark_account_for_purge(user)
+            db.session.commit()
+            schedule_account_purge(user_id)
+            invalidate_identity(user_id)
+            return jsonify({"message": "Account deletion scheduled"}), 202
+
+        delete_user_data(user_id)
+        db.session.commit()
+        invalidate_identity(user_id)
+        
+        return jsonify({"message": "Account deleted successfully"}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": "Failed to delete account", "details": str(e)}), 500
+
+
+@bp.route('/api/settings/spotify/unlink', methods=['DELETE'])
+@jwt_required()
+def unlink_spotify():
+    """Unlink Spotify account from user"""
+    user_id = get_jwt_identity()
+    user = User.query.get(user_id)
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+    
+    try:
+        # Clear Spotify-related fields
+        user.spotify_id = None
+        user.spotify_display_name = None
+        user.spotify_email = None
+        user.spotify_access_token = None
+        user.spotify_refresh_token = None
+        
+        db.session.commit()
+        invalidate_identity(user_id)
+        return jsonify({"message": "Spotify account unlinked successfully"}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": "Failed to unlink Spotify account", "details": str(e)}), 500
+
+
+@bp.route('/api/settings/google/unlink', methods=['DELETE'])
+@jwt_required()
+def unlink_google():
+    """Unlink Google account from user"""
+    user_id = get_jwt_identity()
+    user = User.query.get(user_id)
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+    
+    try:
+        # Clear Google-related fields
+        user.google_id = None
+        user.google_email = None
+        user.google_name = None
+        user.google_access_token = None
+        user.google_refresh_token = None
+        
+        db.session.commit()
+        invalidate_identity(user_id)
+        return jsonify({"message": "Google account unlinked successfully"}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": "Failed to unlink Google account", "details": str(e)}), 500
+
+
+@bp.route('/api/profile', methods=['GET'])
+@jwt_required()
+def get_profile():
+    """Get user profile information"""
+    user_id = get_jwt_identity()
+    user = User.query.options(undefer_group('profile'), undefer_group('oauth')).get(user_id)
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+    
+    return jsonify({
+        "id": user.id,
+        "email": user.email,
+        "first_name": user.first_name,
+        "username": user.username,
+        "phone_number": user.phone_number,
+        "bio": user.bio,
+        "profile_picture_url": user.profile_picture_url,
+        "spotifyLinked": bool(user.spotify_access_token),
+        "spotifyUser": {
+            "id": user.spotify_id,
+            "name": user.spotify_display_name,
+            "email": user.spotify_email
+        } if user.spotify_access_token else None,
+        "googleLinked": bool(user.google_id),
+        "googleUser": {
+            "id": user.google_id,
+            "name": user.google_name,
+            "email": user.google_email
+        } if user.google_id else None
+    }), 200
+
+
+@bp.route('/api/profile', methods=['PUT'])
+@jwt_required()
+def update_profile():
+    """Update user profile information"""
+    user_id = get_jwt_identity()
+    user = User.query.get(user_id)
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+    
+    data = request.get_json()
+    
+    if 'first_name' in data:
+        user.first_name = data['first_name']
+    
+    if 'username' in data:
+        # Skip check if username hasn't changed
+        if user.username != data['username']:
+            # Check if username is already taken by another user
+            existing_user = User.query.filter_by(username=data['username']).first()
+            if existing_user and existing_user.id != int(user_id):
+                return jsonify({"error": "Username already taken"}), 409
+        user.username = data['username']
+    
+    if 'phone_number' in data:
+        user.phone_number = data['phone_number']
+    
+    if 'bio' in data:
+        user.bio = data['bio']
+    
+    try:
+        db.session.commit()
+        invalidate_identity(user_id)
+        return jsonify({"message": "Profile updated successfully"}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": "Failed to update profile", "details": str(e)}), 500
+
+
+@bp.route('/api/profile/picture', methods=['POST'])
+@jwt_required()
+def upload_profile_picture():
+    """Upload profile picture (base64 encoded)"""
+    user_id = get_jwt_identity()
+    user = User.query.get(user_id)
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+    
+    data = request.get_json()
+    image_data = data.get("image")
+    
+    if not image_data:
+        return jsonify({"error": "Image data required"}), 400
+    
+    # Store the base64 image data URL directly
+    # In production, you might want to upload to S3 or similar and store the URL
+    user.profile_picture_url = image_data
+    
+    try:
+        db.session.commit()
+        invalidate_identity(user_id)
+        return jsonify({
+            "message": "Profile picture uploaded successfully",
+            "profile_picture_url": user.profile_picture_url
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": "Failed to upload profile picture", "details": str(e)}), 500
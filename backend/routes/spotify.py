@@ -0,0 +1,204 @@
+"""Linking a Spotify account: the OAuth flow and access-token refresh (/spotify/*, /api/spotify/*)"""
+import logging
+import requests
+import urllib.parse
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, current_app, request, jsonify, redirect
+from models import db, User
+from utils.spotify_client import spotify_client
+from utils.metrics import upstream_call
+from utils.identity import invalidate_identity
+
+log = logging.getLogger(__name__)
+bp = Blueprint("spotify", __name__)
+
+
+@bp.route('/api/spotify/login-url', methods=['GET'])
+@jwt_required()
+def get_spotify_login_url():
+    """Get Spotify OAuth login URL - returns JSON with URL"""
+    user_id = get_jwt_identity()
+    auth_url = f"{current_app.config['SPOTIFY_ACCOUNTS_BASE']}/authorize"
+    params = {
+        "client_id": current_app.config["SPOTIFY_CLIENT_ID"],
+        "response_type": "code",
+        "redirect_uri": current_app.config["SPOTIFY_REDIRECT_URI"],
+        "scope": "user-read-email playlist-read-private user-read-playback-state user-modify-playback-state streaming",
+        "show_dialog": "true",
+        "state": str(user_id)  # Pass user_id in state for verification
+    }
+    query_string = urllib.parse.urlencode(params)
+    spotify_url = f"{auth_url}?{query_string}"
+    return jsonify({"url": spotify_url}), 200
+
+
+@bp.route('/spotify/login')
+@jwt_required()
+def spotify_login():
+    """Initiate Spotify OAuth flow - redirects to Spotify (for direct browser access)"""
+    user_id = get_jwt_identity()
+    auth_url = f"{current_app.config['SPOTIFY_ACCOUNTS_BASE']}/authorize"
+    params = {
+        "client_id": current_app.config["SPOTIFY_CLIENT_ID"],
+        "response_type": "code",
+        "redirect_uri": current_app.config["SPOTIFY_REDIRECT_URI"],
+        "scope": "user-read-email playlist-read-private user-read-playback-state user-modify-playback-state streaming",
+        "show_dialog": "true",
+        "state": str(user_id)  # Pass user_id in state for verification
+    }
+    query_string = urllib.parse.urlencode(params)
+    return redirect(f"{auth_url}?{query_string}")
+
+
+@bp.route('/spotify/callback')
+def spotify_callback():
+    """Handle Spotify OAuth callback - redirects to frontend with code"""
+    code = request.args.get("code")
+    state = request.args.get("state")  # Contains user_id
+    
+    if not code:
+        return jsonify({"error": "Missing code in callback"}), 400
+
+    # Redirect to frontend home page with the code - frontend will handle the connection
+    return redirect(f"http://localhost:3000/home?spotify_code={code}")
+
+
+@bp.route('/spotify/callback/complete', methods=['POST'])
+@jwt_required()
+def spotify_callback_complete():
+    """Complete Spotify OAuth connection - called from callback HTML page"""
+    try:
+        user_id = get_jwt_identity()
+        data = request.get_json()
+        code = data.get("code")
+        
+        if not code:
+            return jsonify({"error": "Missing code"}), 400
+
+        # Validate user exists
+        user = User.query.get(int(user_id))
+        if not user:
+            return jsonify({"error": "User not found"}), 404
+
+        # Check if Spotify credentials are configured
+        if not current_app.config.get("SPOTIFY_CLIENT_ID") or not current_app.config.get("SPOTIFY_CLIENT_SECRET"):
+            return jsonify({"error": "Spotify credentials not configured"}), 500
+
+        token_url = f"{current_app.config['SPOTIFY_ACCOUNTS_BASE']}/api/token"
+        payload = {
+            "grant_type": "authorization_code",
+            "code": code,
+            "redirect_uri": current_app.config["SPOTIFY_REDIRECT_URI"],
+            "client_id": current_app.config["SPOTIFY_CLIENT_ID"],
+            "client_secret": current_app.config["SPOTIFY_CLIENT_SECRET"]
+        }
+        
+        with upstream_call("spotify", "/api/token") as call:
+            response = requests.post(token_url, data=payload, headers={"Content-Type": "application/x-www-form-urlencoded"}, timeout=10)
+            call.status = response.status_code
+        
+        if response.status_code != 200:
+            error_data = response.json() if response.text else {}
+            log.warning("Spotify token exchange failed", extra={"status": response.status_code, "error": error_data})
+            return jsonify({
+                "error": "Failed to get access token from Spotify",
+                "details": error_data
+            }), 400
+
+        token_data = response.json()
+        access_token = token_data.get("access_token")
+        refresh_token = token_data.get("refresh_token")
+
+        if not access_token:
+            return jsonify({
+                "error": "Failed to get access token",
+                "details": token_data
+            }), 400
+
+        # Fetch Spotify user profile
+        user_info_response = spotify_client.get(
+            "/v1/me",
+            headers={"Authorization": f"Bearer {access_token}"}
+        )
+        
+        if user_info_response.status_code != 200:
+            error_data = user_info_response.json() if user_info_response.text else {}
+            log.warning("Spotify profile fetch failed", extra={"status": user_info_response.status_code, "error": error_data})
+            return jsonify({
+                "error": "Failed to fetch Spotify user profile",
+                "details": error_data
+            }), 400
+
+        user_info = user_info_response.json()
+
+        # Update user with Spotify info
+        try:
+            user.spotify_id = user_info.get("id")
+            user.spotify_display_name = user_info.get("display_name")
+            user.spotify_email = user_info.get("email")
+            user.spotify_access_token = access_token
+            if refresh_token:
+                user.spotify_refresh_token = refresh_token
+            
+            db.session.commit()
+            invalidate_identity(user.id)
+        except Exception as db_error:
+            db.session.rollback()
+            log.warning("Database error linking Spotify account", extra={"user_id": user.id, "error": str(db_error)})
+            # Check if it's a unique constraint violation
+            if "UNIQUE constraint" in str(db_error) or "unique" in str(db_error).lower():
+                return jsonify({
+                    "error": "Spotify account is already linked to another user"
+                }), 409
+            return jsonify({
+                "error": "Failed to save Spotify information",
+                "details": str(db_error)
+            }), 500
+
+        return jsonify({
+            "message": "Spotify account linked successfully",
+            "spotify_user": {
+                "id": user.spotify_id,
+                "name": user.spotify_display_name,
+                "email": user.spotify_email
+            }
+        }), 200
+
+    except Exception as e:
+        log.exception("Unexpected error in spotify_callback_complete")
+        return jsonify({
+            "error": "Internal server error",
+            "details": str(e)
+        }), 500
+
+
+@bp.route('/spotify/refresh_token', methods=['POST'])
+@jwt_required()
+def refresh_spotify_token():
+    """Refresh Spotify access token using stored refresh_token"""
+    user_id = get_jwt_identity()
+    user = User.query.get(user_id)
+    refresh_token = getattr(user, "spotify_refresh_token", None)
+    if not refresh_token:
+        return jsonify({"error": "No refresh token found"}), 400
+
+    token_url = f"{current_app.config['SPOTIFY_ACCOUNTS_BASE']}/api/token"
+    payload = {
+        "grant_type": "refresh_token",
+        "refresh_token": refresh_token,
+        "client_id": current_app.config["SPOTIFY_CLIENT_ID"],
+        "client_secret": current_app.config["SPOTIFY_CLIENT_SECRET"]
+    }
+    with upstream_call("spotify", "/api/token") as call:
+        response = requests.post(token_url, data=payload, headers={"Content-Type": "application/x-www-form-urlencoded"}, timeout=10)
+        call.status = response.status_code
+    token_data = response.json()
+
+    new_access_token = token_data.get("access_token")
+    if not new_access_token:
+        return jsonify({"error": "Failed to refresh token"}), 400
+
+    user.spotify_access_token = new_access_token
+    db.session.commit()
+    invalidate_identity(user_id)
+    return jsonify({"message": "Spotify token refreshed successfully"}), 200
@@ -0,0 +1,42 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Tests import the backend modules the way app.py does (from utils... / from models ...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# `import app` builds the default app: keep its database and caches out of the source tree
+_scratch = tempfile.mkdtemp(prefix="moodmusic-tests-")
+for name, filename in [("DATABASE_URL", None), ("METADATA_CACHE_PATH", "metadata.sqlite3"),
+                       ("SPOTIFY_BUDGET_PATH", "budget.sqlite3"), ("AUDIO_FEATURES_CACHE_PATH", "audio_features.npz"),
+                       ("TRACE_EXPORT_PATH", "traces.jsonl"), ("PROFILE_DIR", "profiles")]:
+    os.environ.setdefault(name, f"sqlite:///{os.path.join(_scratch, 'app.sqlite3')}" if filename is None
+                          else os.path.join(_scratch, filename))
+
+
+@pytest.fixture
+def app(tmp_path):
+    """A fresh app on its own SQLite file, with every table created"""
+    from app import create_app
+    from config import Config
+    from models import db
+
+    class TestConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'test.sqlite3'}"
+        GOOGLE_CLIENT_ID = "client-id"
+        GOOGLE_CLIENT_SECRET = "client-secret"
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,40 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import routes.auth as auth
+from models import db, User
+from werkzeug.security import generate_password_hash
+
+
+def _pending_user():
+    user = User(email="gone@example.com", password=generate_password_hash("secret"),
+                deletion_requested_at=datetime.utcnow())
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def _google_replies(monkeypatch, email):
+    def reply(payload):
+        return SimpleNamespace(status_code=200, text="{}", json=lambda: payload)
+
+    monkeypatch.setattr(auth.requests, "post", lambda *a, **kw: reply({"access_token": "google-access"}))
+    monkeypatch.setattr(auth.requests, "get", lambda *a, **kw: reply({"id": "g-1", "email": email, "name": "Gone"}))
+
+
+def test_password_login_refuses_account_pending_deletion(client):
+    _pending_user()
+    response = client.post("/login", json={"email": "gone@example.com", "password": "secret"})
+    assert response.status_code == 401
+
+
+def test_google_login_refuses_account_pending_deletion(client, monkeypatch):
+    user = _pending_user()
+    _google_replies(monkeypatch, user.email)
+
+    response = client.get("/google/callback?code=abc&state=login_signup")
+
+    assert response.status_code == 302
+    assert "error=account_deletion_pending" in response.headers["Location"]
+    db.session.expire_all()
+    assert db.session.get(User, user.id).google_access_token is None
@@ -0,0 +1,45 @@
+import numpy as np
+from flask import Flask
+
+import utils.candidate_pool as candidate_pool
+from utils.candidate_pool import CandidatePoolCache
+
+
+def _cache(monkeypatch, max_keys=200):
+    cache = CandidatePoolCache()
+    cache.app = Flask(__name__)
+    cache.max_keys = max_keys
+    scheduled = []
+    monkeypatch.setattr(cache, "_schedule_refresh", lambda key, token: scheduled.append(key))
+    return cache, scheduled
+
+
+def test_unknown_mood_or_language_gets_no_pool(monkeypatch):
+    cache, scheduled = _cache(monkeypatch)
+    for emotion, language in [("junk", "English"), ("happy", "Klingon"), ("happy", "english")]:
+        tracks, features = cache.get(emotion, language)
+        assert tracks == [] and features.shape == (0, 4)
+    assert scheduled == []
+    assert cache.misses == 0
+
+
+def test_known_mood_and_language_schedules_a_refresh(monkeypatch):
+    cache, scheduled = _cache(monkeypatch)
+    cache.get("Happy", "Hindi")
+    cache.get("motivational", "Global")
+    assert scheduled == [("happy", "Hindi"), ("motivational", "Global")]
+
+
+def test_pools_are_evicted_least_recently_used_first(monkeypatch):
+    cache, _ = _cache(monkeypatch, max_keys=2)
+    monkeypatch.setattr(candidate_pool, "get_spotify_token", lambda: "token")
+    monkeypatch.setattr(cache, "fetch", lambda query, token: [{"id": query}])
+    monkeypatch.setattr(candidate_pool.feature_store, "fetch_missing", lambda ids, token: None)
+    monkeypatch.setattr(candidate_pool.feature_store, "matrix_for", lambda ids: np.zeros((len(ids), 4), np.float32))
+
+    cache._refresh(("happy", "English"), None)
+    cache._refresh(("sad", "English"), None)
+    cache.get("happy", "English")  # Now the most recently used
+    cache._refresh(("calm", "English"), None)
+
+    assert list(cache._pools) == [("happy", "English"), ("calm", "English")]
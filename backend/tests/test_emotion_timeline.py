@@ -0,0 +1,29 @@
+from datetime import datetime
+
+import pytest
+
+from utils.emotion_timeline import parse_range
+
+
+def test_parse_range_converts_z_suffix_to_naive_utc():
+    start, end = parse_range("day", "2024-01-01T00:00:00Z", "2024-01-08T00:00:00Z")
+    assert start == datetime(2024, 1, 1)
+    assert end == datetime(2024, 1, 8)
+    assert start.tzinfo is None and end.tzinfo is None
+
+
+def test_parse_range_converts_offsets_to_utc():
+    start, end = parse_range("hour", "2024-01-01T05:30:00+05:30", "2024-01-02T00:00:00")
+    assert start == datetime(2024, 1, 1)
+    assert end == datetime(2024, 1, 2)
+
+
+def test_parse_range_aware_start_without_end_uses_now():
+    start, end = parse_range("day", "2024-01-01T00:00:00Z", None)
+    assert start == datetime(2024, 1, 1)
+    assert end > start
+
+
+def test_parse_range_rejects_reversed_range():
+    with pytest.raises(ValueError):
+        parse_range("day", "2024-01-08T00:00:00Z", "2024-01-01T00:00:00Z")
@@ -0,0 +1,37 @@
+from models import db, User
+from utils import identity
+from utils.identity import clear_identity_cache, load_identity
+
+
+def _users(count):
+    users = [User(email=f"user{i}@example.com", language="English") for i in range(count)]
+    db.session.add_all(users)
+    db.session.commit()
+    return [u.id for u in users]
+
+
+def test_expired_entry_is_dropped_when_read(app, monkeypatch):
+    clear_identity_cache()
+    user_id, = _users(1)
+    clock = [100.0]
+    monkeypatch.setattr(identity.time, "monotonic", lambda: clock[0])
+
+    load_identity(user_id, "language")
+    assert user_id in identity._cache
+    clock[0] += app.config["IDENTITY_CACHE_TTL"] + 1
+    app.config["IDENTITY_CACHE_TTL"] = 0  # The re-read must not cache again
+    assert load_identity(user_id, "language").language == "English"
+    assert user_id not in identity._cache
+
+
+def test_cache_keeps_only_the_most_recently_used_users(app):
+    clear_identity_cache()
+    app.config["IDENTITY_CACHE_SIZE"] = 2
+    first, second, third = _users(3)
+
+    load_identity(first, "language")
+    load_identity(second, "language")
+    load_identity(first, "language")  # Hit: now the most recently used
+    load_identity(third, "language")
+
+    assert list(identity._cache) == [first, third]
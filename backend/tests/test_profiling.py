@@ -0,0 +1,32 @@
+import threading
+import time
+
+from utils.profiling import SamplingProfiler
+
+
+def test_sampler_survives_threads_entering_and_leaving(tmp_path):
+    profiler = SamplingProfiler()
+    profiler.directory = str(tmp_path)
+    assert profiler.start("work", seconds=1, interval=0.001) is not None
+    session = profiler.active
+    stop = threading.Event()
+
+    def churn():
+        while not stop.is_set():
+            profiler._enter(session)
+            profiler._exit()
+
+    threads = [threading.Thread(target=churn) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    with profiler.watching("work"):
+        deadline = time.monotonic() + 1.5
+        while profiler.active is not None and time.monotonic() < deadline:
+            sum(range(1000))
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    assert profiler.active is None
+    assert session.samples > 0
+    assert list(tmp_path.glob("*.folded"))
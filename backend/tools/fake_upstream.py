@@ -0,0 +1,409 @@
+"""
+Local stand-in for the Spotify accounts/Web API and Google OAuth hosts.
+
+Serves deterministic fixtures for every upstream endpoint the backend calls, so
+handlers can be load-tested and developed without network access or real
+credentials. The same query always returns the same tracks, artists and
+playlists; tokens and profiles are derived from the code or token they are
+exchanged for, so distinct OAuth codes give distinct users.
+
+Latency, 5xx errors and 429s can be injected (all randomness comes from --seed)
+and changed while the server runs through /_control:
+    curl -X POST localhost:5055/_control -H 'Content-Type: application/json' -d '{"error_rate": 0.2}'
+
+Run from the backend directory:
+    python tools/fake_upstream.py --port 5055 --latency-ms 80 --jitter-ms 40 --error-rate 0.01 --rate-limit-rate 0.01
+
+and point the app at it (e.g. in .env):
+    SPOTIFY_API_BASE=http://127.0.0.1:5055
+    SPOTIFY_ACCOUNTS_BASE=http://127.0.0.1:5055
+    GOOGLE_ACCOUNTS_BASE=http://127.0.0.1:5055
+    GOOGLE_OAUTH_BASE=http://127.0.0.1:5055
+    GOOGLE_API_BASE=http://127.0.0.1:5055
+"""
+import argparse
+import hashlib
+import random
+import threading
+import time
+import urllib.parse
+from collections import Counter
+from functools import lru_cache
+from flask import Flask, jsonify, redirect, request
+
+ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+WORDS = (
+    "Midnight", "Golden", "Electric", "Velvet", "Neon", "Silent", "Wild", "Paper", "Ocean", "Summer",
+    "Broken", "Crystal", "Lonely", "Fire", "Dream", "Echo", "Glass", "Honey", "River", "Shadow",
+    "Sunrise", "Thunder", "Violet", "Winter", "Youth", "Static", "Satellite", "Harbor", "Desert", "Lights",
+)
+GENRES = ("pop", "rock", "indie", "hip hop", "r&b", "electronic", "jazz", "classical", "bollywood", "acoustic")
+ARTIST_COUNT = 200      # Small roster so artists repeat across results, like real searches
+SEARCH_TOTAL = 1000     # Items available per (query, type); paging past it returns nothing
+
+
+def _digest(*parts):
+    return hashlib.blake2b(":".join(str(p) for p in parts).encode("utf-8"), digest_size=16).digest()
+
+
+def spotify_id(*parts):
+    """22-character base62 ID, stable for the same parts"""
+    number = int.from_bytes(_digest(*parts), "big")
+    chars = []
+    for _ in range(22):
+        number, rest = divmod(number, 62)
+        chars.append(ALPHABET[rest])
+    return "".join(chars)
+
+
+def _unit(*parts):
+    """Stable float in [0, 1)"""
+    return int.from_bytes(_digest(*parts)[:8], "big") / 2 ** 64
+
+
+def _pick(options, *parts):
+    return options[int(_unit(*parts) * len(options))]
+
+
+def _title(*parts):
+    return f"{_pick(WORDS, 'a', *parts)} {_pick(WORDS, 'b', *parts)}"
+
+
+def _images(*parts):
+    key = spotify_id("image", *parts)
+    return [{"url": f"https://i.scdn.co/image/{key}{size}", "height": size, "width": size} for size in (640, 300, 64)]
+
+
+@lru_cache(maxsize=None)
+def artist(index):
+    artist_id = spotify_id("artist", index)
+    return {
+        "id": artist_id,
+        "name": f"{_title('artist', index)} {index}",
+        "type": "artist",
+        "uri": f"spotify:artist:{artist_id}",
+        "genres": [_pick(GENRES, "genre", index)],
+        "popularity": int(_unit("popularity", "artist", index) * 100),
+        "followers": {"href": None, "total": int(_unit("followers", index) ** 3 * 5_000_000)},
+        "images": _images("artist", index),
+        "external_urls": {"spotify": f"https://open.spotify.com/artist/{artist_id}"},
+    }
+
+
+def _simple_artist(index):
+    full = artist(index)
+    return {key: full[key] for key in ("id", "name", "type", "uri", "external_urls")}
+
+
+def album(*parts):
+    album_id = spotify_id("album", *parts)
+    artist_index = int(_unit("album-artist", *parts) * ARTIST_COUNT)
+    return {
+        "id": album_id,
+        "name": _title("album", *parts),
+        "album_type": "album",
+        "type": "album",
+        "uri": f"spotify:album:{album_id}",
+        "release_date": f"20{10 + int(_unit('year', *parts) * 15)}-{1 + int(_unit('month', *parts) * 12):02d}-01",
+        "total_tracks": 8 + int(_unit("tracks", *parts) * 10),
+        "artists": [_simple_artist(artist_index)],
+        "images": _images("album", *parts),
+        "external_urls": {"spotify": f"https://open.spotify.com/album/{album_id}"},
+    }
+
+
+def track(query, position):
+    track_id = spotify_id("track", query, position)
+    artist_index = int(_unit("track-artist", query, position) * ARTIST_COUNT)
+    artists = [_simple_artist(artist_index)]
+    if _unit("featuring", query, position) < 0.2:
+        artists.append(_simple_artist((artist_index + 17) % ARTIST_COUNT))
+    return {
+        "id": track_id,
+        "name": _title("track", query, position),
+        "type": "track",
+        "uri": f"spotify:track:{track_id}",
+        "duration_ms": 150_000 + int(_unit("duration", track_id) * 120_000),
+        "explicit": _unit("explicit", track_id) < 0.1,
+        "popularity": int(_unit("popularity", track_id) * 100),
+        "preview_url": None,
+        "artists": artists,
+        "album": album("track-album", artist_index, int(_unit("album-of", track_id) * 4)),
+        "external_urls": {"spotify": f"https://open.spotify.com/track/{track_id}"},
+    }
+
+
+def playlist(*parts):
+    playlist_id = spotify_id("playlist", *parts)
+    return {
+        "id": playlist_id,
+        "name": _title("playlist", *parts),
+        "description": f"{_pick(GENRES, 'playlist-genre', *parts).title()} picks, updated every week",
+        "type": "playlist",
+        "uri": f"spotify:playlist:{playlist_id}",
+        "public": True,
+        "owner": {"id": "spotify", "display_name": "Spotify"},
+        "tracks": {"total": 20 + int(_unit("playlist-size", *parts) * 80)},
+        "images": _images("playlist", *parts)[:1],
+        "external_urls": {"spotify": f"https://open.spotify.com/playlist/{playlist_id}"},
+    }
+
+
+def audio_features(track_id):
+    return {
+        "id": track_id,
+        "type": "audio_features",
+        "valence": round(_unit("valence", track_id), 3),
+        "energy": round(_unit("energy", track_id), 3),
+        "tempo": round(60 + _unit("tempo", track_id) * 130, 3),
+        "acousticness": round(_unit("acousticness", track_id), 3),
+        "danceability": round(_unit("danceability", track_id), 3),
+    }
+
+
+def _page(items_for, limit, offset, total=SEARCH_TOTAL):
+    limit = max(1, min(int(limit), 50))
+    offset = max(0, int(offset))
+    return {
+        "items": [items_for(position) for position in range(offset, min(offset + limit, total))],
+        "limit": limit,
+        "offset": offset,
+        "total": total,
+        "next": None,
+        "previous": None,
+    }
+
+
+class Faults:
+    """Injected latency, 5xx errors and 429s; adjustable at runtime"""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, rate_limit_rate=0.0, retry_after=1, seed=0):
+        self.settings = {
+            "latency_ms": latency_ms,
+            "jitter_ms": jitter_ms,
+            "error_rate": error_rate,
+            "rate_limit_rate": rate_limit_rate,
+            "retry_after": retry_after,
+        }
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def update(self, changes):
+        with self._lock:
+            for key, value in changes.items():
+                if key in self.settings:
+                    self.settings[key] = type(self.settings[key])(value)
+            return dict(self.settings)
+
+    def draw(self):
+        """(delay in seconds, status to fail with or None) for one request"""
+        with self._lock:
+            s = self.settings
+            delay = max(0.0, s["latency_ms"] + self._random.uniform(-1, 1) * s["jitter_ms"]) / 1000
+            roll = self._random.random()
+            if roll < s["rate_limit_rate"]:
+                return delay, 429
+            if roll < s["rate_limit_rate"] + s["error_rate"]:
+                return delay, 503
+            return delay, None
+
+
+def _bearer():
+    auth = request.headers.get("Authorization", "")
+    return auth[len("Bearer "):] if auth.startswith("Bearer ") else None
+
+
+def _unauthorized(message="Invalid access token"):
+    return jsonify({"error": {"status": 401, "message": message}}), 401
+
+
+def create_app(faults, token_ttl=3600):
+    app = Flask(__name__)
+    calls = Counter()
+
+    @app.before_request
+    def inject_faults():
+        if request.path.startswith("/_"):
+            return None
+        calls[request.path] += 1
+        delay, status = faults.draw()
+        if delay:
+            time.sleep(delay)
+        if status == 429:
+            response = jsonify({"error": {"status": 429, "message": "API rate limit exceeded"}})
+            response.status_code = 429
+            response.headers["Retry-After"] = str(faults.settings["retry_after"])
+            return response
+        if status is not None:
+            return jsonify({"error": {"status": status, "message": "Service unavailable"}}), status
+        return None
+
+    @app.route("/_control", methods=["GET", "POST"])
+    def control():
+        if request.method == "POST":
+            return jsonify(faults.update(request.get_json(silent=True) or {}))
+        return jsonify(faults.settings)
+
+    @app.route("/_stats")
+    def stats():
+        return jsonify(dict(calls))
+
+    # --- Spotify accounts ---
+
+    @app.route("/authorize")
+    def spotify_authorize():
+        code = f"spotify-code-{spotify_id('code', request.args.get('state', ''), time.time_ns())}"
+        query = urllib.parse.urlencode({"code": code, "state": request.args.get("state", "")})
+        return redirect(f"{request.args['redirect_uri']}?{query}")
+
+    @app.route("/api/token", methods=["POST"])
+    def spotify_token():
+        grant = request.form.get("grant_type")
+        if grant == "client_credentials":
+            seed = request.headers.get("Authorization", "")
+        elif grant == "authorization_code":
+            seed = request.form.get("code", "")
+        elif grant == "refresh_token":
+            seed = request.form.get("refresh_token", "")
+        else:
+            return jsonify({"error": "unsupported_grant_type"}), 400
+        if not seed:
+            return jsonify({"error": "invalid_request"}), 400
+        data = {
+            "access_token": f"fake-{spotify_id('access', grant, seed)}",
+            "token_type": "Bearer",
+            "expires_in": token_ttl,
+        }
+        if grant == "authorization_code":
+            data["refresh_token"] = f"fake-refresh-{spotify_id('refresh', seed)}"
+        return jsonify(data)
+
+    # --- Spotify Web API ---
+
+    @app.route("/v1/me")
+    def me():
+        token = _bearer()
+        # "expired" lets clients exercise their refresh path
+        if not token or token == "expired":
+            return _unauthorized("The access token expired" if token else "No token provided")
+        user_id = spotify_id("user", token)
+        return jsonify({
+            "id": user_id,
+            "display_name": f"Listener {user_id[:6]}",
+            "email": f"{user_id.lower()}@example.test",
+            "country": "US",
+            "product": "premium",
+            "type": "user",
+            "uri": f"spotify:user:{user_id}",
+        })
+
+    @app.route("/v1/search")
+    def search():
+        if not _bearer():
+            return _unauthorized()
+        query = request.args.get("q", "")
+        if not query:
+            return jsonify({"error": {"status": 400, "message": "No search query"}}), 400
+        limit = request.args.get("limit", 20)
+        offset = request.args.get("offset", 0)
+        data = {}
+        for kind in request.args.get("type", "track").split(","):
+            if kind == "track":
+                data["tracks"] = _page(lambda i: track(query, i), limit, offset)
+            elif kind == "artist":
+                # Exact-name queries (the app looks artists up by name) get that artist first
+                base = int(_unit("artist-query", query) * ARTIST_COUNT)
+                data["artists"] = _page(lambda i: artist((base + i) % ARTIST_COUNT), limit, offset, ARTIST_COUNT)
+                if int(offset) == 0:
+                    match = next((artist(i) for i in range(ARTIST_COUNT) if artist(i)["name"].lower() == query.lower()), None)
+                    if match:
+                        data["artists"]["items"][0] = dict(match)
+            elif kind == "playlist":
+                data["playlists"] = _page(lambda i: playlist("search", query, i), limit, offset)
+            elif kind == "album":
+                data["albums"] = _page(lambda i: album("search", query, i), limit, offset)
+            else:
+                return jsonify({"error": {"status": 400, "message": f"Bad search type field {kind}"}}), 400
+        return jsonify(data)
+
+    @app.route("/v1/browse/featured-playlists")
+    def featured_playlists():
+        if not _bearer():
+            return _unauthorized()
+        page = _page(lambda i: playlist("featured", i), request.args.get("limit", 20), request.args.get("offset", 0), 100)
+        return jsonify({"message": "Featured playlists", "playlists": page})
+
+    @app.route("/v1/browse/new-releases")
+    def new_releases():
+        if not _bearer():
+            return _unauthorized()
+        page = _page(lambda i: album("new-release", i), request.args.get("limit", 20), request.args.get("offset", 0), 100)
+        return jsonify({"albums": page})
+
+    @app.route("/v1/audio-features")
+    def audio_features_batch():
+        if not _bearer():
+            return _unauthorized()
+        ids = [i for i in request.args.get("ids", "").split(",") if i][:100]
+        return jsonify({"audio_features": [audio_features(i) for i in ids]})
+
+    # --- Google OAuth ---
+
+    @app.route("/o/oauth2/v2/auth")
+    def google_authorize():
+        code = f"google-code-{spotify_id('code', request.args.get('state', ''), time.time_ns())}"
+        query = urllib.parse.urlencode({"code": code, "state": request.args.get("state", "")})
+        return redirect(f"{request.args['redirect_uri']}?{query}")
+
+    @app.route("/token", methods=["POST"])
+    def google_token():
+        code = request.form.get("code")
+        if request.form.get("grant_type") != "authorization_code" or not code:
+            return jsonify({"error": "invalid_grant", "error_description": "Bad Request"}), 400
+        return jsonify({
+            "access_token": f"google-{spotify_id('google-access', code)}",
+            "id_token": f"google-id-{spotify_id('google-id', code)}",
+            "expires_in": token_ttl,
+            "token_type": "Bearer",
+            "scope": "openid email profile",
+        })
+
+    @app.route("/oauth2/v2/userinfo")
+    def google_userinfo():
+        token = _bearer()
+        if not token:
+            return jsonify({"error": {"code": 401, "message": "Request is missing required authentication credential."}}), 401
+        number = int.from_bytes(_digest("google-user", token)[:8], "big")
+        return jsonify({
+            "id": str(number),
+            "email": f"user{number % 10 ** 9}@example.test",
+            "verified_email": True,
+            "name": f"Test User {number % 10 ** 4}",
+            "given_name": "Test",
+            "family_name": f"User {number % 10 ** 4}",
+            "picture": f"https://lh3.googleusercontent.com/a/{spotify_id('avatar', number)}",
+        })
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="mean added latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="latency varies uniformly by +/- this much")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of requests answered 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--token-ttl", type=int, default=3600, help="expires_in of issued tokens")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    faults = Faults(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit_rate, args.retry_after, args.seed)
+    app = create_app(faults, args.token_ttl)
+    app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Summarize the profiling sessions started through POST /api/admin/profile.
+
+Reads the folded-stack files in PROFILE_DIR (or --dir), keeps the latest
+sessions (optionally for one target), and prints the hottest frames by self
+samples (time spent in the frame itself) and by total samples (time with the
+frame anywhere on the stack). --merge writes the selected stacks as a single
+folded file for flamegraph.pl / speedscope / inferno.
+
+Start a session, then summarize once it has finished:
+    curl -X POST localhost:5000/api/admin/profile -H "X-Admin-Token: $ADMIN_TOKEN" \\
+         -H 'Content-Type: application/json' -d '{"target": "/api/recommendations", "seconds": 60}'
+
+Run from the backend directory:
+    python tools/profile_summary.py --last 5 --top 25
+    python tools/profile_summary.py --target inference --merge inference.folded
+    python tools/profile_summary.py --memory --top 15
+"""
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+
+
+def load_sessions(directory, target, last):
+    sessions = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        if not name.endswith(".json"):
+            continue
+        with open(os.path.join(directory, name), encoding="utf-8") as f:
+            info = json.load(f)
+        if target and info.get("target") != target:
+            continue
+        info["stem"] = os.path.join(directory, name[:-len(".json")])
+        sessions.append(info)
+        if len(sessions) == last:
+            break
+    return sessions
+
+
+def read_folded(path):
+    stacks = Counter()
+    if not os.path.exists(path):
+        return stacks
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            stack, _, count = line.rstrip("\n").rpartition(" ")
+            if stack:
+                stacks[stack] += int(count)
+    return stacks
+
+
+def top_frames(stacks):
+    """(self, total) Counters per frame; a frame recursing on one stack counts once towards its total"""
+    own, total = Counter(), Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(";")
+        own[frames[-1]] += count
+        for frame in set(frames):
+            total[frame] += count
+    return own, total
+
+
+def print_table(title, counts, overall, top, unit):
+    print(f"\n{title}")
+    print(f"{unit:>10} {'%':>6}  frame")
+    for frame, count in counts.most_common(top):
+        print(f"{count:>10} {count / overall:>6.1%}  {frame}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", default=Config.PROFILE_DIR, help="profile output directory (default: PROFILE_DIR)")
+    parser.add_argument("--target", help="only sessions for this route rule or 'inference'")
+    parser.add_argument("--last", type=int, default=10, help="latest sessions to include")
+    parser.add_argument("--top", type=int, default=20, help="frames to list")
+    parser.add_argument("--memory", action="store_true", help="summarize the allocation profiles (KiB) instead of CPU samples")
+    parser.add_argument("--merge", help="write the combined folded stacks to this file")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.dir):
+        raise SystemExit(f"No profiles in {args.dir}")
+    sessions = load_sessions(args.dir, args.target, args.last)
+    if not sessions:
+        raise SystemExit("No matching profiling sessions")
+
+    suffix = ".alloc.folded" if args.memory else ".folded"
+    stacks = Counter()
+    print(f"{'started':<26} {'target':<30} {'pid':>7} {'seconds':>7} {'requests':>8} {'samples':>8}")
+    for info in sessions:
+        stacks.update(read_folded(info["stem"] + suffix))
+        print(f"{info['started_at']:<26} {info['target']:<30} {info['pid']:>7} {info['seconds']:>7} "
+              f"{info['requests']:>8} {info['samples']:>8}")
+
+    overall = sum(stacks.values())
+    if not overall:
+        raise SystemExit("\nThe selected sessions recorded no samples" + (" with memory tracking" if args.memory else ""))
+    unit = "KiB" if args.memory else "samples"
+    own, total = top_frames(stacks)
+    print_table(f"Top frames by self {unit}", own, overall, args.top, unit)
+    print_table(f"Top frames by total {unit}", total, overall, args.top, unit)
+
+    if args.merge:
+        with open(args.merge, "w", encoding="utf-8") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        print(f"\n💾 Merged stacks written to {args.merge}")
+
+
+if __name__ == "__main__":
+    main()
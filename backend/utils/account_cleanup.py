@@ -0,0 +1,96 @@
+import logging
+import threading
+from datetime import datetime
+from flask import current_app
+from models import (db, User, EmotionLog, VoiceCommandLog, GestureLog, LikedSong, SongHistory, Playlist, PlaylistSong,
+                    DailyActivitySummary, EmotionRollup, UserHistoryFilter)
+
+log = logging.getLogger(__name__)
+
+# Every table keyed directly on users.id (playlists are handled separately)
+USER_OWNED_MODELS = (EmotionLog, VoiceCommandLog, GestureLog, LikedSong, SongHistory, DailyActivitySummary,
+                     EmotionRollup, UserHistoryFilter)
+
+
+def count_user_rows(user_id, limit):
+    """Count the user's rows across owned tables, stopping once `limit` is exceeded"""
+    total = 0
+    for model in USER_OWNED_MODELS + (Playlist,):
+        remaining = limit - total + 1
+        total += db.session.query(model.id).filter(model.user_id == int(user_id)).limit(remaining).count()
+        if total > limit:
+            break
+    return total
+
+
+def delete_user_data(user_id):
+    """Delete a user and everything they own with one set-based DELETE per table (caller commits)"""
+    user_id = int(user_id)
+    playlist_ids = db.select(Playlist.id).where(Playlist.user_id == user_id)
+    PlaylistSong.query.filter(PlaylistSong.playlist_id.in_(playlist_ids)).delete(synchronize_session=False)
+    Playlist.query.filter(Playlist.user_id == user_id).delete(synchronize_session=False)
+    for model in USER_OWNED_MODELS:
+        model.query.filter(model.user_id == user_id).delete(synchronize_session=False)
+    User.query.filter(User.id == user_id).delete(synchronize_session=False)
+
+
+def _delete_in_chunks(model, criteria, chunk_size):
+    while True:
+        ids = [row[0] for row in db.session.query(model.id).filter(criteria).limit(chunk_size).all()]
+        if not ids:
+            return
+        if model is Playlist:
+            PlaylistSong.query.filter(PlaylistSong.playlist_id.in_(ids)).delete(synchronize_session=False)
+        model.query.filter(model.id.in_(ids)).delete(synchronize_session=False)
+        # Short transactions: release the write lock between chunks
+        db.session.commit()
+
+
+def purge_user_data_in_chunks(user_id, chunk_size):
+    """Same result as delete_user_data(), but committed `chunk_size` rows at a time.
+
+    Safe to re-run: if the process dies half-way the next run picks up what is left.
+    The user row goes last so a partial purge never leaves orphaned rows behind.
+    """
+    user_id = int(user_id)
+    for model in USER_OWNED_MODELS + (Playlist,):
+        _delete_in_chunks(model, model.user_id == user_id, chunk_size)
+    User.query.filter(User.id == user_id).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def mark_account_for_purge(user):
+    """Record that the user asked to be deleted (caller commits), so a purge cut short can be resumed"""
+    user.deletion_requested_at = datetime.utcnow()
+
+
+def resume_account_purges(chunk_size):
+    """Finish the purges of every account still marked for deletion; returns the user ids purged"""
+    user_ids = [row[0] for row in db.session.query(User.id).filter(User.deletion_requested_at.isnot(None)).all()]
+    for user_id in user_ids:
+        purge_user_data_in_chunks(user_id, chunk_size)
+        log.info("Finished pending account deletion", extra={"user_id": user_id})
+    return user_ids
+
+
+def schedule_account_purge(user_id):
+    """Run purge_user_data_in_chunks() on a background thread.
+
+    The thread dies with its worker; mark_account_for_purge() first so that
+    `flask purge-accounts` can finish the job.
+    """
+    app = current_app._get_current_object()
+    chunk_size = app.config.get("ACCOUNT_DELETE_CHUNK_SIZE", 1000)
+
+    def run():
+        with app.app_context():
+            try:
+                purge_user_data_in_chunks(user_id, chunk_size)
+                log.info("Finished background account deletion", extra={"user_id": user_id})
+            except Exception:
+                db.session.rollback()
+                log.exception("Background account deletion failed", extra={"user_id": user_id})
+            finally:
+                db.session.remove()
+
+    threading.Thread(target=run, name=f"account-purge-{user_id}", daemon=True).start()
@@ -0,0 +1,16 @@
+import hmac
+from functools import wraps
+from flask import current_app, jsonify, request
+
+
+def admin_required(view):
+    """Allow the request only with an X-Admin-Token header matching ADMIN_TOKEN (404 when no token is configured)"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        expected = current_app.config.get("ADMIN_TOKEN")
+        if not expected:
+            return jsonify({"error": "Not found"}), 404
+        if not hmac.compare_digest(request.headers.get("X-Admin-Token", ""), expected):
+            return jsonify({"error": "Forbidden"}), 403
+        return view(*args, **kwargs)
+    return wrapper
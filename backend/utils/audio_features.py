@@ -0,0 +1,172 @@
+import logging
+import os
+import tempfile
+import threading
+import numpy as np
+from utils.metrics import record_cache
+from utils.spotify_client import spotify_client
+
+log = logging.getLogger(__name__)
+
+FEATURES = ("valence", "energy", "tempo", "acousticness")
+TEMPO_RANGE = (50.0, 200.0)  # BPM mapped onto 0..1 so every feature shares a scale
+
+# (valence, energy, tempo, acousticness) a track should sit near for each mood
+EMOTION_TARGETS = {
+    "happy": (0.85, 0.75, 0.60, 0.20),
+    "sad": (0.20, 0.30, 0.35, 0.60),
+    "angry": (0.30, 0.90, 0.70, 0.10),
+    "fear": (0.25, 0.50, 0.50, 0.40),
+    "surprise": (0.70, 0.80, 0.65, 0.20),
+    "disgust": (0.30, 0.60, 0.50, 0.30),
+    "neutral": (0.50, 0.50, 0.50, 0.40),
+    "depressed": (0.10, 0.20, 0.30, 0.70),
+    "stressed": (0.30, 0.80, 0.65, 0.20),
+    "anxious": (0.30, 0.60, 0.60, 0.30),
+    # Well-being destinations
+    "motivational": (0.75, 0.80, 0.65, 0.15),
+    "healing": (0.55, 0.35, 0.40, 0.70),
+    "calm": (0.50, 0.25, 0.35, 0.75),
+    "relaxing": (0.55, 0.20, 0.30, 0.80),
+    "courage": (0.65, 0.85, 0.70, 0.15),
+    "soothing": (0.60, 0.25, 0.35, 0.75),
+}
+EMOTION_TARGETS.update({
+    "happiness": EMOTION_TARGETS["happy"],
+    "sadness": EMOTION_TARGETS["sad"],
+    "anger": EMOTION_TARGETS["angry"],
+})
+
+# Valence and energy carry most of the mood; tempo and acousticness refine it
+FEATURE_WEIGHTS = np.array([1.0, 0.8, 0.4, 0.4], dtype=np.float32)
+
+
+def target_vector(emotion, desired=None, blend=0.6):
+    """Target feature vector for `emotion`, moved `blend` of the way towards `desired` if given"""
+    current = np.array(EMOTION_TARGETS.get((emotion or "").lower(), EMOTION_TARGETS["neutral"]), dtype=np.float32)
+    if not desired:
+        return current
+    goal = np.array(EMOTION_TARGETS.get(desired.lower(), current), dtype=np.float32)
+    return current + blend * (goal - current)
+
+
+def rank(features, target):
+    """Candidate order (best first) for an (N, 4) feature matrix; NaN rows sort last in input order"""
+    if len(features) == 0:
+        return np.empty(0, dtype=np.intp)
+    # Squared weighted distance: same order as the true distance without the sqrt
+    distance = (((features - target) ** 2) @ FEATURE_WEIGHTS)
+    distance[np.isnan(distance)] = np.inf
+    return np.argsort(distance, kind="stable")
+
+
+def _vector(item):
+    def value(name):
+        v = item.get(name)
+        return np.nan if v is None else float(v)
+
+    low, high = TEMPO_RANGE
+    tempo = np.clip((value("tempo") - low) / (high - low), 0.0, 1.0)
+    return (value("valence"), value("energy"), tempo, value("acousticness"))
+
+
+class AudioFeatureStore:
+    """Spotify audio features for track IDs, kept as one float32 matrix and cached on disk (.npz)"""
+
+    def __init__(self):
+        self.path = None
+        self._ids = []
+        self._index = {}
+        self._matrix = np.empty((0, len(FEATURES)), dtype=np.float32)
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.path = app.config["AUDIO_FEATURES_CACHE_PATH"]
+        self.load()
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                ids = [str(i) for i in data["ids"]]
+                matrix = data["matrix"].astype(np.float32)
+        except Exception as e:
+            log.warning("Could not read audio feature cache", extra={"path": self.path, "error": str(e)})
+            return
+        with self._lock:
+            self._ids = ids
+            self._index = {track_id: row for row, track_id in enumerate(ids)}
+            self._matrix = matrix
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            ids = np.array(self._ids)
+            matrix = self._matrix.copy()
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        # A temp file of our own next to the target, so concurrent workers never write into the same one
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".npz")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, ids=ids, matrix=matrix)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def __contains__(self, track_id):
+        return track_id in self._index
+
+    def matrix_for(self, track_ids):
+        """(N, 4) features aligned with `track_ids`; unknown tracks are NaN rows"""
+        with self._lock:
+            rows = np.fromiter((self._index.get(t, -1) for t in track_ids), dtype=np.intp, count=len(track_ids))
+            features = self._matrix[np.maximum(rows, 0)] if len(self._matrix) else np.zeros((len(rows), len(FEATURES)), np.float32)
+        features = features.copy()
+        features[rows < 0] = np.nan
+        return features
+
+    def _add(self, vectors):
+        with self._lock:
+            new = [(track_id, v) for track_id, v in vectors if track_id not in self._index]
+            if not new:
+                return
+            start = len(self._ids)
+            for offset, (track_id, _) in enumerate(new):
+                self._ids.append(track_id)
+                self._index[track_id] = start + offset
+            self._matrix = np.vstack([self._matrix, np.array([v for _, v in new], dtype=np.float32)])
+
+    def fetch_missing(self, track_ids, token):
+        """Bulk-fetch features for unknown IDs via /v1/audio-features (100 per call)"""
+        unique = [t for t in dict.fromkeys(track_ids) if t]
+        missing = [t for t in unique if t not in self._index]
+        record_cache("audio_features", True, len(unique) - len(missing))
+        record_cache("audio_features", False, len(missing))
+        fetched = 0
+        for start in range(0, len(missing), 100):
+            batch = missing[start:start + 100]
+            resp = spotify_client.get(
+                "/v1/audio-features",
+                params={"ids": ",".join(batch)},
+                headers={"Authorization": f"Bearer {token}"},
+                timeout=5,
+                priority="background"
+            )
+            if resp.status_code != 200:
+                log.warning("Audio features unavailable", extra={"status": resp.status_code})
+                break
+            items = resp.json().get("audio_features") or []
+            # Tracks Spotify has no analysis for come back as null: remember them as NaN
+            vectors = [(track_id, _vector(item) if item else (np.nan,) * len(FEATURES)) for track_id, item in zip(batch, items)]
+            self._add(vectors)
+            fetched += len(vectors)
+        if fetched:
+            self.save()
+        return fetched
+
+
+feature_store = AudioFeatureStore()
@@ -0,0 +1,168 @@
+import logging
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from utils.audio_features import feature_store, EMOTION_TARGETS, FEATURES
+from utils.catalog import LANGUAGES
+from utils.metadata import metadata
+from utils.metrics import record_cache
+from utils.spotify import get_spotify_token
+from utils.spotify_client import spotify_client
+
+log = logging.getLogger(__name__)
+
+
+def pool_query(query_emotion, language):
+    # For Global, search without language restriction
+    return query_emotion if language == "Global" else f"{query_emotion} {language}"
+
+
+class CandidatePoolCache:
+    """Spotify search results shared by every user asking for the same (query_emotion, language).
+
+    Requests only ever read the cache. A missing or stale pool is (re)fetched on a
+    background thread and the current contents (possibly empty) are served meanwhile.
+    Only known moods and languages get a pool, and at most `max_keys` pools are kept
+    (least recently used out), so request parameters cannot spend the Spotify budget.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.ttl = 1800
+        self.size = 100
+        self.max_keys = 200
+        self._pools = OrderedDict()  # (query_emotion, language) -> (fetched_at, tracks, audio feature matrix), LRU first
+        self._refreshing = set()
+        self._cursors = OrderedDict()  # (user_id, key) -> rotation offset
+        self._lock = threading.Lock()
+        self._executor = None
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        self.app = app
+        self.ttl = app.config["CANDIDATE_POOL_TTL"]
+        self.size = app.config["CANDIDATE_POOL_SIZE"]
+        self.max_keys = app.config["CANDIDATE_POOL_MAX_KEYS"]
+        self._executor = ThreadPoolExecutor(max_workers=app.config["CANDIDATE_POOL_WORKERS"], thread_name_prefix="candidate-pool")
+
+    def get(self, query_emotion, language, fallback_token=None):
+        """Current (tracks, features) for the key; schedules a background refresh when missing or stale.
+
+        `features` is an (N, 4) float32 matrix aligned with `tracks` (NaN rows where
+        Spotify has no audio analysis). Unknown moods or languages get an empty pool.
+        """
+        key = (query_emotion.lower(), language)
+        if key[0] not in EMOTION_TARGETS or language not in LANGUAGES:
+            return [], np.empty((0, len(FEATURES)), dtype=np.float32)
+        entry = self._pools.get(key)
+        if entry is not None:
+            with self._lock:
+                if key in self._pools:
+                    self._pools.move_to_end(key)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            self.misses += 1
+            record_cache("candidate_pool", False)
+            self._schedule_refresh(key, fallback_token)
+        else:
+            self.hits += 1
+            record_cache("candidate_pool", True)
+        if entry is None:
+            return [], np.empty((0, len(FEATURES)), dtype=np.float32)
+        return entry[1], entry[2]
+
+    def combined(self, language):
+        """Every cached pool for `language` merged into one (tracks, features) pair, duplicates dropped"""
+        tracks = []
+        blocks = []
+        seen = set()
+        with self._lock:
+            pools = list(self._pools.items())
+        for (_, pool_language), (_, pool_tracks, features) in pools:
+            if pool_language != language:
+                continue
+            keep = [i for i, t in enumerate(pool_tracks) if t["id"] not in seen]
+            seen.update(pool_tracks[i]["id"] for i in keep)
+            tracks += [pool_tracks[i] for i in keep]
+            blocks.append(features[keep])
+        if not blocks:
+            return [], np.empty((0, len(FEATURES)), dtype=np.float32)
+        return tracks, np.concatenate(blocks)
+
+    def _schedule_refresh(self, key, fallback_token):
+        with self._lock:
+            if key in self._refreshing or self._executor is None:
+                return
+            self._refreshing.add(key)
+        self._executor.submit(self._refresh, key, fallback_token)
+
+    def _refresh(self, key, fallback_token):
+        try:
+            with self.app.app_context():
+                token = get_spotify_token() or fallback_token
+                if not token:
+                    return
+                tracks = self.fetch(pool_query(*key), token)
+                if tracks:
+                    track_ids = [t["id"] for t in tracks]
+                    feature_store.fetch_missing(track_ids, token)
+                    entry = (time.monotonic(), tracks, feature_store.matrix_for(track_ids))
+                    with self._lock:
+                        self._pools[key] = entry
+                        self._pools.move_to_end(key)
+                        while len(self._pools) > self.max_keys:
+                            self._pools.popitem(last=False)
+        except Exception as e:
+            log.warning("Candidate pool refresh failed", extra={"pool": "/".join(key), "error": str(e)})
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def fetch(self, query, token):
+        """Up to `size` unique tracks for a search query, 50 per page"""
+        tracks = []
+        seen_track_ids = set()
+        for offset in range(0, self.size, 50):
+            resp = spotify_client.get(
+                f"/v1/search?q={urllib.parse.quote(query)}&type=track&limit=50&offset={offset}",
+                headers={"Authorization": f"Bearer {token}"},
+                timeout=5,
+                priority="background"
+            )
+            if resp.status_code != 200:
+                break
+            items = resp.json().get("tracks", {}).get("items", [])
+            for t in items:
+                if t and t.get("id") and t["id"] not in seen_track_ids:
+                    seen_track_ids.add(t["id"])
+                    tracks.append(metadata.track(t).search_result())
+            if len(items) < 50:
+                break
+        return tracks[:self.size]
+
+    def personalize(self, tracks, user_id, key, exclude=(), limit=15, window=None):
+        """A rotating slice of the (ranked) pool without the tracks in `exclude` (ids or URIs).
+
+        Rotation stays within the best `window` candidates when given.
+        """
+        candidates = [t for t in tracks if t["id"] not in exclude and t["spotifyUri"] not in exclude][:window]
+        if not candidates:
+            return []
+        cursor_key = (user_id, key)
+        with self._lock:
+            offset = self._cursors.pop(cursor_key, 0)
+            # Keep the rotation table bounded: drop the least recently used cursors
+            self._cursors[cursor_key] = offset + limit
+            while len(self._cursors) > 10000:
+                self._cursors.popitem(last=False)
+        start = offset % len(candidates)
+        picked = candidates[start:start + limit]
+        if len(picked) < limit:
+            picked += candidates[:min(start, limit - len(picked))]
+        return [dict(t) for t in picked]
+
+
+candidate_pools = CandidatePoolCache()
@@ -0,0 +1,145 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from sqlalchemy import func
+from models import db, Song
+
+log = logging.getLogger(__name__)
+
+# Detector labels, well-being words and curated_songs.json keys -> catalog emotion
+EMOTION_ALIASES = {
+    "happy": "happiness", "happiness": "happiness", "joy": "happiness",
+    "neutral": "happiness", "calm": "happiness",
+    "sad": "sadness", "sadness": "sadness", "depressed": "sadness",
+    "angry": "anger", "anger": "anger", "stressed": "anger",
+    "fear": "fear", "anxious": "fear", "scared": "fear",
+    "disgust": "disgust",
+    "surprise": "surprise", "surprised": "surprise",
+}
+
+# Well-being mode serves the mood we want to move towards instead of the detected one
+WELLBEING_TARGETS = {
+    "sadness": "happiness",
+    "anger": "happiness",
+    "fear": "happiness",
+    "disgust": "happiness",
+}
+
+GLOBAL_LANGUAGE = "Global"
+# Languages offered to clients; anything else only gets catalog results
+LANGUAGES = ("Hindi", "English", "Bengali", "Marathi", "Telugu", "Tamil", GLOBAL_LANGUAGE)
+
+
+def normalize_emotion(emotion):
+    return EMOTION_ALIASES.get((emotion or "").strip().lower())
+
+
+def _track(title, artist, spotify_uri, album=None, genre=None, song_id=None):
+    return {
+        "id": spotify_uri.rsplit(":", 1)[-1] if spotify_uri else song_id,
+        "title": title,
+        "artist": artist,
+        "album": album,
+        "genre": genre,
+        "spotifyUri": spotify_uri,
+        "imageUrl": None,
+        "source": "Catalog",
+    }
+
+
+class CatalogIndex:
+    """In-memory (language, emotion, wellbeing) -> tracks index over curated_songs.json and the Song table.
+
+    Lookups are plain dict reads. The index is rebuilt when the JSON file's mtime or
+    the Song table's row count / latest created_at changes, checked at most once
+    every `refresh_interval` seconds.
+    """
+
+    def __init__(self):
+        self.path = None
+        self.refresh_interval = 60
+        self._index = {}
+        self._signature = None
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.path = app.config["CURATED_SONGS_PATH"]
+        self.refresh_interval = app.config["CATALOG_REFRESH_INTERVAL"]
+        # The index is built by the first recommend(), so starting a worker doesn't touch the database
+
+    def _current_signature(self):
+        mtime = os.path.getmtime(self.path) if self.path and os.path.exists(self.path) else None
+        count, latest = db.session.query(func.count(Song.id), func.max(Song.created_at)).one()
+        return mtime, count, latest
+
+    def _load_curated(self):
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        with open(self.path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _build(self):
+        by_emotion = defaultdict(list)  # (language, catalog emotion) -> tracks
+        for language, emotions in self._load_curated().items():
+            for emotion, tracks in emotions.items():
+                key = normalize_emotion(emotion)
+                if not key:
+                    continue
+                for t in tracks:
+                    track = _track(t.get("title"), t.get("artist"), t.get("spotifyUri"), album=t.get("album"))
+                    by_emotion[(language, key)].append(track)
+                    by_emotion[(GLOBAL_LANGUAGE, key)].append(track)
+
+        # Song rows carry no language, so they are served for every language after the curated picks
+        songs = db.session.query(
+            Song.id, Song.title, Song.artist, Song.album, Song.genre, Song.spotify_uri, Song.emotion_tag
+        ).filter(Song.emotion_tag.isnot(None)).all()
+        untagged_language = defaultdict(list)
+        for song_id, title, artist, album, genre, uri, tag in songs:
+            key = normalize_emotion(tag)
+            if key:
+                untagged_language[key].append(_track(title, artist, uri, album=album, genre=genre, song_id=song_id))
+
+        languages = {language for language, _ in by_emotion} | {GLOBAL_LANGUAGE}
+        index = {}
+        for language in languages:
+            for emotion in set(EMOTION_ALIASES.values()):
+                for wellbeing in (False, True):
+                    target = WELLBEING_TARGETS.get(emotion, emotion) if wellbeing else emotion
+                    tracks = by_emotion.get((language, target), []) + untagged_language.get(target, [])
+                    if tracks:
+                        index[(language, emotion, wellbeing)] = tracks
+        return index
+
+    def refresh(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.refresh_interval:
+            return
+        with self._lock:
+            if not force and now - self._checked_at < self.refresh_interval:
+                return
+            self._checked_at = now
+            signature = self._current_signature()
+            if force or signature != self._signature:
+                self._index = self._build()
+                self._signature = signature
+
+    def recommend(self, language, emotion, wellbeing=False, limit=15):
+        """Tracks for the mood, never touching the network"""
+        try:
+            self.refresh()
+        except Exception as e:
+            # A broken file or DB hiccup keeps serving the last good index
+            log.warning("Catalog refresh failed", extra={"error": str(e)})
+        key = normalize_emotion(emotion)
+        if not key:
+            return []
+        tracks = self._index.get((language, key, wellbeing)) or self._index.get((GLOBAL_LANGUAGE, key, wellbeing), [])
+        return [dict(t) for t in tracks[:limit]]
+
+
+catalog = CatalogIndex()
@@ -0,0 +1,86 @@
+import threading
+import time
+from collections import deque
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Fails fast for an upstream endpoint whose recent error rate is too high.
+
+    Closed: calls go through and outcomes are kept for the last `window` calls.
+    Once at least `min_calls` are recorded and the failure share reaches
+    `error_threshold`, it opens and refuses calls for `open_seconds`. Then a
+    single probe call is let through (half-open): success closes it, failure
+    opens it again. `on_change(state)` is called on every transition.
+    """
+
+    def __init__(self, window=20, min_calls=5, error_threshold=0.5, open_seconds=30, on_change=None):
+        self.window = window
+        self.min_calls = min_calls
+        self.error_threshold = error_threshold
+        self.open_seconds = open_seconds
+        self.on_change = on_change
+        self.state = CLOSED
+        self._outcomes = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.opened = 0
+
+    def allow(self):
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                self._set_state(HALF_OPEN)
+                self._probing = False
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+            return False
+
+    def cancel(self):
+        """The allowed call was not made after all (e.g. no budget): free the probe slot"""
+        with self._lock:
+            self._probing = False
+
+    def record(self, success):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probing = False
+                if success:
+                    self._set_state(CLOSED)
+                    self._outcomes.clear()
+                else:
+                    self._open()
+                return
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.error_threshold:
+                self._open()
+
+    def _open(self):
+        self._set_state(OPEN)
+        self._opened_at = time.monotonic()
+        self.opened += 1
+
+    def _set_state(self, state):
+        # Caller holds self._lock
+        self.state = state
+        if self.on_change is not None:
+            self.on_change(state)
+
+    def snapshot(self):
+        with self._lock:
+            calls = len(self._outcomes)
+            return {
+                "state": self.state,
+                "error_rate": round(self._outcomes.count(False) / calls, 2) if calls else 0.0,
+                "opened": self.opened,
+                "rejected": self.rejected,
+            }
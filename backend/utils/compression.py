@@ -0,0 +1,54 @@
+import gzip
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # Optional: only gzip is offered without it
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = ("application/json", "text/plain", "text/html")
+
+
+def choose_encoding(accept_encoding):
+    """Best encoding this server can produce for an Accept-Encoding header, or None"""
+    accepted = {part.split(";")[0].strip().lower() for part in (accept_encoding or "").split(",")}
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(data, encoding, level):
+    if encoding == "br":
+        # Brotli quality runs 0-11; keep it in the fast range used for dynamic responses
+        return brotli.compress(data, quality=min(level, 5))
+    return gzip.compress(data, compresslevel=level)
+
+
+def init_compression(app):
+    """Compress text responses above COMPRESS_MIN_SIZE bytes with brotli or gzip"""
+    min_size = app.config["COMPRESS_MIN_SIZE"]
+    level = app.config["COMPRESS_LEVEL"]
+
+    @app.after_request
+    def compress_response(response):
+        if (
+            response.direct_passthrough
+            or response.status_code < 200
+            or response.status_code in (204, 304)
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        ):
+            return response
+        encoding = choose_encoding(request.headers.get("Accept-Encoding"))
+        response.vary.add("Accept-Encoding")
+        if encoding is None or (response.content_length or 0) < min_size:
+            return response
+        response.set_data(compress(response.get_data(), encoding, level))
+        response.headers["Content-Encoding"] = encoding
+        # Each encoding is its own representation, so it needs its own strong ETag
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(f"{etag}-{encoding}", weak)
+        return response
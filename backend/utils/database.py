@@ -0,0 +1,130 @@
+import logging
+from datetime import datetime
+from functools import partial
+from flask import g
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+from models import db, SongHistory
+
+log = logging.getLogger(__name__)
+
+REPLICA_BIND = "replica"
+
+# Columns added after their table already held rows: (column, value given to rows where it is NULL).
+# song_history rows older than played_at are dated to the migration, which starts their retention period.
+BACKFILLS = ((SongHistory.played_at, datetime.utcnow),)
+
+
+def normalize_database_url(url):
+    """Accept the legacy 'postgres://' scheme many hosting providers still hand out"""
+    if url and url.startswith("postgres://"):
+        return "postgresql://" + url[len("postgres://"):]
+    return url
+
+
+def _is_memory_sqlite(url):
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def engine_options(url, config):
+    """Engine keyword arguments tuned for the backend behind `url`"""
+    url = make_url(url)
+    if _is_memory_sqlite(url):
+        # Flask-SQLAlchemy already pins in-memory databases to a single StaticPool connection
+        return {}
+
+    options = {
+        "pool_size": config["DB_POOL_SIZE"],
+        "max_overflow": config["DB_MAX_OVERFLOW"],
+        "pool_timeout": config["DB_POOL_TIMEOUT"],
+        "pool_pre_ping": True,
+    }
+    if url.get_backend_name() == "sqlite":
+        # sqlite3's own busy handler; the PRAGMA below covers connections opened elsewhere
+        options["connect_args"] = {"timeout": config["SQLITE_BUSY_TIMEOUT_MS"] / 1000, "check_same_thread": False}
+    else:
+        options["pool_recycle"] = config["DB_POOL_RECYCLE"]
+    return options
+
+
+def _set_sqlite_pragmas(config, dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        # WAL lets readers run alongside the single writer; NORMAL is durable in WAL mode
+        cursor.execute(f"PRAGMA journal_mode={config['SQLITE_JOURNAL_MODE']}")
+        cursor.execute(f"PRAGMA synchronous={config['SQLITE_SYNCHRONOUS']}")
+        cursor.execute(f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT_MS'])}")
+        cursor.execute(f"PRAGMA mmap_size={int(config['SQLITE_MMAP_SIZE'])}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+
+def init_database(app):
+    """Configure engines (pool sizes, SQLite pragmas, optional read replica) and bind `db` to the app"""
+    config = app.config
+    config["SQLALCHEMY_DATABASE_URI"] = normalize_database_url(config["SQLALCHEMY_DATABASE_URI"])
+    options = engine_options(config["SQLALCHEMY_DATABASE_URI"], config)
+    options.update(config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    config["SQLALCHEMY_ENGINE_OPTIONS"] = options
+
+    replica_url = normalize_database_url(config.get("DATABASE_REPLICA_URL"))
+    if replica_url:
+        binds = dict(config.get("SQLALCHEMY_BINDS") or {})
+        binds[REPLICA_BIND] = {"url": replica_url, **engine_options(replica_url, config)}
+        config["SQLALCHEMY_BINDS"] = binds
+
+    db.init_app(app)
+
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == "sqlite" and not _is_memory_sqlite(engine.url):
+                event.listen(engine, "connect", partial(_set_sqlite_pragmas, config))
+
+    app.teardown_appcontext(_close_read_session)
+
+
+def read_session():
+    """Session for read-only routes: the replica when configured, otherwise the primary session.
+
+    Replica reads may lag slightly behind writes, so only use it where that is acceptable.
+    """
+    engine = db.engines.get(REPLICA_BIND)
+    if engine is None:
+        return db.session
+    if "replica_session" not in g:
+        g.replica_session = Session(bind=engine)
+    return g.replica_session
+
+
+def _close_read_session(exc):
+    session = g.pop("replica_session", None)
+    if session is not None:
+        session.close()
+
+
+def upgrade_schema():
+    """Add the nullable columns and indexes that db.create_all() cannot add to existing tables, then apply BACKFILLS"""
+    engine = db.engine
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable or column.primary_key:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+                log.info("Added column", extra={"table": table.name, "column": column.name})
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+        for column, value in BACKFILLS:
+            if not inspector.has_table(column.table.name):
+                continue
+            result = conn.execute(column.table.update().where(column.is_(None)).values({column.name: value()}))
+            if result.rowcount:
+                log.info("Backfilled column", extra={"table": column.table.name, "column": column.name,
+                                                     "rows": result.rowcount})
@@ -0,0 +1,33 @@
+from collections import Counter
+
+
+def primary_artist(item):
+    """First credited artist, lowercased ("A, B" -> "a")"""
+    return (item.get("artist") or "").split(",")[0].strip().lower()
+
+
+def diversify(items, limit, max_per_artist=2, max_per_album=2):
+    """Re-rank `items` so no artist or album takes more than its share of the first `limit` slots.
+
+    One pass in input order: items whose primary artist or album is already at its
+    cap are set aside and only used to fill slots nothing else could. Order is
+    otherwise preserved, so callers should pass candidates best first.
+    """
+    picked = []
+    deferred = []
+    artists = Counter()
+    albums = Counter()
+    for item in items:
+        if len(picked) >= limit:
+            break
+        artist = primary_artist(item)
+        album = (item.get("album") or "").strip().lower()
+        if (artist and artists[artist] >= max_per_artist) or (album and albums[album] >= max_per_album):
+            deferred.append(item)
+            continue
+        artists[artist] += 1
+        albums[album] += 1
+        picked.append(item)
+    if len(picked) < limit:
+        picked += deferred[:limit - len(picked)]
+    return picked
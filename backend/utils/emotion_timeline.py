@@ -0,0 +1,144 @@
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from models import db, EmotionLog, EmotionRollup
+
+GRANULARITIES = ("hour", "day", "week")
+
+# Range returned when the caller does not pass `start`
+DEFAULT_SPAN = {
+    "hour": timedelta(days=7),
+    "day": timedelta(days=90),
+    "week": timedelta(weeks=104),
+}
+
+_UPSERT_INSERTS = {"sqlite": sqlite_insert, "postgresql": pg_insert}
+
+
+def bucket_start(ts, granularity):
+    """Start of the bucket containing `ts` (weeks start on Monday)"""
+    if granularity == "hour":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    day = ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return day
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+
+def _increment(counts):
+    """Add {(user_id, granularity, bucket_start, emotion): n} to the rollup table (caller commits)"""
+    if not counts:
+        return
+    rows = [
+        {"user_id": user_id, "granularity": granularity, "bucket_start": start, "emotion": emotion, "total": n}
+        for (user_id, granularity, start, emotion), n in counts.items()
+    ]
+    insert = _UPSERT_INSERTS.get(db.session.get_bind().dialect.name)
+    if insert is not None:
+        stmt = insert(EmotionRollup).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "granularity", "bucket_start", "emotion"],
+            set_={"total": EmotionRollup.total + stmt.excluded.total},
+        )
+        db.session.execute(stmt)
+        return
+
+    # Databases without INSERT ... ON CONFLICT: read-modify-write
+    for row in rows:
+        rollup = EmotionRollup.query.filter_by(
+            user_id=row["user_id"], granularity=row["granularity"],
+            bucket_start=row["bucket_start"], emotion=row["emotion"],
+        ).first()
+        if rollup:
+            rollup.total += row["total"]
+        else:
+            db.session.add(EmotionRollup(**row))
+
+
+def record_emotion(user_id, emotion, ts):
+    """Count one logged emotion in its hour, day and week buckets (caller commits)"""
+    _increment(Counter({(int(user_id), g, bucket_start(ts, g), emotion): 1 for g in GRANULARITIES}))
+
+
+def backfill_rollups(chunk_size=5000):
+    """Build rollups from the raw emotion_logs rows that are still present.
+
+    Meant to run once when rollups are introduced; running it again would double count.
+    Returns the number of log rows processed.
+    """
+    processed = 0
+    last_id = 0
+    while True:
+        rows = (
+            db.session.query(EmotionLog.id, EmotionLog.user_id, EmotionLog.emotion, EmotionLog.timestamp)
+            .filter(EmotionLog.id > last_id, EmotionLog.timestamp.isnot(None))
+            .order_by(EmotionLog.id)
+            .limit(chunk_size)
+            .all()
+        )
+        if not rows:
+            return processed
+        counts = Counter()
+        for _, user_id, emotion, ts in rows:
+            for g in GRANULARITIES:
+                counts[(user_id, g, bucket_start(ts, g), emotion)] += 1
+        _increment(counts)
+        db.session.commit()
+        last_id = rows[-1][0]
+        processed += len(rows)
+
+
+def emotion_timeline(session, user_id, granularity, start, end):
+    """Columnar timeline: bucket starts plus one aligned count list per emotion.
+
+    Only buckets with at least one logged emotion are returned.
+    """
+    rows = (
+        session.query(EmotionRollup.bucket_start, EmotionRollup.emotion, EmotionRollup.total)
+        .filter(
+            EmotionRollup.user_id == int(user_id),
+            EmotionRollup.granularity == granularity,
+            EmotionRollup.bucket_start >= bucket_start(start, granularity),
+            EmotionRollup.bucket_start < end,
+        )
+        .order_by(EmotionRollup.bucket_start)
+        .all()
+    )
+
+    buckets = []
+    emotions = {}
+    for start_ts, emotion, total in rows:
+        if not buckets or buckets[-1] != start_ts:
+            buckets.append(start_ts)
+        series = emotions.setdefault(emotion, [])
+        # Pad series that had no entry in the buckets seen so far
+        series.extend([0] * (len(buckets) - 1 - len(series)))
+        series.append(total)
+    for series in emotions.values():
+        series.extend([0] * (len(buckets) - len(series)))
+
+    return {
+        "granularity": granularity,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "buckets": [b.isoformat() for b in buckets],
+        "emotions": emotions,
+    }
+
+
+def _parse_utc(value):
+    """ISO timestamp -> naive UTC datetime, the form rollups are stored in ("Z" and offsets are converted)"""
+    ts = datetime.fromisoformat(value)
+    return ts.astimezone(timezone.utc).replace(tzinfo=None) if ts.tzinfo is not None else ts
+
+
+def parse_range(granularity, start_param, end_param):
+    """Turn optional ISO `start`/`end` query params into naive UTC datetimes (raises ValueError)"""
+    end = _parse_utc(end_param) if end_param else datetime.utcnow()
+    start = _parse_utc(start_param) if start_param else end - DEFAULT_SPAN[granularity]
+    if start >= end:
+        raise ValueError("start must be before end")
+    return start, end
@@ -0,0 +1,198 @@
+import hashlib
+import logging
+import struct
+from datetime import datetime
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from models import db, LikedSong, SongHistory, UserHistoryFilter
+
+log = logging.getLogger(__name__)
+
+_HEADER = struct.Struct("<BIBII")  # version, bits per generation, hashes, current count, previous count
+_VERSION = 1
+_UPSERT_INSERTS = {"sqlite": sqlite_insert, "postgresql": pg_insert}
+# Attempts at the compare-and-swap in remember_tracks before giving up on one update
+_CAS_ATTEMPTS = 5
+
+
+class HistoryFilter:
+    """Probabilistic set of a user's recently played and liked external IDs.
+
+    Two Bloom filter generations: items go into `current`; once it holds `capacity`
+    items it becomes `previous` and a fresh one starts, so the oldest plays age out
+    and memory stays fixed (2 x num_bits / 8 bytes). False positives only ever hide
+    a track that was not actually played.
+    """
+
+    __slots__ = ("num_bits", "num_hashes", "capacity", "current", "previous", "current_count", "previous_count")
+
+    def __init__(self, num_bits=16384, num_hashes=4):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        # ~1.2% false positives for a full generation with 4 hashes; lookups check both, so up to ~2.3%
+        self.capacity = num_bits // 10
+        self.current = bytearray(num_bits // 8)
+        self.previous = bytearray(num_bits // 8)
+        self.current_count = 0
+        self.previous_count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1, h2 = struct.unpack("<QQ", digest)
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    @staticmethod
+    def _contains(bits, positions):
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in positions)
+
+    def add(self, item):
+        if not item:
+            return
+        positions = self._positions(item)
+        if self._contains(self.current, positions):
+            return
+        if self.current_count >= self.capacity:
+            self.previous, self.previous_count = self.current, self.current_count
+            self.current, self.current_count = bytearray(self.num_bits // 8), 0
+        for p in positions:
+            self.current[p >> 3] |= 1 << (p & 7)
+        self.current_count += 1
+
+    def __contains__(self, item):
+        if not item:
+            return False
+        positions = self._positions(item)
+        return self._contains(self.current, positions) or self._contains(self.previous, positions)
+
+    def to_bytes(self):
+        header = _HEADER.pack(_VERSION, self.num_bits, self.num_hashes, self.current_count, self.previous_count)
+        return header + bytes(self.current) + bytes(self.previous)
+
+    @classmethod
+    def from_bytes(cls, data):
+        version, num_bits, num_hashes, current_count, previous_count = _HEADER.unpack_from(data)
+        if version != _VERSION:
+            raise ValueError(f"Unsupported history filter version {version}")
+        f = cls(num_bits, num_hashes)
+        size = num_bits // 8
+        offset = _HEADER.size
+        f.current = bytearray(data[offset:offset + size])
+        f.previous = bytearray(data[offset + size:offset + 2 * size])
+        f.current_count, f.previous_count = current_count, previous_count
+        return f
+
+
+def _new_filter(config):
+    return HistoryFilter(config["HISTORY_FILTER_BITS"], config["HISTORY_FILTER_HASHES"])
+
+
+def _build_from_tables(user_id, config):
+    """Seed a filter from the user's likes and most recent plays"""
+    f = _new_filter(config)
+    recent = (
+        db.session.query(SongHistory.external_id)
+        .filter(SongHistory.user_id == user_id)
+        .order_by(SongHistory.id.desc())
+        .limit(f.capacity * 2)
+        .all()
+    )
+    for (external_id,) in reversed(recent):
+        f.add(external_id)
+    for (external_id,) in db.session.query(LikedSong.external_id).filter(LikedSong.user_id == user_id):
+        f.add(external_id)
+    return f
+
+
+def _stored_blob(user_id):
+    # A column query always reads the database, never a stale object from the session
+    return db.session.query(UserHistoryFilter.data).filter(UserHistoryFilter.user_id == user_id).scalar()
+
+
+def _parse(blob):
+    try:
+        return HistoryFilter.from_bytes(blob)
+    except (ValueError, struct.error):
+        return None  # Unreadable blob: treated like a missing one
+
+
+def _upsert(user_id, f, overwrite):
+    """Insert the user's row; on conflict keep the stored filter, or replace it with overwrite=True (caller commits)"""
+    values = {"user_id": user_id, "data": f.to_bytes(), "updated_at": datetime.utcnow()}
+    insert = _UPSERT_INSERTS.get(db.session.get_bind().dialect.name)
+    if insert is not None:
+        stmt = insert(UserHistoryFilter).values(values)
+        if overwrite:
+            stmt = stmt.on_conflict_do_update(index_elements=["user_id"],
+                                              set_={"data": stmt.excluded.data, "updated_at": stmt.excluded.updated_at})
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=["user_id"])
+        db.session.execute(stmt)
+        return
+
+    # Databases without INSERT ... ON CONFLICT: insert in a savepoint, fall back to an update
+    try:
+        with db.session.begin_nested():
+            db.session.execute(UserHistoryFilter.__table__.insert().values(values))
+    except IntegrityError:
+        if overwrite:
+            db.session.execute(update(UserHistoryFilter).where(UserHistoryFilter.user_id == user_id)
+                               .values(data=values["data"], updated_at=values["updated_at"])
+                               .execution_options(synchronize_session=False))
+
+
+def _swap(user_id, expected, f):
+    """Store `f` only if the row still holds `expected`; False when a concurrent write got there first"""
+    result = db.session.execute(
+        update(UserHistoryFilter)
+        .where(UserHistoryFilter.user_id == user_id, UserHistoryFilter.data == expected)
+        .values(data=f.to_bytes(), updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def _load(user_id, config):
+    """(stored blob, filter); builds and stores the filter on first use"""
+    blob = _stored_blob(user_id)
+    f = _parse(blob) if blob is not None else None
+    if f is not None:
+        return blob, f
+    f = _build_from_tables(user_id, config)
+    if blob is None:
+        _upsert(user_id, f, overwrite=False)
+    else:
+        _swap(user_id, blob, f)
+    # Concurrent first requests may both build one: the first write wins, everyone uses what is stored
+    stored = _stored_blob(user_id)
+    return stored, (_parse(stored) if stored is not None else None) or f
+
+
+def load_history_filter(user_id, config):
+    """The user's filter, built from the tables on first use and stored (caller commits)"""
+    return _load(int(user_id), config)[1]
+
+
+def remember_tracks(user_id, external_ids, config):
+    """Add played or liked IDs to the user's filter (caller commits).
+
+    Read-modify-write with a compare-and-swap on the stored blob, retried against
+    the latest version, so concurrent likes and plays don't drop each other's bits.
+    If every attempt loses the race the IDs are skipped (and logged); the worst
+    case is a track being recommended again.
+    """
+    user_id = int(user_id)
+    for _ in range(_CAS_ATTEMPTS):
+        blob, f = _load(user_id, config)
+        for external_id in external_ids:
+            f.add(external_id)
+        if f.to_bytes() == blob or _swap(user_id, blob, f):
+            return
+    log.warning("History filter update lost to concurrent writes", extra={"user_id": user_id, "ids": len(external_ids)})
+
+
+def rebuild_history_filter(user_id, config):
+    """Recreate the filter from the tables, e.g. after the history was cleared (caller commits)"""
+    user_id = int(user_id)
+    _upsert(user_id, _build_from_tables(user_id, config), overwrite=True)
@@ -0,0 +1,58 @@
+import hashlib
+from functools import wraps
+from flask import current_app, make_response, request
+
+# Suffixes the compression hook appends to ETags of encoded bodies
+ENCODING_SUFFIXES = ("-br", "-gzip")
+
+
+def body_etag(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _strip_encoding(tag):
+    for suffix in ENCODING_SUFFIXES:
+        if tag.endswith(suffix):
+            return tag[:-len(suffix)]
+    return tag
+
+
+def conditional(public=False):
+    """Add a strong ETag and Cache-Control to successful GET responses and answer 304 when they match.
+
+    The ETag is a hash of the uncompressed body. Public responses may be stored by
+    browsers and shared caches (PUBLIC_CACHE_MAX_AGE / PUBLIC_CACHE_S_MAXAGE);
+    per-user responses, and empty public lists, must be revalidated on every use.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            response = make_response(view(*args, **kwargs))
+            if request.method != "GET" or response.status_code != 200 or response.direct_passthrough:
+                return response
+
+            data = response.get_data()
+            etag = body_etag(data)
+            response.set_etag(etag)
+            # An empty list usually means Spotify was unreachable: don't let caches hold on to it
+            if public and data.strip() != b"[]":
+                config = current_app.config
+                response.cache_control.public = True
+                response.cache_control.max_age = config["PUBLIC_CACHE_MAX_AGE"]
+                response.cache_control.s_maxage = config["PUBLIC_CACHE_S_MAXAGE"]
+            else:
+                response.cache_control.private = True
+                response.cache_control.no_cache = True
+
+            # A client holding the gzip/br variant sends that tag back; the content is the same
+            if_none_match = request.if_none_match
+            matched = [tag for tag in if_none_match.as_set() if _strip_encoding(tag) == etag]
+            if matched or if_none_match.star_tag:
+                response.status_code = 304
+                response.set_data(b"")
+                response.headers.pop("Content-Type", None)
+                if matched:
+                    response.set_etag(matched[0])
+            return response
+        return wrapper
+    return decorator
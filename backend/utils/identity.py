@@ -0,0 +1,87 @@
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from models import db, User
+from utils.metrics import record_cache
+
+# Columns most music routes need: language preference plus what
+# ensure_valid_spotify_token() needs to talk to Spotify on the user's behalf.
+SPOTIFY_COLUMNS = ("language", "spotify_access_token", "spotify_refresh_token")
+
+PREFERENCE_COLUMNS = ("theme", "language", "camera_access_enabled", "notifications_enabled", "add_to_home_enabled")
+
+# user_id -> (expires_at, {column: value}), least recently used first; per-process and
+# short-lived on purpose, other workers only see a write once their own entry expires.
+# Entries hold OAuth tokens, so expired ones are dropped on read and the size is capped.
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+class Identity:
+    """Read-only snapshot of the User columns a route asked for."""
+
+    __slots__ = ("id", "_values")
+
+    def __init__(self, user_id, values):
+        self.id = user_id
+        self._values = values
+
+    def __getattr__(self, name):
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(f"Column '{name}' was not loaded for user {self.id}") from None
+
+
+def load_identity(user_id, *columns):
+    """Load only `columns` of a user (cached per process), or None if the user does not exist"""
+    user_id = int(user_id)
+    ttl = current_app.config.get("IDENTITY_CACHE_TTL", 15)
+    now = time.monotonic()
+
+    with _lock:
+        entry = _cache.get(user_id)
+        if entry is not None and entry[0] <= now:
+            del _cache[user_id]
+            entry = None
+        elif entry is not None:
+            _cache.move_to_end(user_id)
+        values = dict(entry[1]) if entry else None
+    # Columns merged into a live entry keep its original expiry
+    expires_at = entry[0] if values is not None else now + ttl
+
+    missing = [c for c in columns if values is None or c not in values]
+    record_cache("identity", values is not None and not missing)
+    if values is not None and not missing:
+        return Identity(user_id, values)
+
+    # Plain column query: no ORM entity, no identity map, heavy columns never leave the DB
+    row = db.session.query(*[getattr(User, c) for c in missing] or [User.id]).filter(User.id == user_id).first()
+    if row is None:
+        return None
+
+    values = values or {}
+    values.update(zip(missing, row))
+    if ttl > 0:
+        max_size = current_app.config.get("IDENTITY_CACHE_SIZE", 10000)
+        with _lock:
+            _cache[user_id] = (expires_at, values)
+            _cache.move_to_end(user_id)
+            while len(_cache) > max_size:
+                _cache.popitem(last=False)
+            # The least recently used entries are the likeliest to have expired
+            while _cache and next(iter(_cache.values()))[0] <= now:
+                _cache.popitem(last=False)
+    return Identity(user_id, values)
+
+
+def invalidate_identity(user_id):
+    """Drop the cached identity after any write to the user's row"""
+    with _lock:
+        _cache.pop(int(user_id), None)
+
+
+def clear_identity_cache():
+    with _lock:
+        _cache.clear()
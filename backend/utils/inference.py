@@ -0,0 +1,103 @@
+import base64
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from io import BytesIO
+import numpy as np
+from utils.tracing import record_span
+
+log = logging.getLogger(__name__)
+
+# Stages of one emotion inference, in order; timings are reported under these names
+STAGES = ("decode", "preprocess", "detect", "classify")
+
+
+@contextmanager
+def timed(timings, stage):
+    """Add the seconds spent in the block to timings[stage] (no-op when timings is None), and trace it as a span"""
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        ended = time.perf_counter()
+        timings[stage] = timings.get(stage, 0.0) + ended - started
+        record_span(stage, "inference", started, ended)
+
+
+_MISSING = object()
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def create_detector(mtcnn=True):
+    """FER detector: MTCNN face detection, or OpenCV's Haar cascade with mtcnn=False"""
+    from fer import FER
+    return FER(mtcnn=mtcnn)
+
+
+def shared_detector():
+    """The process-wide MTCNN detector, built on first use; None when FER is not installed.
+
+    Importing fer pulls in TensorFlow and OpenCV, which takes seconds and hundreds of
+    MB, so it only happens in processes that actually run inference.
+    """
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                try:
+                    _shared = create_detector(mtcnn=True)
+                except ImportError:
+                    _shared = _MISSING
+                    log.warning("FER library not available; emotion detection from images is disabled")
+    return None if _shared is _MISSING else _shared
+
+
+def decode_image(data):
+    """Encoded image bytes (JPEG, PNG, ...) -> RGB/RGBA/grey array"""
+    from PIL import Image
+    return np.array(Image.open(BytesIO(data)))
+
+
+def decode_base64_image(data):
+    """Base64 image as sent by the frontend, with or without a data: URL prefix"""
+    if ',' in data:
+        data = data.split(',')[1]
+    return decode_image(base64.b64decode(data))
+
+
+def preprocess(image, max_side=0, rgb=True):
+    """Array the detector expects: 3-channel BGR, downscaled so no side exceeds max_side (0 keeps the size)"""
+    if image.ndim == 3 and image.shape[2] == 4:
+        image = image[:, :, :3]
+    if max_side and max(image.shape[:2]) > max_side:
+        from PIL import Image
+        scale = max_side / max(image.shape[:2])
+        size = (max(1, round(image.shape[1] * scale)), max(1, round(image.shape[0] * scale)))
+        image = np.array(Image.fromarray(image).resize(size, Image.BILINEAR))
+    if image.ndim == 2:
+        return np.ascontiguousarray(np.repeat(image[:, :, None], 3, axis=2))
+    return np.ascontiguousarray(image[:, :, ::-1]) if rgb else image
+
+
+def detect_emotions(detector, image, timings=None):
+    """Faces found in a BGR image with their emotion scores, timing face detection and classification separately"""
+    with timed(timings, "detect"):
+        faces = detector.find_faces(image, bgr=True)
+    if not len(faces):
+        return []
+    with timed(timings, "classify"):
+        return detector.detect_emotions(image, face_rectangles=faces)
+
+
+def top_emotion(face):
+    """(label, score) of the strongest emotion of one detected face"""
+    scores = face.get("emotions") or {}
+    if not scores:
+        return None, 0.0
+    label = max(scores, key=scores.get)
+    return label, scores[label]
@@ -0,0 +1,67 @@
+import datetime
+import json
+import logging
+from flask import g, has_request_context, request
+
+# Attributes every LogRecord has; anything else on a record came from `extra=`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+def _extras(record):
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES}
+
+
+class RequestContextFilter(logging.Filter):
+    """Tag records logged while handling a request with its method, path and trace id"""
+
+    def filter(self, record):
+        if has_request_context():
+            record.method = request.method
+            record.path = request.path
+            trace = g.get("trace")
+            if trace is not None:
+                record.trace_id = trace.trace_id
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, the `extra=` fields and any traceback"""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **_extras(record),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Plain lines for local development, with the `extra=` fields appended as key=value"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def formatMessage(self, record):
+        line = super().formatMessage(record)
+        extras = _extras(record)
+        if extras:
+            line += " " + " ".join(f"{key}={value!r}" for key, value in extras.items())
+        return line
+
+
+def configure_logging(app):
+    """Route all loggers through one stderr handler at LOG_LEVEL, as JSON or text (LOG_FORMAT)"""
+    handler = logging.StreamHandler()
+    handler.setFormatter(JsonFormatter() if app.config["LOG_FORMAT"] == "json" else TextFormatter())
+    handler.addFilter(RequestContextFilter())
+    root = logging.getLogger()
+    for existing in [h for h in root.handlers if getattr(h, "_moodmusic", False)]:
+        root.removeHandler(existing)
+    handler._moodmusic = True
+    root.addHandler(handler)
+    root.setLevel(app.config["LOG_LEVEL"].upper())
@@ -0,0 +1,338 @@
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+from utils.metrics import record_cache
+
+log = logging.getLogger(__name__)
+
+
+def _image(images, index):
+    """URL of images[index], falling back to the first (largest) image"""
+    if len(images) > index:
+        return images[index].get("url")
+    return images[0].get("url") if images else None
+
+
+class TrackRecord:
+    kind = "track"
+    __slots__ = ("id", "title", "artists", "album", "uri", "image_large", "image_medium")
+
+    def __init__(self, id, title, artists, album, uri, image_large, image_medium):
+        self.id = id
+        self.title = title
+        self.artists = tuple(artists)
+        self.album = album
+        self.uri = uri
+        self.image_large = image_large
+        self.image_medium = image_medium
+
+    @classmethod
+    def from_spotify(cls, raw):
+        album = raw.get("album") or {}
+        images = album.get("images") or []
+        return cls(raw.get("id"), raw.get("name"), [a.get("name") for a in raw.get("artists") or []],
+                   album.get("name"), raw.get("uri"), _image(images, 0), _image(images, 1))
+
+    def artist_name(self, default="Unknown"):
+        return ", ".join(self.artists) if self.artists else default
+
+    def card(self, medium=True, default_image=None):
+        """Home-screen track card"""
+        artist = self.artist_name()
+        return {
+            "id": self.id,
+            "title": self.title,
+            "subtitle": artist,
+            "imageUrl": (self.image_medium if medium else self.image_large) or default_image,
+            "album": self.album,
+            "artist": artist,
+            "spotifyId": self.id,
+            "spotifyUri": self.uri,
+            "spotifyUrl": f"https://open.spotify.com/track/{self.id}",
+        }
+
+    def search_result(self):
+        """Search / recommendation entry"""
+        return {
+            "id": self.id,
+            "title": self.title,
+            "artist": self.artist_name(""),
+            "album": self.album,
+            "spotifyUri": self.uri,
+            "imageUrl": self.image_medium,
+            "source": "Spotify",
+        }
+
+
+class AlbumRecord:
+    kind = "album"
+    __slots__ = ("id", "name", "artists", "image_large")
+
+    def __init__(self, id, name, artists, image_large):
+        self.id = id
+        self.name = name
+        self.artists = tuple(artists)
+        self.image_large = image_large
+
+    @classmethod
+    def from_spotify(cls, raw):
+        return cls(raw.get("id"), raw.get("name"), [a.get("name") for a in raw.get("artists") or []],
+                   _image(raw.get("images") or [], 0))
+
+    def card(self):
+        """Home-screen card linking to the whole album"""
+        artist = ", ".join(self.artists) if self.artists else "Unknown"
+        return {
+            "id": self.id,
+            "title": self.name,
+            "subtitle": artist,
+            "imageUrl": self.image_large,
+            "album": self.name,
+            "artist": artist,
+            "spotifyId": self.id,
+            "spotifyUri": f"spotify:album:{self.id}",
+            "spotifyUrl": f"https://open.spotify.com/album/{self.id}",
+        }
+
+
+class ArtistRecord:
+    kind = "artist"
+    __slots__ = ("id", "name", "followers", "image_large")
+
+    def __init__(self, id, name, followers, image_large):
+        self.id = id
+        self.name = name
+        self.followers = followers
+        self.image_large = image_large
+
+    @classmethod
+    def from_spotify(cls, raw):
+        return cls(raw.get("id"), raw.get("name"), (raw.get("followers") or {}).get("total", 0),
+                   _image(raw.get("images") or [], 0))
+
+    def card(self, followers_format="{}", default_image=None):
+        return {
+            "id": self.id,
+            "title": self.name,
+            "subtitle": f"{followers_format.format(self.followers)} followers",
+            "imageUrl": self.image_large or default_image,
+            "spotifyId": self.id,
+        }
+
+
+class PlaylistRecord:
+    kind = "playlist"
+    __slots__ = ("id", "name", "description", "total_tracks", "image_large")
+
+    def __init__(self, id, name, description, total_tracks, image_large):
+        self.id = id
+        self.name = name
+        self.description = description
+        self.total_tracks = total_tracks
+        self.image_large = image_large
+
+    @classmethod
+    def from_spotify(cls, raw):
+        return cls(raw.get("id"), raw.get("name"), raw.get("description") or "",
+                   (raw.get("tracks") or {}).get("total", 0), _image(raw.get("images") or [], 0))
+
+    def card(self, subtitle, genre, default_image=None):
+        return {
+            "id": self.id,
+            "title": self.name,
+            "subtitle": subtitle,
+            "imageUrl": self.image_large or default_image,
+            "spotifyId": self.id,
+            "genre": genre,
+        }
+
+
+RECORD_TYPES = {cls.kind: cls for cls in (TrackRecord, AlbumRecord, ArtistRecord, PlaylistRecord)}
+
+
+class MetadataStore:
+    """Normalized Spotify track/album/artist/playlist records keyed by Spotify ID.
+
+    Records live in memory, least recently used first out past `max_records`, and
+    are written behind to a small SQLite file by a background thread, so they
+    survive restarts. Rows older than `max_age` are deleted from the file. A raw
+    object whose ID is already known (and younger than `max_age`) is not parsed
+    again. Artists can also be looked up by the name they were searched for,
+    which lets handlers skip the search call entirely.
+    """
+
+    def __init__(self):
+        self.path = None
+        self.max_age = 7 * 24 * 3600
+        self.max_records = 50000
+        self._records = OrderedDict()  # (kind, id) -> (stored_at, record), least recently used first
+        self._artist_names = OrderedDict()  # lowercased search name -> artist id
+        self._dirty = {}
+        self._dirty_names = {}
+        self._lock = threading.Lock()
+        self._flush_wanted = threading.Event()
+        self._flusher_pid = None
+        self.hits = 0
+        self.misses = 0
+        self.parse_seconds = 0.0
+
+    def init_app(self, app):
+        self.path = app.config["METADATA_CACHE_PATH"]
+        self.max_age = app.config["METADATA_MAX_AGE"]
+        self.max_records = app.config["METADATA_MAX_RECORDS"]
+        self.load()
+        atexit.register(self.flush)
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5)
+        conn.execute("CREATE TABLE IF NOT EXISTS records (kind TEXT, id TEXT, stored_at REAL, payload TEXT, PRIMARY KEY (kind, id))")
+        conn.execute("CREATE INDEX IF NOT EXISTS records_stored_at ON records (stored_at)")
+        conn.execute("CREATE TABLE IF NOT EXISTS artist_names (name TEXT PRIMARY KEY, artist_id TEXT)")
+        return conn
+
+    def _prune(self, conn):
+        """Delete expired records, and search names pointing at artists that are no longer stored"""
+        conn.execute("DELETE FROM records WHERE stored_at < ?", (time.time() - self.max_age,))
+        conn.execute("DELETE FROM artist_names WHERE artist_id NOT IN (SELECT id FROM records WHERE kind = 'artist')")
+
+    def _evict(self):
+        # Caller holds self._lock
+        while len(self._records) > self.max_records:
+            self._records.popitem(last=False)
+        while len(self._artist_names) > self.max_records:
+            self._artist_names.popitem(last=False)
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with closing(self._connect()) as conn:
+                with conn:
+                    self._prune(conn)
+                # Newest last, so the LRU order starts with the oldest
+                rows = conn.execute("SELECT * FROM (SELECT kind, id, stored_at, payload FROM records "
+                                    "ORDER BY stored_at DESC LIMIT ?) ORDER BY stored_at", (self.max_records,)).fetchall()
+                names = conn.execute("SELECT name, artist_id FROM artist_names").fetchall()
+        except sqlite3.Error as e:
+            log.warning("Could not read metadata cache", extra={"path": self.path, "error": str(e)})
+            return
+        records = {}
+        for kind, record_id, stored_at, payload in rows:
+            cls = RECORD_TYPES.get(kind)
+            if cls:
+                records[(kind, record_id)] = (stored_at, cls(*json.loads(payload)))
+        with self._lock:
+            self._records.update(records)
+            self._artist_names.update(names)
+            self._evict()
+
+    def flush(self):
+        """Write pending records to disk and drop expired ones"""
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+            names, self._dirty_names = self._dirty_names, {}
+        if not (dirty or names) or not self.path:
+            return
+        rows = [
+            (kind, record_id, stored_at, json.dumps([getattr(record, s) for s in record.__slots__]))
+            for (kind, record_id), (stored_at, record) in dirty.items()
+        ]
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?)", rows)
+                conn.executemany("INSERT OR REPLACE INTO artist_names VALUES (?, ?)", list(names.items()))
+                self._prune(conn)
+        except sqlite3.Error as e:
+            log.warning("Could not write metadata cache", extra={"path": self.path, "error": str(e)})
+
+    def _flush_loop(self):
+        while True:
+            self._flush_wanted.wait(timeout=30)
+            self._flush_wanted.clear()
+            self.flush()
+
+    def _maybe_flush(self):
+        """Hand the write to the background flusher; requests never wait for the disk"""
+        if self._flusher_pid != os.getpid():  # First call in this (possibly forked) worker
+            with self._lock:
+                if self._flusher_pid != os.getpid():
+                    self._flusher_pid = os.getpid()
+                    threading.Thread(target=self._flush_loop, name="metadata-flush", daemon=True).start()
+        if len(self._dirty) + len(self._dirty_names) >= 200:
+            self._flush_wanted.set()
+
+    def get(self, kind, record_id):
+        key = (kind, record_id)
+        entry = self._records.get(key)
+        if entry is None or time.time() - entry[0] > self.max_age:
+            return None
+        with self._lock:
+            if key in self._records:
+                self._records.move_to_end(key)
+        return entry[1]
+
+    def _normalize(self, cls, raw):
+        record_id = raw.get("id")
+        record = self.get(cls.kind, record_id) if record_id else None
+        record_cache("metadata", record is not None)
+        if record is not None:
+            self.hits += 1
+            return record
+        self.misses += 1
+        start = time.perf_counter()
+        record = cls.from_spotify(raw)
+        self.parse_seconds += time.perf_counter() - start
+        if record_id:
+            entry = (time.time(), record)
+            with self._lock:
+                self._records[(cls.kind, record_id)] = entry
+                self._records.move_to_end((cls.kind, record_id))
+                self._dirty[(cls.kind, record_id)] = entry
+                self._evict()
+            self._maybe_flush()
+        return record
+
+    def track(self, raw):
+        return self._normalize(TrackRecord, raw)
+
+    def album(self, raw):
+        return self._normalize(AlbumRecord, raw)
+
+    def artist(self, raw, searched_name=None):
+        record = self._normalize(ArtistRecord, raw)
+        if searched_name and record.id:
+            name = searched_name.lower().strip()
+            if self._artist_names.get(name) != record.id:
+                with self._lock:
+                    self._artist_names[name] = record.id
+                    self._artist_names.move_to_end(name)
+                    self._dirty_names[name] = record.id
+                    self._evict()
+                self._maybe_flush()
+        return record
+
+    def playlist(self, raw):
+        return self._normalize(PlaylistRecord, raw)
+
+    def artist_by_name(self, name):
+        """A previously searched artist, or None"""
+        artist_id = self._artist_names.get(name.lower().strip())
+        return self.get("artist", artist_id) if artist_id else None
+
+    def stats(self):
+        return {
+            "records": len(self._records),
+            "hits": self.hits,
+            "misses": self.misses,
+            "parse_ms": round(self.parse_seconds * 1000, 3),
+        }
+
+
+metadata = MetadataStore()
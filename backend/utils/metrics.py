@@ -0,0 +1,185 @@
+import hmac
+import os
+import time
+from contextlib import contextmanager
+from flask import Response, current_app, g, has_request_context, jsonify, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from utils.tracing import record_span
+
+try:
+    from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+    from prometheus_client import multiprocess
+except ImportError:  # Optional: recording is a no-op and /metrics answers 503 without it
+    Counter = Gauge = Histogram = None
+
+# Seconds; covers cache hits (~1 ms) up to requests stuck behind a Spotify timeout
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "BEGIN", "COMMIT", "ROLLBACK", "PRAGMA"}
+
+
+class _Noop:
+    def labels(self, *args, **kwargs):
+        return self
+
+    def inc(self, amount=1):
+        pass
+
+    def dec(self, amount=1):
+        pass
+
+    def observe(self, value):
+        pass
+
+    def set(self, value):
+        pass
+
+
+def _metric(kind, *args, **kwargs):
+    return kind(*args, **kwargs) if kind is not None else _Noop()
+
+
+REQUESTS = _metric(Counter, "http_requests_total", "Requests handled, by route and status", ["method", "route", "status"])
+REQUEST_LATENCY = _metric(Histogram, "http_request_duration_seconds", "Request latency by route",
+                          ["method", "route"], buckets=LATENCY_BUCKETS)
+UPSTREAM_LATENCY = _metric(Histogram, "upstream_request_duration_seconds", "Outbound Spotify/Google call latency",
+                           ["service", "endpoint", "status"], buckets=LATENCY_BUCKETS)
+# Hit ratio: rate(cache_lookups_total{result="hit"}) / rate(cache_lookups_total)
+CACHE_LOOKUPS = _metric(Counter, "cache_lookups_total", "Lookups in the in-process caches", ["cache", "result"])
+DB_QUERIES = _metric(Histogram, "db_queries_per_request", "SQL statements run by one request", ["route"],
+                     buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89))
+DB_TIME = _metric(Histogram, "db_time_per_request_seconds", "Time one request spent in SQL", ["route"],
+                  buckets=LATENCY_BUCKETS)
+DB_QUERY_LATENCY = _metric(Histogram, "db_query_duration_seconds", "Latency of single SQL statements", ["operation"],
+                           buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0))
+# Inference runs inline in request threads, so the work waiting on it is what is in progress
+INFERENCE_IN_PROGRESS = _metric(Gauge, "inference_in_progress", "Emotion inferences currently running",
+                                multiprocess_mode="livesum")
+INFERENCE_STAGE = _metric(Histogram, "inference_stage_duration_seconds", "Emotion inference time per stage", ["stage"],
+                          buckets=LATENCY_BUCKETS)
+# Each worker has its own breakers; the most open one wins, so alert on spotify_breaker_state == 2
+BREAKER_STATES = {"closed": 0, "half_open": 1, "open": 2}
+SPOTIFY_BREAKER_STATE = _metric(Gauge, "spotify_breaker_state",
+                                "Spotify circuit breaker state by endpoint (0 closed, 1 half-open, 2 open)", ["endpoint"],
+                                multiprocess_mode="livemax")
+SPOTIFY_BREAKER_TRANSITIONS = _metric(Counter, "spotify_breaker_transitions_total",
+                                      "Spotify circuit breaker state changes, by endpoint and the state entered",
+                                      ["endpoint", "state"])
+
+
+def record_cache(cache, hit, count=1):
+    if count:
+        CACHE_LOOKUPS.labels(cache=cache, result="hit" if hit else "miss").inc(count)
+
+
+class _UpstreamCall:
+    __slots__ = ("status",)
+
+    def __init__(self):
+        self.status = "error"
+
+
+@contextmanager
+def upstream_call(service, endpoint):
+    """Time an outbound call; set `.status` on the yielded object once a response arrived (else it counts as an error)"""
+    call = _UpstreamCall()
+    started = time.perf_counter()
+    try:
+        yield call
+    finally:
+        ended = time.perf_counter()
+        UPSTREAM_LATENCY.labels(service=service, endpoint=endpoint, status=str(call.status)).observe(ended - started)
+        record_span(f"{service} {endpoint}", "http", started, ended, status=call.status)
+
+
+@contextmanager
+def inference_in_progress():
+    INFERENCE_IN_PROGRESS.inc()
+    try:
+        yield
+    finally:
+        INFERENCE_IN_PROGRESS.dec()
+
+
+def record_breaker_state(endpoint, state, transition=True):
+    SPOTIFY_BREAKER_STATE.labels(endpoint=endpoint).set(BREAKER_STATES[state])
+    if transition:
+        SPOTIFY_BREAKER_TRANSITIONS.labels(endpoint=endpoint, state=state).inc()
+
+
+def observe_inference(timings):
+    for stage, seconds in timings.items():
+        INFERENCE_STAGE.labels(stage=stage).observe(seconds)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _query_started(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _query_finished(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("metrics_query_start")
+    if not starts:
+        return
+    started = starts.pop()
+    ended = time.perf_counter()
+    elapsed = ended - started
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    operation = operation if operation in DB_OPERATIONS else "OTHER"
+    DB_QUERY_LATENCY.labels(operation=operation).observe(elapsed)
+    # Statements carry bound-parameter placeholders only, never the values
+    record_span(operation, "db", started, ended, statement=statement[:300], **({"executemany": True} if executemany else {}))
+    if has_request_context() and "metrics_db_queries" in g:
+        g.metrics_db_queries += 1
+        g.metrics_db_seconds += elapsed
+
+
+def _registry():
+    # Under gunicorn every worker writes to PROMETHEUS_MULTIPROC_DIR; aggregate them per scrape
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def mark_process_dead(pid):
+    """Call from gunicorn's child_exit hook so a dead worker's live gauges are dropped"""
+    if Counter is not None and os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)
+
+
+def init_metrics(app):
+    """Per-route request metrics and the /metrics endpoint.
+
+    Register before other after_request hooks (e.g. compression) so the measured
+    latency includes them. With METRICS_TOKEN set, scrapes must send it as a bearer token.
+    """
+
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_started = time.perf_counter()
+        g.metrics_db_queries = 0
+        g.metrics_db_seconds = 0.0
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.pop("metrics_started", None)
+        if started is None:
+            return response
+        route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        REQUESTS.labels(method=request.method, route=route, status=str(response.status_code)).inc()
+        REQUEST_LATENCY.labels(method=request.method, route=route).observe(time.perf_counter() - started)
+        DB_QUERIES.labels(route=route).observe(g.pop("metrics_db_queries", 0))
+        DB_TIME.labels(route=route).observe(g.pop("metrics_db_seconds", 0.0))
+        return response
+
+    @app.route("/metrics")
+    def metrics():
+        token = current_app.config.get("METRICS_TOKEN")
+        if token and not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+            return jsonify({"error": "Forbidden"}), 403
+        if Counter is None:
+            return jsonify({"error": "prometheus_client is not installed"}), 503
+        return Response(generate_latest(_registry()), content_type=CONTENT_TYPE_LATEST)
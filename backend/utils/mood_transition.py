@@ -0,0 +1,39 @@
+import numpy as np
+from utils.audio_features import FEATURE_WEIGHTS
+
+
+def waypoints(start, end, steps):
+    """`steps` evenly spaced feature vectors from `start` to `end` (both included)"""
+    t = np.linspace(0.0, 1.0, steps, dtype=np.float32)[:, None]
+    return start + t * (end - start)
+
+
+def plan_transition(features, start, end, length=15, smoothness=0.5):
+    """Indices into `features` for a playlist that moves from the `start` mood to the `end` mood.
+
+    Greedy walk over the waypoints: each slot takes the unused track that best
+    balances closeness to its waypoint against the jump from the previous pick
+    (weighted by `smoothness`). Tracks without audio features are never picked.
+    Cost is O(length * N) with one vectorized pass per slot.
+    """
+    valid = ~np.isnan(features).any(axis=1)
+    if not valid.any():
+        return []
+    length = min(length, int(valid.sum()))
+    features = np.where(valid[:, None], features, 0.0).astype(np.float32)
+    path = waypoints(start, end, length)
+    # (length, N) weighted squared distances from every waypoint to every track
+    to_waypoint = ((features[None, :, :] - path[:, None, :]) ** 2) @ FEATURE_WEIGHTS
+    to_waypoint[:, ~valid] = np.inf  # Stays inf once the smoothness term is added
+
+    picked = []
+    previous = None
+    for step in range(length):
+        cost = to_waypoint[step]
+        if previous is not None:
+            cost = cost + smoothness * (((features - features[previous]) ** 2) @ FEATURE_WEIGHTS)
+        if picked:
+            cost[picked] = np.inf
+        previous = int(np.argmin(cost))
+        picked.append(previous)
+    return picked
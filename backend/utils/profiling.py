@@ -0,0 +1,220 @@
+import datetime
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from functools import lru_cache
+from flask import g, request
+
+log = logging.getLogger(__name__)
+
+INFERENCE = "inference"
+
+
+@lru_cache(maxsize=8192)
+def frame_name(code):
+    """flamegraph frame label: function (file:first line), without the separators of the folded format"""
+    filename = code.co_filename
+    for prefix in sorted({p for p in sys.path if p}, key=len, reverse=True):
+        if filename.startswith(prefix + os.sep):
+            filename = filename[len(prefix) + 1:]
+            break
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+
+def collapse(frame):
+    """Root-first ';'-joined stack of a live frame"""
+    names = []
+    while frame is not None:
+        names.append(frame_name(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def _slug(target):
+    return re.sub(r"[^A-Za-z0-9]+", "-", target).strip("-") or "root"
+
+
+class ProfileSession:
+    __slots__ = ("target", "seconds", "interval", "memory", "started_at", "deadline", "samples", "stacks", "requests",
+                 "stem")
+
+    def __init__(self, target, seconds, interval, memory, directory):
+        self.target = target
+        self.seconds = seconds
+        self.interval = interval
+        self.memory = memory
+        self.started_at = datetime.datetime.now(datetime.timezone.utc)
+        self.deadline = time.monotonic() + seconds
+        self.samples = 0
+        self.stacks = Counter()
+        self.requests = 0
+        self.stem = os.path.join(directory, f"{self.started_at:%Y%m%dT%H%M%S}-{_slug(target)}-{os.getpid()}")
+
+    def info(self):
+        return {
+            "target": self.target,
+            "seconds": self.seconds,
+            "interval_ms": round(self.interval * 1000, 3),
+            "memory": self.memory,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "pid": os.getpid(),
+            "samples": self.samples,
+            "requests": self.requests,
+        }
+
+
+class SamplingProfiler:
+    """On-demand stack sampling of one route's handlers, or of emotion inference, in this process.
+
+    While a session runs, threads handling the target are registered and a
+    background thread samples their stacks every `interval` seconds; nothing else
+    is slowed down. Results are written as folded stacks (`<stem>.folded`, one
+    "frame;frame;... count" line per stack, readable by flamegraph.pl, speedscope
+    and inferno) plus `<stem>.json` metadata. With memory=True, tracemalloc runs
+    for the session and `<stem>.alloc.folded` holds the allocations still alive at
+    the end, weighted in KiB; tracemalloc traces the whole process, not just the target.
+    """
+
+    def __init__(self):
+        self.directory = None
+        self.max_seconds = 300
+        self._session = None
+        self._watched = {}  # thread id -> nesting depth
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.directory = app.config["PROFILE_DIR"]
+        self.max_seconds = app.config["PROFILE_MAX_SECONDS"]
+
+        @app.before_request
+        def watch_profiled_route():
+            session = self._session
+            if session is not None and request.url_rule is not None and request.url_rule.rule == session.target:
+                g.profiled = True
+                self._enter(session)
+
+        @app.teardown_request
+        def unwatch_profiled_route(exc):
+            if g.pop("profiled", False):
+                self._exit()
+
+    @property
+    def active(self):
+        return self._session
+
+    def start(self, target, seconds, interval=0.005, memory=False):
+        """Begin a session; returns its info, or None when one is already running"""
+        seconds = max(1, min(int(seconds), self.max_seconds))
+        interval = max(0.001, float(interval))
+        with self._lock:
+            if self._session is not None:
+                return None
+            os.makedirs(self.directory, exist_ok=True)
+            session = ProfileSession(target, seconds, interval, memory, self.directory)
+            if memory:
+                if tracemalloc.is_tracing():
+                    session.memory = False  # Already in use by someone else; leave it alone
+                else:
+                    tracemalloc.start(32)
+            self._session = session
+        threading.Thread(target=self._run, args=(session,), name="profiler", daemon=True).start()
+        log.info("Profiling started", extra=session.info())
+        return session.info()
+
+    @contextmanager
+    def watching(self, target):
+        """Mark the calling thread as doing `target` work (e.g. INFERENCE) while a session for it runs"""
+        session = self._session
+        if session is None or session.target != target:
+            yield
+            return
+        self._enter(session)
+        try:
+            yield
+        finally:
+            self._exit()
+
+    def _enter(self, session):
+        ident = threading.get_ident()
+        with self._lock:
+            self._watched[ident] = self._watched.get(ident, 0) + 1
+            session.requests += 1
+
+    def _exit(self):
+        ident = threading.get_ident()
+        with self._lock:
+            depth = self._watched.pop(ident, 1) - 1
+            if depth > 0:
+                self._watched[ident] = depth
+
+    def _run(self, session):
+        own = threading.get_ident()
+        try:
+            while time.monotonic() < session.deadline:
+                with self._lock:
+                    watched = [ident for ident in self._watched if ident != own]
+                if watched:
+                    frames = sys._current_frames()
+                    for ident in watched:
+                        frame = frames.get(ident)
+                        if frame is not None:
+                            session.stacks[collapse(frame)] += 1
+                            session.samples += 1
+                    del frames
+                time.sleep(session.interval)
+            self._write(session)
+        except Exception:
+            log.exception("Profiling session failed", extra={"target": session.target})
+        finally:
+            if session.memory:
+                tracemalloc.stop()
+            with self._lock:
+                self._session = None
+                self._watched.clear()
+
+    def _write(self, session):
+        with open(session.stem + ".folded", "w", encoding="utf-8") as f:
+            for stack, count in session.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        files = [session.stem + ".folded"]
+        if session.memory:
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),  # The sampler's own stacks
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            ))
+            with open(session.stem + ".alloc.folded", "w", encoding="utf-8") as f:
+                for stat in snapshot.statistics("traceback"):
+                    stack = ";".join(f"{os.path.basename(fr.filename)}:{fr.lineno}".replace(";", ":")
+                                     for fr in stat.traceback)  # Oldest frame first
+                    kib = stat.size // 1024
+                    if kib:
+                        f.write(f"{stack} {kib}\n")
+            files.append(session.stem + ".alloc.folded")
+        with open(session.stem + ".json", "w", encoding="utf-8") as f:
+            json.dump({**session.info(), "files": [os.path.basename(p) for p in files]}, f, indent=2)
+        log.info("Profiling finished", extra={**session.info(), "output": session.stem})
+
+    def recent(self, limit=20):
+        """Metadata of the latest sessions written to PROFILE_DIR, newest first"""
+        if not self.directory or not os.path.isdir(self.directory):
+            return []
+        names = sorted((n for n in os.listdir(self.directory) if n.endswith(".json")), reverse=True)[:limit]
+        sessions = []
+        for name in names:
+            try:
+                with open(os.path.join(self.directory, name), encoding="utf-8") as f:
+                    sessions.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return sessions
+
+
+profiler = SamplingProfiler()
@@ -0,0 +1,161 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+log = logging.getLogger(__name__)
+
+# Share of the bucket that must be left after a call of each class: low-priority
+# work stops early so interactive requests keep some headroom.
+PRIORITY_RESERVE = {
+    "interactive": 0.0,
+    "feed": 0.2,
+    "background": 0.5,
+}
+
+
+class LocalBucket:
+    """Token bucket for a single process"""
+
+    def __init__(self, capacity, refill_per_second):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._tokens = float(capacity)
+        self._updated = time.time()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_per_second)
+        self._updated = now
+
+    def take(self, reserve):
+        """Take one token if more than `reserve` tokens would remain afterwards"""
+        with self._lock:
+            now = time.time()
+            self._refill(now)
+            if now < self._blocked_until or self._tokens - 1 < reserve:
+                return False
+            self._tokens -= 1
+            return True
+
+    def block(self, seconds):
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.time() + seconds)
+            self._tokens = 0.0
+
+    def remaining(self):
+        with self._lock:
+            self._refill(time.time())
+            return self._tokens
+
+
+class SqliteBucket(LocalBucket):
+    """Token bucket kept in a SQLite file so every worker process on the host draws from one budget"""
+
+    def __init__(self, capacity, refill_per_second, path):
+        super().__init__(capacity, refill_per_second)
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS bucket (id INTEGER PRIMARY KEY CHECK (id = 1), tokens REAL, updated REAL, blocked_until REAL)")
+            conn.execute("INSERT OR IGNORE INTO bucket VALUES (1, ?, ?, 0)", (float(capacity), time.time()))
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=2, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _update(self, change):
+        """Run `change(tokens, blocked_until, now) -> (tokens, blocked_until, result)` in one write transaction"""
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                tokens, updated, blocked_until = conn.execute("SELECT tokens, updated, blocked_until FROM bucket WHERE id = 1").fetchone()
+                now = time.time()
+                tokens = min(self.capacity, tokens + max(0.0, now - updated) * self.refill_per_second)
+                tokens, blocked_until, result = change(tokens, blocked_until, now)
+                conn.execute("UPDATE bucket SET tokens = ?, updated = ?, blocked_until = ? WHERE id = 1", (tokens, now, blocked_until))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return result
+
+    def take(self, reserve):
+        def change(tokens, blocked_until, now):
+            if now < blocked_until or tokens - 1 < reserve:
+                return tokens, blocked_until, False
+            return tokens - 1, blocked_until, True
+        return self._update(change)
+
+    def block(self, seconds):
+        self._update(lambda tokens, blocked_until, now: (0.0, max(blocked_until, now + seconds), None))
+
+    def remaining(self):
+        return self._update(lambda tokens, blocked_until, now: (tokens, blocked_until, tokens))
+
+
+class SpotifyBudget:
+    """Request budget for the Spotify Web API with priority classes.
+
+    A call takes one token. Interactive calls may use the whole bucket and wait
+    briefly for a refill; feed and background calls are refused earlier (see
+    PRIORITY_RESERVE) so the caller can fall back to cached data.
+    """
+
+    def __init__(self):
+        self.bucket = LocalBucket(100, 3.0)
+        self.max_wait = 0.5
+        self.allowed = {name: 0 for name in PRIORITY_RESERVE}
+        self.throttled = {name: 0 for name in PRIORITY_RESERVE}
+        self.rate_limited = 0
+
+    def init_app(self, app):
+        capacity = app.config["SPOTIFY_BUDGET_CAPACITY"]
+        refill = app.config["SPOTIFY_BUDGET_PER_SECOND"]
+        path = app.config["SPOTIFY_BUDGET_PATH"]
+        self.bucket = SqliteBucket(capacity, refill, path) if path else LocalBucket(capacity, refill)
+        self.max_wait = app.config["SPOTIFY_BUDGET_MAX_WAIT"]
+
+    def acquire(self, priority="interactive"):
+        reserve = PRIORITY_RESERVE[priority] * self.bucket.capacity
+        try:
+            granted = self.bucket.take(reserve)
+            if not granted and priority == "interactive" and self.max_wait > 0:
+                deadline = time.monotonic() + self.max_wait
+                while not granted and time.monotonic() < deadline:
+                    time.sleep(min(0.05, 1.0 / self.bucket.refill_per_second))
+                    granted = self.bucket.take(reserve)
+        except sqlite3.Error as e:
+            # A locked or broken budget file must not block Spotify calls altogether
+            log.warning("Spotify budget unavailable", extra={"error": str(e)})
+            granted = True
+        (self.allowed if granted else self.throttled)[priority] += 1
+        return granted
+
+    def rate_limited_for(self, seconds):
+        """Spotify answered 429: stop spending until Retry-After has passed"""
+        self.rate_limited += 1
+        try:
+            self.bucket.block(seconds)
+        except sqlite3.Error as e:
+            log.warning("Spotify budget unavailable", extra={"error": str(e)})
+
+    def stats(self):
+        try:
+            remaining = round(self.bucket.remaining(), 1)
+        except sqlite3.Error:
+            remaining = None
+        return {
+            "remaining": remaining,
+            "capacity": self.bucket.capacity,
+            "allowed": dict(self.allowed),
+            "throttled": dict(self.throttled),
+            "rate_limited": self.rate_limited,
+        }
+
+
+spotify_budget = SpotifyBudget()
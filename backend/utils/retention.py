@@ -0,0 +1,100 @@
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from models import db, EmotionLog, VoiceCommandLog, GestureLog, SongHistory, DailyActivitySummary
+
+
+def _add_emotions(summary, counts):
+    merged = Counter(summary.emotion_counts or {})
+    merged.update(counts)
+    # Reassign so SQLAlchemy notices the JSON change
+    summary.emotion_counts = dict(merged)
+    summary.dominant_emotion = merged.most_common(1)[0][0] if merged else None
+
+
+def _add_voice_commands(summary, counts):
+    summary.voice_command_count = (summary.voice_command_count or 0) + sum(counts.values())
+
+
+def _add_gestures(summary, counts):
+    summary.gesture_count = (summary.gesture_count or 0) + sum(counts.values())
+
+
+def _add_plays(summary, counts):
+    merged = Counter(summary.plays_by_source or {})
+    merged.update(counts)
+    summary.plays_by_source = dict(merged)
+
+
+# table name -> (model, timestamp column, value column counted per day, merge function)
+RETENTION_TABLES = {
+    "emotion_logs": (EmotionLog, EmotionLog.timestamp, EmotionLog.emotion, _add_emotions),
+    "voice_command_logs": (VoiceCommandLog, VoiceCommandLog.timestamp, VoiceCommandLog.command, _add_voice_commands),
+    "gesture_logs": (GestureLog, GestureLog.timestamp, GestureLog.gesture, _add_gestures),
+    "song_history": (SongHistory, SongHistory.played_at, SongHistory.source, _add_plays),
+}
+
+
+def _summaries_for(keys):
+    """Existing summaries for a set of (user_id, day) keys, creating the missing ones"""
+    user_ids = {user_id for user_id, _ in keys}
+    days = {day for _, day in keys}
+    found = {
+        (s.user_id, s.day): s
+        for s in DailyActivitySummary.query.filter(
+            DailyActivitySummary.user_id.in_(user_ids), DailyActivitySummary.day.in_(days)
+        )
+    }
+    for key in keys:
+        if key not in found:
+            found[key] = DailyActivitySummary(user_id=key[0], day=key[1])
+            db.session.add(found[key])
+    return found
+
+
+def compact_table(name, days, chunk_size, now=None):
+    """Roll rows of `name` older than `days` into daily summaries and delete them.
+
+    Each chunk is aggregated, merged and deleted in one short transaction, so the
+    job can be interrupted at any point without double counting.
+    Returns the number of raw rows removed.
+    """
+    model, ts_column, value_column, merge = RETENTION_TABLES[name]
+    cutoff = (now or datetime.utcnow()) - timedelta(days=days)
+    removed = 0
+
+    while True:
+        rows = (
+            db.session.query(model.id, model.user_id, ts_column, value_column)
+            .filter(ts_column < cutoff)
+            .order_by(model.id)
+            .limit(chunk_size)
+            .all()
+        )
+        if not rows:
+            return removed
+
+        per_day = defaultdict(Counter)
+        for _, user_id, ts, value in rows:
+            per_day[(user_id, ts.date())][value] += 1
+
+        summaries = _summaries_for(per_day.keys())
+        for key, counts in per_day.items():
+            merge(summaries[key], counts)
+
+        model.query.filter(model.id.in_([row[0] for row in rows])).delete(synchronize_session=False)
+        db.session.commit()
+        removed += len(rows)
+
+
+def run_retention(retention_days, chunk_size, now=None):
+    """Compact every table with a positive retention period; returns {table: rows removed}"""
+    results = {}
+    for name, days in retention_days.items():
+        if name not in RETENTION_TABLES or not days or days <= 0:
+            continue
+        try:
+            results[name] = compact_table(name, days, chunk_size, now=now)
+        except Exception:
+            db.session.rollback()
+            raise
+    return results
@@ -1,35 +1,95 @@
+import logging
+import threading
+import time
 import requests
 from flask import current_app
 from base64 import b64encode
+from models import db, User
+from utils.identity import invalidate_identity
+from utils.metrics import record_cache, upstream_call
+from utils.spotify_client import spotify_client
+
+log = logging.getLogger(__name__)
+
+# Client-credentials token shared by every request until shortly before it expires
+_app_token = {"value": None, "expires_at": 0.0}
+_app_token_lock = threading.Lock()
 
 def get_spotify_token():
+    if _app_token["value"] and time.monotonic() < _app_token["expires_at"]:
+        record_cache("spotify_app_token", True)
+        return _app_token["value"]
+    record_cache("spotify_app_token", False)
+    # One refresh at a time: concurrent callers wait and reuse its result
+    with _app_token_lock:
+        if _app_token["value"] and time.monotonic() < _app_token["expires_at"]:
+            return _app_token["value"]
+        return _fetch_spotify_token()
+
+
+def _fetch_spotify_token():
     try:
         client_id = current_app.config.get('SPOTIFY_CLIENT_ID')
         client_secret = current_app.config.get('SPOTIFY_CLIENT_SECRET')
         
         if not client_id or not client_secret:
-            print("⚠️ Spotify credentials not configured")
+            log.warning("Spotify credentials not configured")
             return None
         
         auth_str = f"{client_id}:{client_secret}"
         b64_auth_str = b64encode(auth_str.encode()).decode()
 
-        res = requests.post(
-            "https://accounts.spotify.com/api/token",
-            data={"grant_type": "client_credentials"},
-            headers={"Authorization": f"Basic {b64_auth_str}"}
-        )
+        with upstream_call("spotify", "/api/token") as call:
+            res = requests.post(
+                f"{current_app.config['SPOTIFY_ACCOUNTS_BASE']}/api/token",
+                data={"grant_type": "client_credentials"},
+                headers={"Authorization": f"Basic {b64_auth_str}"},
+                timeout=10
+            )
+            call.status = res.status_code
         
         if res.status_code == 200:
-            return res.json().get("access_token")
+            data = res.json()
+            _app_token["value"] = data.get("access_token")
+            _app_token["expires_at"] = time.monotonic() + data.get("expires_in", 3600) - 60
+            spotify_client.set_app_token(_app_token["value"])
+            return _app_token["value"]
         else:
-            print(f"⚠️ Failed to get Spotify token: {res.status_code} - {res.text}")
+            log.warning("Failed to get Spotify app token", extra={"status": res.status_code, "body": res.text[:500]})
             return None
     except Exception as e:
-        print(f"⚠️ Error getting Spotify token: {str(e)}")
+        log.warning("Error getting Spotify app token", extra={"error": str(e)})
         return None
 
 
+def ensure_valid_spotify_token(user):
+    """Auto-refresh Spotify access token if expired; returns the token to use"""
+    test_resp = spotify_client.get(
+        "/v1/me",
+        headers={"Authorization": f"Bearer {user.spotify_access_token}"}
+    )
+    if test_resp.status_code == 401:
+        token_url = f"{current_app.config['SPOTIFY_ACCOUNTS_BASE']}/api/token"
+        payload = {
+            "grant_type": "refresh_token",
+            "refresh_token": user.spotify_refresh_token,
+            "client_id": current_app.config["SPOTIFY_CLIENT_ID"],
+            "client_secret": current_app.config["SPOTIFY_CLIENT_SECRET"]
+        }
+        with upstream_call("spotify", "/api/token") as call:
+            response = requests.post(token_url, data=payload, headers={"Content-Type": "application/x-www-form-urlencoded"}, timeout=10)
+            call.status = response.status_code
+        token_data = response.json()
+        new_access_token = token_data.get("access_token")
+        if new_access_token:
+            User.query.filter_by(id=user.id).update({"spotify_access_token": new_access_token})
+            db.session.commit()
+            invalidate_identity(user.id)
+            log.info("Spotify access token refreshed", extra={"user_id": user.id})
+            return new_access_token
+    return user.spotify_access_token
+
+
 def get_playlist_for_emotion(emotion):
     emotion_to_playlist = {
         "happy": "1A9oCcZKDOGEaD6d1s3IVo",     # Replace with your actual playlist IDs
@@ -0,0 +1,264 @@
+import hashlib
+import logging
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict
+from functools import partial
+import requests
+from utils.circuit_breaker import CircuitBreaker
+from utils.metrics import record_breaker_state, record_cache, upstream_call
+from utils.rate_budget import spotify_budget
+
+log = logging.getLogger(__name__)
+
+
+class _Call:
+    __slots__ = ("done", "response", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+
+
+APP_SCOPE = "app"
+
+
+def auth_scope(headers, app_authorization=None):
+    """Short fingerprint of the Authorization header so callers with different tokens never share a response.
+
+    The client-credentials token gets the fixed scope "app", so shared catalog
+    responses keep their key when the app token is renewed.
+    """
+    auth = (headers or {}).get("Authorization", "")
+    if auth and auth == app_authorization:
+        return APP_SCOPE
+    return hashlib.blake2b(auth.encode("utf-8"), digest_size=8).hexdigest() if auth else "anonymous"
+
+
+def request_key(url, params=None, headers=None, app_authorization=None):
+    if params:
+        separator = "&" if "?" in url else "?"
+        url = f"{url}{separator}{urllib.parse.urlencode(sorted(params.items()))}"
+    return url, auth_scope(headers, app_authorization)
+
+
+def endpoint_of(url):
+    """Breaker key for a URL: its first path segments, e.g. /v1/search or /v1/browse/new-releases"""
+    path = urllib.parse.urlsplit(url).path
+    return "/".join(path.split("/")[:4])
+
+
+def synthetic_response(url, status_code, reason, content=b"{}", headers=None):
+    """Response built locally: empty JSON for calls that never reached Spotify, or a replayed last good one"""
+    response = requests.Response()
+    response.status_code = status_code
+    response.reason = reason
+    response.url = url
+    response.headers.update(headers or {"Content-Type": "application/json"})
+    response._content = content
+    return response
+
+
+class _LastGood:
+    """Body of the last successful response per request key, LRU-bounded by total body bytes; entries expire after `ttl`"""
+
+    def __init__(self, max_bytes, ttl=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.bytes = 0
+        self._entries = OrderedDict()  # key -> (stored_at, url, reason, content, headers)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def put(self, key, response):
+        # Caller holds the client lock
+        content = response.content
+        if len(content) > self.max_bytes:
+            return
+        self._drop(key)
+        self._entries[key] = (time.monotonic(), response.url, response.reason, content,
+                              {"Content-Type": response.headers.get("Content-Type", "application/json")})
+        self.bytes += len(content)
+        now = time.monotonic()
+        while self._entries:
+            oldest_key, (stored_at, *_rest) = next(iter(self._entries.items()))
+            expired = self.ttl is not None and now - stored_at > self.ttl
+            if not expired and self.bytes <= self.max_bytes:
+                break
+            self._drop(oldest_key)
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= len(entry[3])
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None or (self.ttl is not None and time.monotonic() - entry[0] > self.ttl):
+            return None
+        _, url, reason, content, headers = entry
+        # A fresh object per caller, so nobody sees another handler's changes
+        return synthetic_response(url, 200, reason, content, headers)
+
+
+class SpotifyClient:
+    """Outbound GETs to the Spotify Web API with single-flight coalescing, a shared budget and circuit breakers.
+
+    Concurrent calls for the same URL (query string included) and the same
+    Authorization header share one upstream request; everyone gets the same
+    `requests.Response`. Each upstream call spends from `spotify_budget` at the
+    given priority and goes through the circuit breaker of its endpoint. When the
+    budget refuses, the breaker is open, the call fails or times out, or Spotify
+    answers 429 or 5xx, the last good response for the same request is served
+    instead (or an empty 429/503 response if there is none), so handlers never
+    wait on a dead upstream.
+
+    Last good bodies are kept in two byte-bounded LRUs: one for requests made with
+    the client-credentials token (shared catalog and browse data, the point of the
+    fallback), and a smaller one with a short TTL for per-user tokens, so /v1/me
+    and friends cannot crowd the shared entries out.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+        self._last_good_shared = _LastGood(32 * 1024 * 1024)
+        self._last_good_user = _LastGood(4 * 1024 * 1024, ttl=300)
+        self._app_authorization = None
+        self.api_base = "https://api.spotify.com"
+        self.timeout = (3.05, 5)
+        self.breaker_options = {}
+        self._breakers = {}
+        self._lock = threading.Lock()
+        self.upstream_calls = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.served_stale = 0
+
+    def init_app(self, app):
+        self.api_base = app.config["SPOTIFY_API_BASE"].rstrip("/")
+        self.timeout = (app.config["SPOTIFY_CONNECT_TIMEOUT"], app.config["SPOTIFY_READ_TIMEOUT"])
+        self._last_good_shared = _LastGood(app.config["SPOTIFY_LAST_GOOD_BYTES"])
+        self._last_good_user = _LastGood(app.config["SPOTIFY_LAST_GOOD_USER_BYTES"], ttl=app.config["SPOTIFY_LAST_GOOD_USER_TTL"])
+        self.breaker_options = {
+            "window": app.config["SPOTIFY_BREAKER_WINDOW"],
+            "min_calls": app.config["SPOTIFY_BREAKER_MIN_CALLS"],
+            "error_threshold": app.config["SPOTIFY_BREAKER_ERROR_RATE"],
+            "open_seconds": app.config["SPOTIFY_BREAKER_OPEN_SECONDS"],
+        }
+
+    def breaker(self, endpoint):
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(endpoint)
+                if breaker is None:
+                    breaker = CircuitBreaker(**self.breaker_options, on_change=partial(record_breaker_state, endpoint))
+                    self._breakers[endpoint] = breaker
+                    record_breaker_state(endpoint, breaker.state, transition=False)
+        return breaker
+
+    def set_app_token(self, token):
+        """Called whenever the client-credentials token is (re)issued"""
+        self._app_authorization = f"Bearer {token}" if token else None
+
+    def _last_good_for(self, key):
+        return self._last_good_shared if key[1] == APP_SCOPE else self._last_good_user
+
+    def _remember(self, key, response):
+        with self._lock:
+            self._last_good_for(key).put(key, response)
+
+    def _stale_or(self, key, fallback):
+        with self._lock:
+            stale = self._last_good_for(key).get(key)
+        record_cache("spotify_last_good", stale is not None)
+        if stale is None:
+            return fallback
+        self.served_stale += 1
+        return stale
+
+    def _fetch(self, key, url, params, headers, timeout, priority):
+        breaker = self.breaker(endpoint_of(url))
+        if not breaker.allow():
+            return self._stale_or(key, synthetic_response(url, 503, "Circuit open"))
+        if not spotify_budget.acquire(priority):
+            breaker.cancel()
+            return self._stale_or(key, synthetic_response(url, 429, "Local budget exhausted"))
+        try:
+            with upstream_call("spotify", endpoint_of(url)) as call:
+                response = requests.get(url, params=params, headers=headers, timeout=timeout or self.timeout)
+                call.status = response.status_code
+        except requests.RequestException as e:
+            self.errors += 1
+            breaker.record(False)
+            log.warning("Spotify request failed", extra={"endpoint": endpoint_of(url), "error": str(e)})
+            return self._stale_or(key, synthetic_response(url, 503, "Upstream unavailable"))
+        breaker.record(response.status_code < 500)
+        if response.status_code >= 500:
+            return self._stale_or(key, response)
+        if response.status_code == 200:
+            self._remember(key, response)
+        elif response.status_code == 429:
+            try:
+                retry_after = float(response.headers.get("Retry-After", 5))
+            except ValueError:
+                retry_after = 5.0
+            spotify_budget.rate_limited_for(retry_after)
+            return self._stale_or(key, response)
+        return response
+
+    def get(self, url, params=None, headers=None, timeout=None, priority="interactive"):
+        """`url` may be a path such as /v1/search, resolved against SPOTIFY_API_BASE.
+
+        `priority` is one of rate_budget.PRIORITY_RESERVE: interactive, feed or background.
+        """
+        if url.startswith("/"):
+            url = self.api_base + url
+        key = request_key(url, params, headers, self._app_authorization)
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+                self.upstream_calls += 1
+            else:
+                self.coalesced += 1
+        record_cache("spotify_in_flight", not leader)
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.response
+
+        try:
+            call.response = self._fetch(key, url, params, headers, timeout, priority)
+            return call.response
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            call.done.set()
+
+    def stats(self):
+        return {
+            "upstream_calls": self.upstream_calls,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "in_flight": len(self._inflight),
+            "served_stale": self.served_stale,
+            "last_good": {
+                "shared": {"entries": len(self._last_good_shared), "bytes": self._last_good_shared.bytes},
+                "user": {"entries": len(self._last_good_user), "bytes": self._last_good_user.bytes},
+            },
+            "budget": spotify_budget.stats(),
+            "breakers": {endpoint: breaker.snapshot() for endpoint, breaker in list(self._breakers.items())},
+        }
+
+
+spotify_client = SpotifyClient()
@@ -0,0 +1,171 @@
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+import requests
+from flask import g, has_request_context, request
+
+log = logging.getLogger(__name__)
+
+
+class Trace:
+    """Spans of one request: (name, kind, start, end, attributes) with perf_counter times"""
+
+    __slots__ = ("trace_id", "started", "wall_started", "spans", "sampled")
+
+    def __init__(self, sampled):
+        self.trace_id = uuid.uuid4().hex
+        self.started = time.perf_counter()
+        self.wall_started = time.time()
+        self.spans = []
+        self.sampled = sampled
+
+    def add(self, name, kind, start, end, attributes=None):
+        self.spans.append((name, kind, start, end, attributes))
+
+    def summary(self):
+        """{kind: (total seconds, span count)}"""
+        totals = {}
+        for _, kind, start, end, _ in self.spans:
+            seconds, count = totals.get(kind, (0.0, 0))
+            totals[kind] = (seconds + end - start, count + 1)
+        return totals
+
+    def to_dict(self, ended, **fields):
+        return {
+            "trace_id": self.trace_id,
+            "start": round(self.wall_started, 6),
+            "duration_ms": round((ended - self.started) * 1000, 3),
+            **fields,
+            "spans": [
+                {
+                    "name": name,
+                    "kind": kind,
+                    "offset_ms": round((start - self.started) * 1000, 3),
+                    "duration_ms": round((end - start) * 1000, 3),
+                    **({"attributes": attributes} if attributes else {}),
+                }
+                for name, kind, start, end, attributes in self.spans
+            ],
+        }
+
+
+def current_trace():
+    return g.get("trace") if has_request_context() else None
+
+
+def record_span(name, kind, start, end, **attributes):
+    """Add an already timed span (perf_counter start/end) to the current request's trace, if any"""
+    trace = current_trace()
+    if trace is not None:
+        trace.add(name, kind, start, end, attributes)
+
+
+@contextmanager
+def span(name, kind, **attributes):
+    trace = current_trace()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, kind, start, time.perf_counter(), attributes)
+
+
+class TraceExporter:
+    """Writes finished traces as JSON lines to a file and/or POSTs them to a collector, off the request thread"""
+
+    def __init__(self, path=None, url=None, max_pending=1000):
+        self.path = path
+        self.url = url
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+        self._lock = threading.Lock()
+        self.exported = 0
+        self.dropped = 0
+
+    def submit(self, trace_dict):
+        try:
+            self._queue.put_nowait(trace_dict)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < 100:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+                self.exported += len(batch)
+            except Exception as e:
+                self.dropped += len(batch)
+                log.warning("Trace export failed", extra={"error": str(e), "traces": len(batch)})
+
+    def _write(self, batch):
+        if self.path:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(t, default=str) + "\n" for t in batch)
+        if self.url:
+            requests.post(self.url, json=batch, timeout=2)
+
+
+def server_timing(trace, ended):
+    parts = [f'{kind};dur={seconds * 1000:.1f};desc="{count} spans"'
+             for kind, (seconds, count) in sorted(trace.summary().items())]
+    parts.append(f"total;dur={(ended - trace.started) * 1000:.1f}")
+    return ", ".join(parts)
+
+
+def init_tracing(app):
+    """Record spans for every request; export sampled and slow traces; optionally send Server-Timing.
+
+    Recording is an append per span, cheap enough to leave on. A trace is exported
+    when it was sampled (TRACE_SAMPLE_RATE) or the request took at least
+    TRACE_SLOW_MS, so slow outliers are always kept.
+    """
+    config = app.config
+    if not config["TRACE_ENABLED"]:
+        return
+    sample_rate = config["TRACE_SAMPLE_RATE"]
+    slow_seconds = config["TRACE_SLOW_MS"] / 1000 if config["TRACE_SLOW_MS"] else None
+    with_header = config["TRACE_SERVER_TIMING"]
+    exporter = TraceExporter(config["TRACE_EXPORT_PATH"], config["TRACE_EXPORT_URL"])
+    app.extensions["trace_exporter"] = exporter
+
+    @app.before_request
+    def start_trace():
+        g.trace = Trace(sampled=random.random() < sample_rate)
+
+    @app.after_request
+    def finish_trace(response):
+        trace = g.pop("trace", None)
+        if trace is None:
+            return response
+        ended = time.perf_counter()
+        response.headers["X-Trace-Id"] = trace.trace_id
+        if with_header:
+            response.headers["Server-Timing"] = server_timing(trace, ended)
+        if (trace.sampled or (slow_seconds is not None and ended - trace.started >= slow_seconds)) \
+                and (exporter.path or exporter.url):
+            route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+            exporter.submit(trace.to_dict(ended, method=request.method, route=route, path=request.path,
+                                          status=response.status_code, sampled=trace.sampled))
+        return response